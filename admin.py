@@ -3,16 +3,19 @@ HUGİP Assistant - Admin Panel
 View feedback, analytics, and system stats
 """
 import streamlit as st
+import os
 import sys
+import tempfile
 from pathlib import Path
 import pandas as pd
-from datetime import datetime
+from datetime import date, datetime, time, timedelta, timezone
 
 # Add project root to path
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
 from src.database.feedback_db import FeedbackDB
+from src.database.export import export_table, EXPORT_FORMATS
 
 # Page config
 st.set_page_config(
@@ -21,26 +24,119 @@ st.set_page_config(
     layout="wide"
 )
 
-# Initialize DB
-db = FeedbackDB()
+PAGE_SIZE = 50
+# Sorgu sonuçları bu süre boyunca rerun'lar arasında tekrar kullanılır
+CACHE_TTL_SECONDS = 60
+
+# ==================== DATA LAYER ====================
+@st.cache_resource
+def get_db() -> FeedbackDB:
+    """Process başına tek FeedbackDB (connection'lar ve migration bir kez)"""
+    return FeedbackDB()
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def load_feedback_stats():
+    return get_db().get_feedback_stats()
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def load_daily_stats(days: int):
+    return get_db().get_daily_stats(days=days)
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def load_issue_type_counts():
+    return get_db().get_issue_type_counts()
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def load_route_stats():
+    return get_db().get_route_stats()
+
+def utc_midnight(day: date) -> datetime:
+    """Günün UTC gece yarısı (created_at filtreleri için)"""
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def load_feedback_page(cursor, rating=None, route=None, since=None, until=None):
+    return get_db().get_feedback_page(
+        limit=PAGE_SIZE, cursor=cursor, rating=rating, route=route, since=since, until=until
+    )
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def load_search_page(cursor, query: str, table: str, rating=None, route=None):
+    return get_db().search(query, table=table, limit=PAGE_SIZE, cursor=cursor, rating=rating, route=route)
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def load_top_questions(limit: int, table: str):
+    return get_db().get_top_questions(limit=limit, table=table)
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def load_latency_percentiles(group_by: str, days: int, route=None):
+    return get_db().get_latency_percentiles(group_by=group_by, days=days, route=route)
+
+def paginate(key: str, filters: tuple, fetch_page):
+    """
+    Keyset pagination kontrolleri
+    
+    Cursor'lar session_state'te stack olarak tutulur (geri gitmek için).
+    Filtreler değişince ilk sayfaya dönülür.
+    
+    Args:
+        key: Widget/session_state prefix'i
+        filters: Aktif filtreler (değişiklik kontrolü için)
+        fetch_page: cursor alıp {"rows", "next_cursor"} döndüren fonksiyon
+    """
+    cursors_key = f"{key}_cursors"
+    if st.session_state.get(f"{key}_filters") != filters:
+        st.session_state[f"{key}_filters"] = filters
+        st.session_state[cursors_key] = [None]
+    
+    cursors = st.session_state[cursors_key]
+    page = fetch_page(cursors[-1])
+    
+    col1, col2, col3 = st.columns([1, 1, 6])
+    with col1:
+        if st.button("⬅️ Önceki", key=f"{key}_prev", disabled=len(cursors) == 1):
+            cursors.pop()
+            st.rerun()
+    with col2:
+        if st.button("Sonraki ➡️", key=f"{key}_next", disabled=page["next_cursor"] is None):
+            cursors.append(page["next_cursor"])
+            st.rerun()
+    with col3:
+        st.caption(f"Sayfa {len(cursors)}")
+    
+    return page
 
 # Header
 st.title("📊 HUGİP Asistan - Admin Panel")
 st.markdown("Feedback ve Analytics Dashboard")
 
-# Tabs
-tab1, tab2, tab3, tab4 = st.tabs([
-    "📈 Genel İstatistikler",
-    "👎 Negatif Feedback",
-    "💬 Tüm Feedback",
-    "❓ En Çok Sorulan Sorular"
-])
+# Sidebar
+with st.sidebar:
+    if st.button("🔄 Verileri Yenile"):
+        st.cache_data.clear()
+    st.caption(f"Sorgular {CACHE_TTL_SECONDS} sn cache'lenir")
+
+# Tabs (st.tabs her rerun'da tüm tab'ları çalıştırır; sadece seçili bölüm yüklenir)
+TAB_STATS = "📈 Genel İstatistikler"
+TAB_NEGATIVE = "👎 Negatif Feedback"
+TAB_ALL = "💬 Tüm Feedback"
+TAB_TOP = "❓ En Çok Sorulan Sorular"
+TAB_LATENCY = "⏱️ Latency"
+TAB_SEARCH = "🔍 Arama"
+
+active_tab = st.radio(
+    "Bölüm",
+    [TAB_STATS, TAB_NEGATIVE, TAB_ALL, TAB_TOP, TAB_LATENCY, TAB_SEARCH],
+    horizontal=True,
+    key="active_tab",
+    label_visibility="collapsed"
+)
 
 # ==================== TAB 1: STATS ====================
-with tab1:
+if active_tab == TAB_STATS:
     st.header("📈 Genel İstatistikler")
     
-    stats = db.get_feedback_stats()
+    stats = load_feedback_stats()
     
     # Yeni format: stats["ratings"] bir dict → {"positive": N, "negative": N}
     total = stats.get("total", 0)
@@ -77,16 +173,27 @@ with tab1:
     
     st.markdown("---")
     
-    # Route & issue type performance from all feedback
-    all_feedback = db.get_all_feedback(limit=10000)
+    # Daily trend (rollup tablolarından)
+    daily_stats = load_daily_stats(days=30)
+    
+    if daily_stats:
+        st.subheader("📅 Son 30 Gün")
+        daily_df = pd.DataFrame(daily_stats).set_index("day")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.markdown("**Sohbet ve Feedback Sayısı**")
+            st.line_chart(daily_df[["chats", "feedback"]])
+        with col2:
+            st.markdown("**Ortalama Cevap Süresi (sn)**")
+            st.line_chart(daily_df[["avg_response_time"]])
+        
+        st.markdown("---")
     
-    if all_feedback:
+    # Route & issue type performance (DB'de aggregate edilir)
+    if total > 0:
         # Issue types
-        issue_types = {}
-        for fb in all_feedback:
-            issue = fb.get("issue_type")
-            if issue:
-                issue_types[issue] = issue_types.get(issue, 0) + 1
+        issue_types = load_issue_type_counts()
         
         if issue_types:
             st.subheader("🔴 Sorun Tipleri")
@@ -98,23 +205,14 @@ with tab1:
             st.markdown("---")
         
         # Route performance
-        route_stats = {}
-        for fb in all_feedback:
-            route = fb.get("route") or "unknown"
-            if route not in route_stats:
-                route_stats[route] = {"total": 0, "positive": 0, "negative": 0}
-            route_stats[route]["total"] += 1
-            if fb.get("rating") == "positive":
-                route_stats[route]["positive"] += 1
-            elif fb.get("rating") == "negative":
-                route_stats[route]["negative"] += 1
+        route_stats = load_route_stats()
         
         if route_stats:
             st.subheader("🎯 Route Performansı")
             route_data = []
-            for route, data in route_stats.items():
+            for data in route_stats:
                 route_data.append({
-                    "Route": route.upper(),
+                    "Route": data["route"].upper(),
                     "Toplam": data["total"],
                     "Pozitif": data["positive"],
                     "Negatif": data["negative"],
@@ -124,11 +222,15 @@ with tab1:
             st.dataframe(route_df, use_container_width=True)
 
 # ==================== TAB 2: NEGATIVE FEEDBACK ====================
-with tab2:
+if active_tab == TAB_NEGATIVE:
     st.header("👎 Negatif Feedback")
     
-    all_feedback = db.get_all_feedback(limit=200)
-    negative_feedback = [fb for fb in all_feedback if fb.get("rating") == "negative"]
+    page = paginate(
+        "negative",
+        ("negative",),
+        lambda cursor: load_feedback_page(cursor, rating="negative")
+    )
+    negative_feedback = page["rows"]
     
     if negative_feedback:
         for feedback in negative_feedback:
@@ -160,79 +262,179 @@ with tab2:
         st.info("Henüz negatif feedback yok! 🎉")
 
 # ==================== TAB 3: ALL FEEDBACK ====================
-with tab3:
+if active_tab == TAB_ALL:
     st.header("💬 Tüm Feedback")
     
-    all_feedback = db.get_all_feedback(limit=200)
+    # Filter options (DB tarafında uygulanır)
+    col1, col2, col3, col4 = st.columns(4)
     
-    if all_feedback:
-        df = pd.DataFrame(all_feedback)
-        
-        # Filter options
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            rating_filter = st.selectbox(
-                "Rating Filtrele",
-                ["Hepsi", "Pozitif", "Negatif"]
-            )
-        
-        with col2:
-            routes = df['route'].dropna().unique().tolist() if 'route' in df.columns else []
-            route_filter = st.selectbox(
-                "Route Filtrele",
-                ["Hepsi"] + routes
-            )
-        
-        # Apply filters
-        filtered_df = df.copy()
-        
-        if rating_filter == "Pozitif":
-            filtered_df = filtered_df[filtered_df['rating'] == 'positive']
-        elif rating_filter == "Negatif":
-            filtered_df = filtered_df[filtered_df['rating'] == 'negative']
-        
-        if route_filter != "Hepsi":
-            filtered_df = filtered_df[filtered_df['route'] == route_filter]
+    with col1:
+        rating_filter = st.selectbox(
+            "Rating Filtrele",
+            ["Hepsi", "Pozitif", "Negatif"]
+        )
+    
+    with col2:
+        routes = [r["route"] for r in load_route_stats() if r["route"] != "unknown"]
+        route_filter = st.selectbox(
+            "Route Filtrele",
+            ["Hepsi"] + routes
+        )
+    
+    with col3:
+        since_date = st.date_input("Başlangıç Tarihi (UTC)", value=None)
+    
+    with col4:
+        until_date = st.date_input("Bitiş Tarihi (UTC)", value=None)
+    
+    rating = {"Pozitif": "positive", "Negatif": "negative"}.get(rating_filter)
+    route = route_filter if route_filter != "Hepsi" else None
+    # created_at UTC: günler UTC gece yarısından başlar (retention cutoff'u ve günlük istatistikler gibi)
+    since = utc_midnight(since_date) if since_date else None
+    # Bitiş günü dahil
+    until = utc_midnight(until_date + timedelta(days=1)) if until_date else None
+    
+    page = paginate(
+        "all_feedback",
+        (rating, route, since, until),
+        lambda cursor: load_feedback_page(cursor, rating=rating, route=route, since=since, until=until)
+    )
+    
+    if page["rows"]:
+        filtered_df = pd.DataFrame(page["rows"])
         
         # Display columns
         display_cols = [c for c in ['created_at', 'rating', 'route', 'issue_type', 'question', 'answer', 'comment'] if c in filtered_df.columns]
         
         st.dataframe(filtered_df[display_cols], use_container_width=True)
         
-        # Download
-        csv = filtered_df.to_csv(index=False)
-        st.download_button(
-            label="📥 CSV İndir",
-            data=csv,
-            file_name=f"feedback_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-            mime="text/csv"
-        )
+        # Export: filtredeki tüm satırlar chunk chunk dosyaya yazılır
+        export_format = st.radio("Export Formatı", list(EXPORT_FORMATS), horizontal=True)
+        if st.button("📦 Filtrelenmiş Feedback'i Dışa Aktar"):
+            export_path = str(Path(tempfile.gettempdir()) / f"feedback_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{export_format}")
+            try:
+                with st.spinner("Export hazırlanıyor..."):
+                    st.session_state.feedback_export = export_table(
+                        get_db(), "feedback", export_path,
+                        filters={"rating": rating, "route": route}, since=since, until=until
+                    )
+            except ImportError as e:
+                st.error(str(e))
+        
+        export = st.session_state.get("feedback_export")
+        if export and os.path.exists(export["path"]):
+            st.caption(f"{export['rows']:,} satır, {export['rows_per_sec']:,.0f} satır/sn")
+            with open(export["path"], "rb") as f:
+                st.download_button(
+                    label=f"📥 {export['format'].upper()} İndir",
+                    data=f,
+                    file_name=Path(export["path"]).name,
+                    mime="text/csv" if export["format"] == "csv" else "application/octet-stream"
+                )
     else:
         st.info("Henüz feedback yok!")
 
 # ==================== TAB 4: MOST ASKED ====================
-with tab4:
+if active_tab == TAB_TOP:
     st.header("❓ En Çok Sorulan Sorular")
+    st.caption("Benzer yazılmış sorular (büyük/küçük harf, noktalama, aksan farkları) tek soru olarak sayılır")
+    
+    source = st.radio(
+        "Kaynak",
+        ["feedback", "chat_history"],
+        format_func=lambda t: {"feedback": "Feedback", "chat_history": "Tüm Sohbetler"}[t],
+        horizontal=True
+    )
+    top_questions = load_top_questions(limit=20, table=source)
+    
+    if top_questions:
+        for idx, item in enumerate(top_questions, 1):
+            st.markdown(f"**{idx}.** {item['question']} `({item['count']} kez)`")
+    else:
+        st.info("Henüz feedback yok!" if source == "feedback" else "Henüz sohbet yok!")
+
+# ==================== TAB 5: LATENCY ====================
+if active_tab == TAB_LATENCY:
+    st.header("⏱️ Cevap Süresi (p50 / p90 / p99)")
+    st.caption("Günlük latency histogram'ından hesaplanır (10 sn altında 100 ms çözünürlük)")
+    
+    days = st.selectbox("Dönem", [7, 30, 90], index=1, format_func=lambda d: f"Son {d} gün")
     
-    all_feedback = db.get_all_feedback(limit=10000)
+    route_latency = load_latency_percentiles("route", days)
     
-    if all_feedback:
-        question_counts = {}
-        for fb in all_feedback:
-            q = fb.get("question", "")
-            if q:
-                question_counts[q] = question_counts.get(q, 0) + 1
+    if route_latency:
+        st.subheader("🎯 Route Bazında")
+        st.dataframe(pd.DataFrame([
+            {
+                "Route": row["route"].upper(),
+                "İstek": row["requests"],
+                "p50 (ms)": row["p50_ms"],
+                "p90 (ms)": row["p90_ms"],
+                "p99 (ms)": row["p99_ms"],
+            }
+            for row in route_latency
+        ]), use_container_width=True)
         
-        sorted_questions = sorted(question_counts.items(), key=lambda x: x[1], reverse=True)[:20]
+        st.markdown("---")
         
-        if sorted_questions:
-            for idx, (question, count) in enumerate(sorted_questions, 1):
-                st.markdown(f"**{idx}.** {question} `({count} kez)`")
-        else:
-            st.info("Henüz soru sorulmamış!")
+        # Günlük trend (regresyonları prompt/model değişikliklerinden sonra görmek için)
+        st.subheader("📅 Günlük Trend")
+        route_filter = st.selectbox(
+            "Route",
+            ["Tümü"] + [row["route"] for row in route_latency],
+            key="latency_route"
+        )
+        daily_latency = load_latency_percentiles(
+            "day",
+            days,
+            route=None if route_filter == "Tümü" else route_filter
+        )
+        if daily_latency:
+            daily_latency_df = pd.DataFrame(daily_latency).set_index("day")
+            st.line_chart(daily_latency_df[["p50_ms", "p90_ms", "p99_ms"]])
     else:
-        st.info("Henüz feedback yok!")
+        st.info("Henüz cevap süresi kaydı yok!")
+
+# ==================== TAB 6: SEARCH ====================
+if active_tab == TAB_SEARCH:
+    st.header("🔍 Arama")
+    
+    col1, col2, col3 = st.columns([4, 1, 1])
+    with col1:
+        search_query = st.text_input("Soru, cevap veya yorumlarda ara", placeholder="ör. festup kayıt")
+    with col2:
+        search_source = st.selectbox(
+            "Kaynak",
+            ["feedback", "chat_history"],
+            format_func=lambda t: {"feedback": "Feedback", "chat_history": "Tüm Sohbetler"}[t]
+        )
+    with col3:
+        search_rating = st.selectbox(
+            "Rating",
+            ["Hepsi", "Pozitif", "Negatif"],
+            disabled=search_source != "feedback"
+        )
+    
+    if search_query.strip():
+        rating = {"Pozitif": "positive", "Negatif": "negative"}.get(search_rating) if search_source == "feedback" else None
+        page = paginate(
+            "search",
+            (search_query, search_source, rating),
+            lambda cursor: load_search_page(cursor, search_query, search_source, rating=rating)
+        )
+        
+        if page["rows"]:
+            for row in page["rows"]:
+                label = f"{row.get('created_at', '')} | {row.get('route', '')}"
+                if row.get("rating"):
+                    label += f" | {'👍' if row['rating'] == 'positive' else '👎'}"
+                with st.expander(f"{label} | {row['question'][:80]}"):
+                    st.markdown(f"**Soru:** {row['question']}")
+                    st.markdown(f"**Cevap:** {row['answer']}")
+                    if row.get("comment"):
+                        st.markdown(f"**Yorum:** {row['comment']}")
+        else:
+            st.info("Sonuç bulunamadı")
 
 # Footer
 st.markdown("---")
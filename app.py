@@ -15,7 +15,8 @@ sys.path.insert(0, str(project_root))
 from dotenv import load_dotenv
 load_dotenv()
 
-from src.graph import build_graph, GraphState
+from src.graph import initial_state, get_sources, STREAMED_NODES
+from src.graph.warmup import warm_up, EXAMPLE_QUESTIONS
 from src.database.feedback_db import FeedbackDB
 
 # Page config
@@ -249,6 +250,27 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Process-wide resources (tüm browser session'ları paylaşır)
+@st.cache_resource(show_spinner="Asistan hazırlanıyor...")
+def get_graph():
+    """
+    Process başına tek graph
+
+    Node'lar request'e özel durum tutmaz (state graph state'inde,
+    conversation memory MemoryService'te session_id ile), bu yüzden
+    aynı graph tüm session'lar tarafından eşzamanlı kullanılabilir.
+    """
+    return warm_up()["graph"]
+
+@st.cache_resource
+def get_db() -> FeedbackDB:
+    """Process başına tek FeedbackDB (thread-local connection'lar, tek write-behind thread'i)"""
+    return FeedbackDB(write_behind=True)
+
+# İlk sayfa yüklemesinde kur + warm-up (ilk soruyu bekletmesin)
+get_graph()
+get_db()
+
 # Initialize session state
 if "session_id" not in st.session_state:
     st.session_state.session_id = str(uuid.uuid4())
@@ -256,31 +278,20 @@ if "session_id" not in st.session_state:
 if "messages" not in st.session_state:
     st.session_state.messages = []
 
-if "graph" not in st.session_state:
-    st.session_state.graph = build_graph()
-
-if "db" not in st.session_state:
-    st.session_state.db = FeedbackDB()
-
 if "feedback_given" not in st.session_state:
     st.session_state.feedback_given = set()
 
+if "history_block" not in st.session_state:
+    # Tamamlanmış mesajların birleştirilmiş HTML'i (render_history)
+    st.session_state.history_block = {"count": 0, "html": ""}
+
 # Sidebar
 with st.sidebar:
     st.title("🎓 HUGİP Asistan")
     st.markdown("---")
     
     st.markdown("### 💡 Örnek Sorular")
-    example_questions = [
-        "FESTUP nedir?",
-        "Social Media Talks'ta kimler konuşacak?",
-        "Kulübe nasıl üye olabilirim?",
-        "Yönetim kurulu kimlerden oluşur?",
-        "Dış İlişkiler ekibi ne yapar?",
-        "DigitalMAG hakkında bilgi ver",
-    ]
-    
-    for question in example_questions:
+    for question in EXAMPLE_QUESTIONS:
         if st.button(question, key=f"example_{question}"):
             st.session_state.user_input = question
     
@@ -291,11 +302,13 @@ with st.sidebar:
         st.session_state.session_id = str(uuid.uuid4())
         st.session_state.messages = []
         st.session_state.feedback_given = set()
+        st.session_state.history_block = {"count": 0, "html": ""}
         st.rerun()
     
     st.markdown("---")
     st.markdown("### 📊 Sohbet Bilgileri")
-    st.info(f"**Mesaj Sayısı:** {len(st.session_state.messages)}")
+    # Yeni mesajlar eklendikten sonra (script sonunda) doldurulur
+    message_count = st.empty()
     
     # Session ID (for debug)
     with st.expander("🔍 Session ID"):
@@ -305,127 +318,231 @@ with st.sidebar:
 st.title("💬 HUGİP Kulüp Asistanı")
 st.markdown("Haliç Üniversitesi Girişimcilik ve Pazarlama Kulübü hakkında sorularınızı sorabilirsiniz!")
 
-# Display chat messages
-chat_container = st.container()
+ROUTE_BADGES = {
+    "rag": ("📚", "route-rag", "RAG"),
+    "web_search": ("🌐", "route-web", "Web"),
+    "direct": ("💬", "route-direct", "Direct"),
+}
 
-with chat_container:
-    for idx, message in enumerate(st.session_state.messages):
-        role = message["role"]
-        content = message["content"]
-        
-        if role == "user":
-            st.markdown(f"""
-            <div class="chat-message user">
-                <div class="message-content"><strong>Siz:</strong> {content}</div>
+FEEDBACK_ISSUES = [
+    "Cevap alakasız",
+    "Bilgi eksik",
+    "Bilgi yanlış",
+    "Kaynak bulunamadı",
+    "Cevap anlaşılır değil",
+    "Diğer"
+]
+
+def message_html(message: dict) -> str:
+    """
+    Mesajın HTML'i
+
+    Mesajlar değişmediği için HTML bir kez üretilip mesajda saklanır,
+    sonraki rerun'larda tekrar hesaplanmaz.
+    """
+    if "html" in message:
+        return message["html"]
+
+    content = message["content"]
+    if message["role"] == "user":
+        html = f"""
+        <div class="chat-message user">
+            <div class="message-content"><strong>Siz:</strong> {content}</div>
+        </div>
+        """
+    else:
+        sources = message.get("sources", [])
+        emoji, css_class, label = ROUTE_BADGES.get(message.get("route"), ROUTE_BADGES["direct"])
+
+        sources_html = ""
+        if sources:
+            unique_sources = list(dict.fromkeys(sources))
+            sources_html = "<div style='margin-top: 0.5rem;'>"
+            for source in unique_sources[:3]:  # Max 3 sources
+                source_name = source.split('/')[-1].split('\\')[-1][:30]
+                sources_html += f'<span class="source-badge">📄 {source_name}</span>'
+            sources_html += "</div>"
+
+        html = f"""
+        <div class="chat-message assistant">
+            <div class="message-content"><strong>Asistan:</strong> {content}</div>
+            <div class="message-meta">
+                <span class="route-badge {css_class}">{emoji} {label}</span>
             </div>
-            """, unsafe_allow_html=True)
-        else:
-            # Assistant message
-            sources = message.get("sources", [])
-            route = message.get("route", "unknown")
-            
-            # Route badge
-            route_emoji = {"rag": "📚", "web_search": "🌐", "direct": "💬"}
-            route_class = {"rag": "route-rag", "web_search": "route-web", "direct": "route-direct"}
-            route_text = {"rag": "RAG", "web_search": "Web", "direct": "Direct"}
-            
-            sources_html = ""
-            if sources:
-                unique_sources = list(set(sources))
-                sources_html = "<div style='margin-top: 0.5rem;'>"
-                for source in unique_sources[:3]:  # Max 3 sources
-                    source_name = source.split('/')[-1].split('\\')[-1][:30]
-                    sources_html += f'<span class="source-badge">📄 {source_name}</span>'
-                sources_html += "</div>"
-            
-            st.markdown(f"""
-            <div class="chat-message assistant">
-                <div class="message-content"><strong>Asistan:</strong> {content}</div>
-                <div class="message-meta">
-                    <span class="route-badge {route_class.get(route, 'route-direct')}">
-                        {route_emoji.get(route, '💬')} {route_text.get(route, 'Direct')}
-                    </span>
-                </div>
-                {sources_html}
+            {sources_html}
+        </div>
+        """
+
+    message["html"] = html
+    return html
+
+def save_feedback(idx: int, rating: str, **kwargs):
+    """Feedback'i kaydet (write-behind, UI'ı bekletmez)"""
+    message = st.session_state.messages[idx]
+    sources = message.get("sources", [])
+    get_db().add_feedback(
+        session_id=st.session_state.session_id,
+        question=st.session_state.messages[idx - 1]["content"],
+        answer=message["content"],
+        rating=rating,
+        route=message.get("route"),
+        sources=",".join(sources) if sources else None,
+        **kwargs
+    )
+    st.session_state.feedback_given.add(f"feedback_{idx}")
+
+@st.fragment
+def feedback_widget(idx: int):
+    """
+    Tek mesajın feedback butonları / formu
+
+    Fragment: tıklama sadece bu bloğu yeniden çalıştırır, sohbet geçmişi
+    yeniden render edilmez. Kaydedilince butonlar aynı run'da kaldırılır.
+    """
+    if f"feedback_{idx}" in st.session_state.feedback_given:
+        return
+
+    form_key = f"show_feedback_form_{idx}"
+    slot = st.empty()
+
+    with slot.container():
+        col1, col2, col3 = st.columns([1, 1, 8])
+        thumbs_up = col1.button("👍", key=f"thumbs_up_{idx}")
+        if col2.button("👎", key=f"thumbs_down_{idx}"):
+            st.session_state[form_key] = True
+
+        # Feedback form (if thumbs down clicked)
+        submitted = False
+        if st.session_state.get(form_key, False):
+            with st.form(key=f"feedback_form_{idx}"):
+                st.markdown("#### ❌ Cevap nasıl iyileştirilebilir?")
+
+                issue_type = st.selectbox("Sorun nedir?", FEEDBACK_ISSUES, key=f"issue_type_{idx}")
+
+                comment = st.text_area(
+                    "Detaylı açıklama (opsiyonel)",
+                    placeholder="Ne bekliyordunuz? Nasıl daha iyi olabilirdi?",
+                    key=f"comment_{idx}"
+                )
+
+                user_email = st.text_input(
+                    "Email (opsiyonel - geri dönüş için)",
+                    placeholder="ornek@ogrenci.halic.edu.tr",
+                    key=f"email_{idx}"
+                )
+
+                submitted = st.form_submit_button("📤 Gönder")
+
+    if thumbs_up:
+        save_feedback(idx, "positive")
+        slot.empty()
+        st.toast("Teşekkürler! 👍")
+    elif submitted:
+        save_feedback(
+            idx,
+            "negative",
+            issue_type=issue_type,
+            comment=comment if comment else None,
+            user_email=user_email if user_email else None
+        )
+        st.session_state[form_key] = False
+        slot.empty()
+        st.toast("Geri bildiriminiz kaydedildi! Teşekkürler! 🙏")
+
+def needs_feedback(idx: int) -> bool:
+    """Asistan mesajı henüz puanlanmadı mı"""
+    return (
+        st.session_state.messages[idx]["role"] == "assistant"
+        and f"feedback_{idx}" not in st.session_state.feedback_given
+    )
+
+def render_message(idx: int):
+    message = st.session_state.messages[idx]
+    st.markdown(message_html(message), unsafe_allow_html=True)
+    if needs_feedback(idx):
+        feedback_widget(idx)
+
+def render_history(messages: list):
+    """
+    Sohbet geçmişi
+
+    Baştan itibaren feedback widget'ı gerekmeyen mesajlar (kullanıcı
+    mesajları ve puanlanmış cevaplar) bittikleri rerun'da bir kez
+    history_block'a eklenir; sonraki rerun'lar bu hazır bloğu tek element
+    olarak gösterir, mesajları tekrar dolaşmaz veya birleştirmez. Sadece
+    ilk puanlanmamış cevaptan sonraki mesajlar her rerun'da işlenir ve
+    puanlanmamış her cevap kendi feedback fragment'ını alır.
+    """
+    block = st.session_state.history_block
+    while block["count"] < len(messages) and not needs_feedback(block["count"]):
+        block["html"] += message_html(messages[block["count"]])
+        block["count"] += 1
+    if block["html"]:
+        st.markdown(block["html"], unsafe_allow_html=True)
+
+    pending = []
+    for idx in range(block["count"], len(messages)):
+        pending.append(message_html(messages[idx]))
+        if needs_feedback(idx):
+            st.markdown("".join(pending), unsafe_allow_html=True)
+            pending = []
+            feedback_widget(idx)
+    if pending:
+        st.markdown("".join(pending), unsafe_allow_html=True)
+
+def stream_answer(question: str) -> dict:
+    """
+    Graph'ı çalıştır, cevap token'larını geldikçe göster
+
+    Returns:
+        Final graph state
+    """
+    placeholder = st.empty()
+    placeholder.markdown("""
+    <div class="typing-indicator">
+        <span></span>
+        <span></span>
+        <span></span>
+    </div>
+    """, unsafe_allow_html=True)
+
+    final = {}
+    text = ""
+    token_node = None
+
+    for mode, payload in get_graph().stream(
+        initial_state(question, st.session_state.session_id),
+        stream_mode=["updates", "messages"]
+    ):
+        if mode == "messages":
+            chunk, metadata = payload
+            node = metadata.get("langgraph_node")
+            if node not in STREAMED_NODES or not isinstance(chunk.content, str) or not chunk.content:
+                continue
+            # Reflection cevabı yeniden üretiyorsa baştan yaz
+            if node != token_node:
+                text = ""
+                token_node = node
+            text += chunk.content
+            placeholder.markdown(f"""
+            <div class="typing-animation">
+                {text}
             </div>
             """, unsafe_allow_html=True)
-            
-            # Feedback section
-            feedback_key = f"feedback_{idx}"
-            if feedback_key not in st.session_state.feedback_given:
-                col1, col2, col3 = st.columns([1, 1, 8])
-                
-                with col1:
-                    if st.button("👍", key=f"thumbs_up_{idx}"):
-                        # Save positive feedback
-                        st.session_state.db.add_feedback(
-                            session_id=st.session_state.session_id,
-                            question=st.session_state.messages[idx-1]["content"],
-                            answer=content,
-                            rating="positive",
-                            route=route,
-                            sources=",".join(sources) if sources else None
-                        )
-                        st.session_state.feedback_given.add(feedback_key)
-                        st.success("Teşekkürler! 👍")
-                        time.sleep(1)
-                        st.rerun()
-                
-                with col2:
-                    if st.button("👎", key=f"thumbs_down_{idx}"):
-                        st.session_state[f"show_feedback_form_{idx}"] = True
-                        st.rerun()
-                
-                # Feedback form (if thumbs down clicked)
-                if st.session_state.get(f"show_feedback_form_{idx}", False):
-                    with st.form(key=f"feedback_form_{idx}"):
-                        st.markdown("#### ❌ Cevap nasıl iyileştirilebilir?")
-                        
-                        issue_type = st.selectbox(
-                            "Sorun nedir?",
-                            [
-                                "Cevap alakasız",
-                                "Bilgi eksik",
-                                "Bilgi yanlış",
-                                "Kaynak bulunamadı",
-                                "Cevap anlaşılır değil",
-                                "Diğer"
-                            ],
-                            key=f"issue_type_{idx}"
-                        )
-                        
-                        comment = st.text_area(
-                            "Detaylı açıklama (opsiyonel)",
-                            placeholder="Ne bekliyordunuz? Nasıl daha iyi olabilirdi?",
-                            key=f"comment_{idx}"
-                        )
-                        
-                        user_email = st.text_input(
-                            "Email (opsiyonel - geri dönüş için)",
-                            placeholder="ornek@ogrenci.halic.edu.tr",
-                            key=f"email_{idx}"
-                        )
-                        
-                        submitted = st.form_submit_button("📤 Gönder")
-                        
-                        if submitted:
-                            # Save negative feedback
-                            st.session_state.db.add_feedback(
-                                session_id=st.session_state.session_id,
-                                question=st.session_state.messages[idx-1]["content"],
-                                answer=content,
-                                rating="negative",
-                                route=route,
-                                sources=",".join(sources) if sources else None,
-                                issue_type=issue_type,
-                                comment=comment if comment else None,
-                                user_email=user_email if user_email else None
-                            )
-                            st.session_state.feedback_given.add(feedback_key)
-                            st.session_state[f"show_feedback_form_{idx}"] = False
-                            st.success("Geri bildiriminiz kaydedildi! Teşekkürler! 🙏")
-                            time.sleep(1)
-                            st.rerun()
+            continue
+
+        for update in payload.values():
+            if update:
+                final.update(update)
+
+    placeholder.empty()
+    return final
+
+# Display chat messages
+chat_container = st.container()
+
+with chat_container:
+    render_history(st.session_state.messages)
 
 # Chat input
 user_input = st.chat_input("Mesajınızı yazın...")
@@ -435,93 +552,40 @@ if "user_input" in st.session_state:
     user_input = st.session_state.user_input
     del st.session_state.user_input
 
+# Yeni soru: aynı run içinde göster ve cevapla (ek rerun yok)
 if user_input:
-    # Add user message
-    st.session_state.messages.append({
-        "role": "user",
-        "content": user_input
-    })
-    
-    # Rerun to show user message immediately
-    st.rerun()
-
-# Check if we need to generate response (last message is user)
-if st.session_state.messages and st.session_state.messages[-1]["role"] == "user":
-    # Show typing indicator
-    with st.chat_message("assistant"):
-        typing_placeholder = st.empty()
-        typing_placeholder.markdown("""
-        <div class="typing-indicator">
-            <span></span>
-            <span></span>
-            <span></span>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        start_time = time.time()
-        
-        # Get the last user message
-        last_user_message = st.session_state.messages[-1]["content"]
-        
-        # Invoke graph
-        result = st.session_state.graph.invoke({
-            "question": last_user_message,
-            "generation": "",
-            "documents": [],
-            "decision": "",
-            "web_results": [],
-            "iterations": 0,
-            "session_id": st.session_state.session_id
+    with chat_container:
+        st.session_state.messages.append({
+            "role": "user",
+            "content": user_input
         })
-        
+        render_message(len(st.session_state.messages) - 1)
+
+        start_time = time.time()
+        result = stream_answer(user_input)
         response_time = time.time() - start_time
-        
-        # Clear typing indicator
-        typing_placeholder.empty()
-        
-        # Extract sources
-        sources = []
-        if result.get("documents"):
-            sources = [doc.metadata.get("source", "Unknown") for doc in result["documents"]]
-        
-        # Add assistant message
+
+        sources = get_sources(result)
+
         st.session_state.messages.append({
             "role": "assistant",
             "content": result["generation"],
             "sources": sources,
             "route": result["decision"]
         })
-        
-        # Log to database
-        st.session_state.db.add_chat_history(
-            session_id=st.session_state.session_id,
-            question=last_user_message,
-            answer=result["generation"],
-            route=result["decision"],
-            sources=",".join(sources) if sources else None,
-            response_time=response_time
-        )
-        
-        # Display response with typing effect
-        response_container = st.empty()
-        full_response = result["generation"]
-        displayed_text = ""
-        
-        # Simulate typing (split by words for smoother effect)
-        words = full_response.split()
-        for i, word in enumerate(words):
-            displayed_text += word + " "
-            response_container.markdown(f"""
-            <div class="typing-animation">
-                {displayed_text}
-            </div>
-            """, unsafe_allow_html=True)
-            time.sleep(0.03)  # 30ms delay between words
-        
-        # Final rerun to show complete message with sources/badges
-        time.sleep(0.5)
-    
-    st.rerun()
+        render_message(len(st.session_state.messages) - 1)
+
+    # Log to database
+    get_db().add_chat_history(
+        session_id=st.session_state.session_id,
+        question=user_input,
+        answer=result["generation"],
+        route=result["decision"],
+        sources=",".join(sources) if sources else None,
+        response_time=response_time
+    )
+
+message_count.info(f"**Mesaj Sayısı:** {len(st.session_state.messages)}")
 
 # Footer
 st.markdown("---")
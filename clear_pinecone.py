@@ -13,16 +13,15 @@ if str(project_root) not in sys.path:
 from dotenv import load_dotenv
 load_dotenv()
 
-from pinecone import Pinecone
 from src.core.config import get_settings
+from src.services.clients import get_pinecone_index
 
 def clear_pinecone():
     """Pinecone index'ini tamamen temizle"""
     settings = get_settings()
     
-    # Pinecone client
-    pc = Pinecone(api_key=settings.PINECONE_API_KEY)
-    index = pc.Index(settings.PINECONE_INDEX_NAME)
+    # Pinecone index (paylaşılan client)
+    index = get_pinecone_index(settings.PINECONE_INDEX_NAME)
     
     print("\n" + "="*80)
     print("⚠️  PINECONE TEMİZLEME - DİKKAT!")
@@ -0,0 +1,129 @@
+"""
+FastAPI Application
+.NET backend ve diğer client'lar için chat servisi
+
+Çalıştırma:
+    SESSION_SECRET=... WEB_CONCURRENCY=4 uvicorn src.api.main:app --host 0.0.0.0 --port 8000
+
+Lokal geliştirme (tek worker, geçici session anahtarı):
+    ENVIRONMENT=development uvicorn src.api.main:app --reload
+"""
+import asyncio
+import secrets
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+from src.core.config import get_settings
+from src.database.feedback_db import FeedbackDB
+from src.graph.warmup import warm_up
+from src.services.clients import aclose_clients
+from src.services.llm_usage import usage_tracker, cascade_tracker
+from src.api.middleware.admission import AdmissionController, AdmissionMiddleware
+from src.api.middleware.session import SessionSigner, SessionMiddleware
+from src.api.routes import chat
+
+# SESSION_SECRET olmadan geçici anahtara izin verilen ortamlar
+LOCAL_ENVIRONMENTS = ("development", "local")
+
+async def _warm_up(app: FastAPI):
+    """Graph'ı kur ve bağlantıları ısıt; bitince /ready 200 döner"""
+    try:
+        # build_graph ve warm-up istekleri bloklayan I/O yapıyor
+        result = await asyncio.to_thread(warm_up)
+    except Exception as e:
+        print(f"❌ Warm-up başarısız, API hazır değil: {e}")
+        return
+    app.state.warmup = {"steps": result["steps"], "seconds": result["seconds"]}
+    app.state.graph = result["graph"]
+    print("🚀 API hazır")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Process başına tek graph ve tek FeedbackDB
+
+    Graph (node'lar, LLM client'ları, Pinecone bağlantısı) bir kez kurulur
+    ve tüm request'ler tarafından paylaşılır; node'lar request'e özel
+    durum tutmaz, state graph state'inde taşınır. Warm-up arka planda
+    çalışır: /health hemen cevap verir, /ready warm-up bitene kadar 503.
+    """
+    app.state.graph = None
+    app.state.warmup = None
+    app.state.db = FeedbackDB(write_behind=True)
+    warmup_task = asyncio.create_task(_warm_up(app))
+
+    yield
+
+    warmup_task.cancel()
+    app.state.db.close()
+    await aclose_clients()
+
+def create_app() -> FastAPI:
+    settings = get_settings()
+
+    app = FastAPI(
+        title=settings.APP_NAME,
+        version=settings.VERSION,
+        lifespan=lifespan
+    )
+    app.include_router(chat.router, prefix=settings.API_PREFIX)
+
+    # Graph çalıştıran route'lar için concurrency limiti (worker başına)
+    admission = AdmissionController(
+        max_concurrent=settings.API_MAX_CONCURRENT,
+        max_queue=settings.API_MAX_QUEUE,
+        queue_timeout=settings.API_QUEUE_TIMEOUT
+    )
+    app.state.admission = admission
+    # /chat/batch burada değil: run_batch her soru için ayrı slot alır
+    app.add_middleware(
+        AdmissionMiddleware,
+        controller=admission,
+        paths=[f"{settings.API_PREFIX}/chat", f"{settings.API_PREFIX}/chat/stream"]
+    )
+
+    # İmzalı session token'ı -> request.state.session_id (veritabanına gitmeden)
+    session_keys = [key.strip() for key in settings.SESSION_SECRET.split(",") if key.strip()]
+    if not session_keys:
+        # Geçici anahtar worker'a özel ve restart'ta değişir: diğer worker'lar
+        # token'ları reddeder, kullanıcılar session'larını kaybeder
+        if settings.ENVIRONMENT not in LOCAL_ENVIRONMENTS or settings.WEB_CONCURRENCY > 1:
+            raise RuntimeError(
+                "SESSION_SECRET tanımlı değil: tüm worker'larda aynı anahtar gerekli "
+                f"(ENVIRONMENT={settings.ENVIRONMENT}, WEB_CONCURRENCY={settings.WEB_CONCURRENCY}). "
+                "Geçici anahtar sadece tek worker'lı lokal geliştirmede kullanılabilir (ENVIRONMENT=development)."
+            )
+        print("⚠️  SESSION_SECRET tanımlı değil, geçici anahtar kullanılıyor (sadece lokal geliştirme)")
+        session_keys = [secrets.token_urlsafe(32)]
+    app.add_middleware(
+        SessionMiddleware,
+        signer=SessionSigner(session_keys, max_age=settings.SESSION_TTL_SECONDS),
+        paths=[settings.API_PREFIX],
+        cookie_name=settings.SESSION_COOKIE_NAME,
+        secure=settings.SESSION_COOKIE_SECURE
+    )
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    @app.get("/ready")
+    async def ready():
+        # Load balancer warm-up bitmeden trafik göndermesin
+        if app.state.graph is None:
+            return JSONResponse({"ready": False}, status_code=503)
+        return {"ready": True, "warmup": app.state.warmup}
+
+    @app.get("/metrics")
+    async def metrics():
+        return {
+            "admission": admission.snapshot(),
+            "llm": usage_tracker.snapshot(),
+            "cascade": cascade_tracker.snapshot()
+        }
+
+    return app
+
+app = create_app()
@@ -0,0 +1,172 @@
+"""
+Admission Control
+Aynı anda çalışan graph sayısını sınırlar; fazlası sınırlı bir kuyrukta
+bekler, kuyruk doluysa veya bekleme süresi dolarsa hemen 429 döner
+
+Her chat isteği birkaç saniye LLM çağrısı yaptığı için sınırsız eşzamanlılık
+OpenAI rate limit'ine takılıp herkesi yavaşlatır; istekleri kuyrukta
+bekletip fazlasını erken reddetmek daha iyi.
+"""
+import asyncio
+import json
+import math
+import time
+from collections import deque
+from typing import Dict, Iterable, Optional
+
+from src.core.exceptions import AdmissionRejected
+
+class AdmissionController:
+    """
+    Concurrency limiter + sınırlı bekleme kuyruğu
+
+    max_concurrent istek aynı anda çalışır, en fazla max_queue istek
+    queue_timeout saniyeye kadar sırasını bekler. Çalışma süreleri
+    Retry-After tahmini için tutulur.
+    """
+
+    def __init__(self, max_concurrent: int = 16, max_queue: int = 64, queue_timeout: float = 10.0):
+        """
+        Args:
+            max_concurrent: Aynı anda çalışan istek sayısı
+            max_queue: Sırada bekleyebilecek istek sayısı
+            queue_timeout: Kuyrukta en fazla bekleme (saniye)
+        """
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self.in_flight = 0
+        self.waiting = 0
+
+        # Metrikler
+        self.admitted = 0
+        self.rejected_full = 0
+        self.rejected_timeout = 0
+        self._wait_times = deque(maxlen=1000)
+        self._service_times = deque(maxlen=200)
+
+    # ==================== SLOT ====================
+    async def acquire(self) -> float:
+        """
+        Slot al (gerekirse kuyrukta bekle)
+
+        Returns:
+            Kuyrukta beklenen süre (saniye)
+
+        Raises:
+            AdmissionRejected: Kuyruk dolu veya queue_timeout aşıldı
+        """
+        start = time.perf_counter()
+
+        # Boş slot varsa ve sırada bekleyen yoksa beklemeden geç
+        if not (self._semaphore.locked() or self.waiting):
+            await self._semaphore.acquire()
+        else:
+            if self.waiting >= self.max_queue:
+                self.rejected_full += 1
+                raise AdmissionRejected("queue_full", self.retry_after())
+
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                self.rejected_timeout += 1
+                raise AdmissionRejected("queue_timeout", self.retry_after())
+            finally:
+                self.waiting -= 1
+
+        wait = time.perf_counter() - start
+        self.in_flight += 1
+        self.admitted += 1
+        self._wait_times.append(wait)
+        return wait
+
+    def release(self, service_time: Optional[float] = None):
+        """Slot'u bırak"""
+        self.in_flight -= 1
+        if service_time is not None:
+            self._service_times.append(service_time)
+        self._semaphore.release()
+
+    def retry_after(self) -> int:
+        """Kuyruğun boşalması için tahmini süre (saniye, en az 1)"""
+        if not self._service_times:
+            return 1
+        avg_service = sum(self._service_times) / len(self._service_times)
+        return max(1, math.ceil(avg_service * (self.waiting + 1) / self.max_concurrent))
+
+    # ==================== METRICS ====================
+    def snapshot(self) -> Dict:
+        """Anlık kuyruk durumu ve bekleme süresi dağılımı"""
+        waits = sorted(self._wait_times)
+
+        def percentile(p: int) -> float:
+            if not waits:
+                return 0.0
+            return round(waits[min(len(waits) - 1, int(len(waits) * p / 100))] * 1000, 2)
+
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "queue_timeout": self.queue_timeout,
+            "in_flight": self.in_flight,
+            "queue_depth": self.waiting,
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected_full,
+            "rejected_queue_timeout": self.rejected_timeout,
+            "wait_ms_p50": percentile(50),
+            "wait_ms_p90": percentile(90),
+            "wait_ms_p99": percentile(99),
+        }
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware: verilen path'lere gelen istekleri AdmissionController'dan geçirir
+
+    Saf ASGI olarak yazıldı (BaseHTTPMiddleware değil), böylece slot
+    StreamingResponse (SSE) bitene kadar tutulur.
+    """
+
+    def __init__(self, app, controller: AdmissionController, paths: Iterable[str]):
+        """
+        Args:
+            app: ASGI uygulaması
+            controller: Paylaşılan AdmissionController
+            paths: Sınırlanan path'ler (tam eşleşme; sondaki "/" yok sayılır)
+        """
+        self.app = app
+        self.controller = controller
+        self.paths = frozenset(path.rstrip("/") for path in paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].rstrip("/") not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await self.controller.acquire()
+        except AdmissionRejected as e:
+            await self._reject(send, e)
+            return
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(time.perf_counter() - start)
+
+    @staticmethod
+    async def _reject(send, error: AdmissionRejected):
+        body = json.dumps({"detail": "Servis yoğun, lütfen tekrar deneyin", "reason": error.reason}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(error.retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
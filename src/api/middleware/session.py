@@ -0,0 +1,175 @@
+"""
+Session Middleware
+HMAC imzalı, veritabanı gerektirmeyen session token'ları
+
+Token client'ta (cookie veya X-Session-Token header) tutulur, her istekte
+sadece imzası kontrol edilir; secret tüm worker'larda aynı olduğu sürece
+hangi worker'a gelirse gelsin aynı session_id çıkar. session_id graph'ın
+MemoryService'te kullandığı id'dir.
+
+Token formatı: <session_id>.<issued_at (base36)>.<imza (base64url, 16 byte)>
+"""
+import base64
+import hashlib
+import hmac
+import secrets
+import time
+from http.cookies import SimpleCookie
+from typing import Iterable, List, Optional, Tuple
+
+SESSION_HEADER = "x-session-token"
+SIGNATURE_BYTES = 16
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+def _base36(value: int) -> str:
+    digits = "0123456789abcdefghijklmnopqrstuvwxyz"
+    result = ""
+    while True:
+        value, remainder = divmod(value, 36)
+        result = digits[remainder] + result
+        if not value:
+            return result
+
+class SessionSigner:
+    """
+    Session token üretir ve doğrular
+
+    Birden fazla secret verilirse ilki imzalar, hepsi doğrular
+    (secret rotation sırasında eski token'lar geçerli kalır).
+    """
+
+    def __init__(self, keys: List[str], max_age: int = 86400):
+        """
+        Args:
+            keys: İmza anahtarları (ilki aktif)
+            max_age: Token geçerlilik süresi (saniye)
+        """
+        if not keys:
+            raise ValueError("En az bir session secret gerekli")
+        self.keys = [key.encode() for key in keys]
+        self.max_age = max_age
+
+    def _signature(self, key: bytes, payload: str) -> str:
+        return _b64(hmac.new(key, payload.encode(), hashlib.sha256).digest()[:SIGNATURE_BYTES])
+
+    @staticmethod
+    def new_session_id() -> str:
+        """128 bit rastgele session id (22 karakter)"""
+        return _b64(secrets.token_bytes(16))
+
+    def sign(self, session_id: str, issued_at: Optional[int] = None) -> str:
+        """session_id için token üret"""
+        issued_at = int(time.time()) if issued_at is None else issued_at
+        payload = f"{session_id}.{_base36(issued_at)}"
+        return f"{payload}.{self._signature(self.keys[0], payload)}"
+
+    def verify(self, token: Optional[str]) -> Optional[Tuple[str, int]]:
+        """
+        Token'ı doğrula
+
+        Returns:
+            (session_id, issued_at) veya geçersiz / süresi dolmuşsa None
+        """
+        if not token or token.count(".") != 2:
+            return None
+
+        payload, _, signature = token.rpartition(".")
+        if not any(hmac.compare_digest(signature, self._signature(key, payload)) for key in self.keys):
+            return None
+
+        session_id, _, issued = payload.partition(".")
+        try:
+            issued_at = int(issued, 36)
+        except ValueError:
+            return None
+        if not session_id or time.time() - issued_at > self.max_age:
+            return None
+        return session_id, issued_at
+
+class SessionMiddleware:
+    """
+    ASGI middleware: geçerli token yoksa yeni session açar
+
+    session_id request.state.session_id olarak route'lara geçer. Yeni
+    açılan veya ömrünün yarısını doldurmuş session'lar için response'a
+    yeni token eklenir (Set-Cookie + X-Session-Token header).
+    """
+
+    def __init__(
+        self,
+        app,
+        signer: SessionSigner,
+        paths: Iterable[str] = ("/",),
+        cookie_name: str = "hugip_session",
+        secure: bool = False
+    ):
+        """
+        Args:
+            app: ASGI uygulaması
+            signer: SessionSigner
+            paths: Session gereken path'ler (prefix eşleşmesi)
+            cookie_name: Cookie adı
+            secure: Cookie sadece HTTPS üzerinden gönderilsin
+        """
+        self.app = app
+        self.signer = signer
+        self.paths = tuple(paths)
+        self.cookie_name = cookie_name
+        self.secure = secure
+
+    def _read_token(self, scope) -> Optional[str]:
+        cookie_header = None
+        for name, value in scope.get("headers", []):
+            if name == SESSION_HEADER.encode():
+                return value.decode("latin-1")
+            if name == b"cookie":
+                cookie_header = value.decode("latin-1")
+
+        if cookie_header:
+            cookie = SimpleCookie()
+            try:
+                cookie.load(cookie_header)
+            except Exception:
+                return None
+            if self.cookie_name in cookie:
+                return cookie[self.cookie_name].value
+        return None
+
+    def _set_cookie(self, token: str) -> bytes:
+        cookie = f"{self.cookie_name}={token}; Max-Age={self.signer.max_age}; Path=/; HttpOnly; SameSite=Lax"
+        if self.secure:
+            cookie += "; Secure"
+        return cookie.encode()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.paths):
+            await self.app(scope, receive, send)
+            return
+
+        verified = self.signer.verify(self._read_token(scope))
+        if verified:
+            session_id, issued_at = verified
+            # Ömrünün yarısını dolduran token yenilenir (sliding expiry)
+            refresh = time.time() - issued_at > self.signer.max_age / 2
+        else:
+            session_id, refresh = self.signer.new_session_id(), True
+
+        scope.setdefault("state", {})["session_id"] = session_id
+
+        if not refresh:
+            await self.app(scope, receive, send)
+            return
+
+        token = self.signer.sign(session_id)
+
+        async def send_with_token(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"set-cookie", self._set_cookie(token)))
+                headers.append((SESSION_HEADER.encode(), token.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_token)
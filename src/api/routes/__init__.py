@@ -0,0 +1 @@
+"""Routes module"""
\ No newline at end of file
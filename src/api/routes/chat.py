@@ -0,0 +1,188 @@
+"""
+Chat Routes
+POST /chat (JSON) ve POST /chat/stream (Server-Sent Events)
+"""
+import json
+import time
+from typing import AsyncIterator, Dict, List, Optional
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+
+from src.core.config import get_settings
+from src.graph import initial_state, get_sources, STREAMED_NODES
+from src.graph.batch import run_batch
+
+router = APIRouter(tags=["chat"])
+
+class ChatRequest(BaseModel):
+    """Chat isteği"""
+    question: str = Field(..., min_length=1, max_length=2000)
+
+class ChatResponse(BaseModel):
+    """Chat cevabı"""
+    answer: str
+    route: str
+    sources: List[str]
+    session_id: str
+    response_time: float
+
+class BatchRequest(BaseModel):
+    """Toplu chat isteği"""
+    questions: List[str] = Field(..., min_length=1)
+
+class BatchItem(BaseModel):
+    """Toplu chat cevabındaki tek soru"""
+    index: int
+    question: str
+    answer: str
+    route: str
+    sources: List[str]
+    latency: float
+    error: Optional[str] = None
+    duplicate: bool = False
+
+class BatchResponse(BaseModel):
+    """Toplu chat cevabı"""
+    items: List[BatchItem]
+    unique: int
+    response_time: float
+
+def _graph(request: Request):
+    # Warm-up bitmeden graph yok (bkz. /ready)
+    graph = request.app.state.graph
+    if graph is None:
+        raise HTTPException(status_code=503, detail="Servis hazırlanıyor", headers={"Retry-After": "5"})
+    return graph
+
+def _session_id(request: Request) -> str:
+    # SessionMiddleware imzalı token'dan çözer veya yeni session açar
+    return request.state.session_id
+
+def _log_chat(request: Request, session_id: str, question: str, result: Dict, response_time: float):
+    """Chat history kaydı (write-behind: request'i bekletmez)"""
+    sources = get_sources(result)
+    request.app.state.db.add_chat_history(
+        session_id=session_id,
+        question=question,
+        answer=result.get("generation", ""),
+        route=result.get("decision"),
+        sources=",".join(sources) if sources else None,
+        response_time=response_time
+    )
+
+def _sse(event: str, data: Dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@router.post("/chat", response_model=ChatResponse)
+async def chat(request: Request, body: ChatRequest) -> ChatResponse:
+    """Soruyu graph'tan geçir, cevabı tek seferde döndür"""
+    session_id = _session_id(request)
+    start = time.perf_counter()
+
+    result = await _graph(request).ainvoke(initial_state(body.question, session_id))
+
+    response_time = time.perf_counter() - start
+    _log_chat(request, session_id, body.question, result, response_time)
+
+    return ChatResponse(
+        answer=result["generation"],
+        route=result["decision"],
+        sources=get_sources(result),
+        session_id=session_id,
+        response_time=response_time
+    )
+
+@router.post("/chat/batch", response_model=BatchResponse)
+async def chat_batch(request: Request, body: BatchRequest) -> BatchResponse:
+    """
+    Birden fazla soruyu tek istekte cevapla
+
+    Sorular birbirinden bağımsız (ayrı geçici session'larda) çalışır,
+    chat history'ye kaydedilmez. Aynı sorular bir kez çalıştırılır.
+    """
+    settings = get_settings()
+    if len(body.questions) > settings.API_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=422, detail=f"En fazla {settings.API_BATCH_MAX_ITEMS} soru gönderilebilir")
+    if any(not question.strip() or len(question) > 2000 for question in body.questions):
+        raise HTTPException(status_code=422, detail="Sorular boş olamaz ve 2000 karakteri geçemez")
+
+    result = await run_batch(
+        _graph(request),
+        body.questions,
+        concurrency=settings.API_BATCH_CONCURRENCY,
+        admission=request.app.state.admission
+    )
+
+    return BatchResponse(
+        items=result["items"],
+        unique=result["unique"],
+        response_time=result["seconds"]
+    )
+
+@router.post("/chat/stream")
+async def chat_stream(request: Request, body: ChatRequest) -> StreamingResponse:
+    """
+    Soruyu graph'tan geçir, cevabı token token stream et (SSE)
+
+    Event'ler:
+        route: {"route"} - router kararı
+        token: {"node", "text"} - cevap parçası
+        reset: {"node"} - reflection cevabı yeniden üretiyor, önceki token'ları sil
+        done: ChatResponse alanları - final cevap
+        error: {"detail"}
+    """
+    session_id = _session_id(request)
+    graph = _graph(request)
+
+    async def events() -> AsyncIterator[str]:
+        start = time.perf_counter()
+        final: Dict = {}
+        token_node = None
+
+        try:
+            async for mode, payload in graph.astream(
+                initial_state(body.question, session_id),
+                stream_mode=["updates", "messages"]
+            ):
+                if mode == "messages":
+                    chunk, metadata = payload
+                    node = metadata.get("langgraph_node")
+                    text = chunk.content if isinstance(chunk.content, str) else ""
+                    if node not in STREAMED_NODES or not text:
+                        continue
+                    if token_node and node != token_node:
+                        yield _sse("reset", {"node": node})
+                    token_node = node
+                    yield _sse("token", {"node": node, "text": text})
+                    continue
+
+                # updates: {node_name: state_update}
+                for node, update in payload.items():
+                    if not update:
+                        continue
+                    final.update(update)
+                    if node == "router":
+                        yield _sse("route", {"route": update.get("decision")})
+        except Exception as e:
+            yield _sse("error", {"detail": str(e)})
+            return
+
+        response_time = time.perf_counter() - start
+        _log_chat(request, session_id, body.question, final, response_time)
+
+        yield _sse("done", ChatResponse(
+            answer=final.get("generation", ""),
+            route=final.get("decision", ""),
+            sources=get_sources(final),
+            session_id=session_id,
+            response_time=response_time
+        ).model_dump())
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Proxy'lerin (nginx) buffer'lamaması için
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,4 +1,5 @@
 """Core module"""
 from .config import Settings, get_settings
+from .exceptions import AdmissionRejected
 
-__all__ = ["Settings", "get_settings"]
\ No newline at end of file
+__all__ = ["Settings", "get_settings", "AdmissionRejected"]
\ No newline at end of file
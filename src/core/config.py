@@ -2,6 +2,7 @@
 Core Configuration
 Environment variables ve settings
 """
+from typing import Any, Dict
 from pydantic_settings import BaseSettings
 from functools import lru_cache
 
@@ -12,6 +13,15 @@ class Settings(BaseSettings):
     APP_NAME: str = "Kulüp Asistanı AI Service"
     VERSION: str = "1.0.0"
     API_PREFIX: str = "/api/v1"
+    # "development" / "local" dışındaki ortamlarda SESSION_SECRET zorunlu
+    ENVIRONMENT: str = "production"
+    WEB_CONCURRENCY: int = 1  # API worker sayısı (uvicorn ve gunicorn da bu değişkeni okur)
+    API_MAX_CONCURRENT: int = 16  # Worker başına aynı anda çalışan graph
+    API_MAX_QUEUE: int = 64  # Sırada bekleyebilecek istek (dolunca 429)
+    API_QUEUE_TIMEOUT: float = 10.0  # Kuyrukta en fazla bekleme (saniye, sonra 429)
+    API_BATCH_MAX_ITEMS: int = 50  # /chat/batch isteğindeki en fazla soru
+    API_BATCH_CONCURRENCY: int = 4  # Batch içinde aynı anda çalışan graph
+    WARMUP_LLM: bool = True  # Warm-up'ta OpenAI chat client'ının bağlantısını ısıt (models listesi)
     
     # LangSmith (Observability)
     LANGCHAIN_TRACING_V2: bool = True
@@ -23,10 +33,28 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: str
     LLM_MODEL: str = "gpt-4o-mini"
     LLM_TEMPERATURE: float = 0.0
+    LLM_TIMEOUT: float = 60.0  # Tek LLM çağrısı için (saniye)
+    # Rol bazında model profili (JSON); verilmeyen alanlar LLM_* değerlerini kullanır
+    # Roller: router, generator, grader, regenerator, direct, summarizer, escalation
+    # Örn: {"router": {"model": "gpt-4.1-nano", "max_tokens": 100, "timeout": 10}}
+    LLM_ROLE_PROFILES: Dict[str, Dict[str, Any]] = {}
+    # Model cascade: RAG cevabını generator rolü (ucuz) üretir; grounding
+    # (HallucinationGrader) başarısızsa escalation rolü (güçlü) yeniden üretir
+    LLM_CASCADE: bool = False
+    LLM_ESCALATION_MODEL: str = "gpt-4o"  # escalation rolünün varsayılan modeli
+    EMBEDDING_MODEL: str = "text-embedding-3-small"
+    
+    # HTTP Client'ları (upstream başına paylaşılan pool, bkz. src/services/clients.py)
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 120.0  # Boşta bekleyen bağlantının ömrü (saniye)
+    HTTP_CONNECT_TIMEOUT: float = 5.0
+    HTTP_READ_TIMEOUT: float = 60.0
     
     # Pinecone
     PINECONE_API_KEY: str
     PINECONE_INDEX_NAME: str = "hugip-doc-index"
+    PINECONE_POOL_SIZE: int = 20  # Index connection pool boyutu
     
     # Tavily Search (Opsiyonel)
     TAVILY_API_KEY: str = ""
@@ -36,6 +64,19 @@ class Settings(BaseSettings):
     CHUNK_SIZE: int = 1000
     CHUNK_OVERLAP: int = 200
     
+    # Memory Settings
+    TOPICS_FILE: str = "data/topics.json"  # Konu keyword tablosu (yoksa varsayılan liste)
+    MEMORY_MODE: str = "window"  # "window" (son N mesaj) veya "summary" (rolling summary)
+    HISTORY_TOKEN_BUDGET: int = 600  # Router prompt'undaki history için token bütçesi
+    SUMMARY_MAX_TOKENS: int = 200
+    SESSION_BACKEND: str = "memory"  # "memory", "sqlite" (tek makine, çoklu worker) veya "redis"
+    SESSION_DB_PATH: str = "sessions.db"
+    SESSION_STORE_URL: str = ""  # Redis URL (örn. redis://localhost:6379/0)
+    SESSION_TTL_SECONDS: int = 86400
+    SESSION_SECRET: str = ""  # API session token imza anahtarı (virgülle ayrılmış, ilki aktif; tüm worker'larda aynı)
+    SESSION_COOKIE_NAME: str = "hugip_session"
+    SESSION_COOKIE_SECURE: bool = False  # HTTPS arkasında True
+    
     # .NET Backend Integration (İleride kullanılacak)
     DOTNET_BACKEND_URL: str = "http://localhost:5000"
     DOTNET_API_KEY: str = ""
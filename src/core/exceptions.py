@@ -0,0 +1,12 @@
+"""
+Exceptions
+Katmanlar arası paylaşılan hata tipleri (API, graph, script'ler)
+"""
+
+class AdmissionRejected(Exception):
+    """Kuyruk dolu veya bekleme süresi doldu"""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
@@ -0,0 +1,94 @@
+"""
+SQLite Connection Manager
+Thread-local, uzun ömürlü connection'lar (WAL mode)
+"""
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List, Tuple
+
+# Connection açılırken uygulanan pragma'lar
+SQLITE_PRAGMAS = [
+    "PRAGMA journal_mode=WAL",      # Okumalar yazmaları bloklamaz
+    "PRAGMA synchronous=NORMAL",    # WAL ile güvenli, her commit'te fsync yok
+    "PRAGMA cache_size=-20000",     # ~20MB page cache
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=5000",     # Lock varsa 5 sn bekle
+]
+
+class SQLiteConnectionManager:
+    """
+    Thread başına bir connection
+
+    Her thread ilk kullanımda kendi connection'ını açar ve tekrar kullanır.
+    Sonlanan thread'lerin connection'ları yeni connection açılırken kapatılır
+    (Streamlit script run'ları ve API executor'ları thread'leri sürekli değiştirir).
+    sqlite3 her connection'da derlenmiş statement'ları SQL metnine göre
+    cache'ler, bu yüzden sorgular sabit SQL string'leri ile çalıştırılmalı.
+    """
+
+    def __init__(self, db_path: str, cached_statements: int = 256):
+        self.db_path = db_path
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+        self._connections: List[Tuple[threading.Thread, sqlite3.Connection]] = []
+        self._lock = threading.Lock()
+
+    def get(self) -> sqlite3.Connection:
+        """Mevcut thread'in connection'ı"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.db_path,
+                cached_statements=self.cached_statements,
+                check_same_thread=False
+            )
+            conn.row_factory = sqlite3.Row
+            for pragma in SQLITE_PRAGMAS:
+                conn.execute(pragma)
+
+            self._local.conn = conn
+            with self._lock:
+                self._prune()
+                self._connections.append((threading.current_thread(), conn))
+        return conn
+
+    def _prune(self):
+        """Sonlanmış thread'lerin connection'larını kapat (lock altında çağrılır)"""
+        alive = []
+        for thread, conn in self._connections:
+            if thread.is_alive():
+                alive.append((thread, conn))
+            else:
+                conn.close()
+        self._connections = alive
+
+    def __len__(self) -> int:
+        """Açık connection sayısı"""
+        with self._lock:
+            return len(self._connections)
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Commit/rollback yöneten context manager
+
+        Örnek:
+            with manager.transaction() as conn:
+                conn.execute(INSERT_SQL, params)
+        """
+        conn = self.get()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    def close_all(self):
+        """Tüm thread'lerin connection'larını kapat"""
+        with self._lock:
+            for _, conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
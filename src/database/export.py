@@ -0,0 +1,165 @@
+"""
+Feedback / Chat History Export
+Satırları chunk chunk okuyup CSV veya Parquet dosyasına yazar,
+tablonun tamamı hiçbir zaman bellekte tutulmaz
+
+Kullanım:
+    python -m src.database.export feedback -o feedback.parquet --rating negative
+    python -m src.database.export chat_history -o chats.csv --since 2026-01-01
+"""
+import argparse
+import csv
+import os
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Union
+
+from src.database.feedback_db import FeedbackDB, PAGE_FILTER_COLUMNS
+
+# Parquet (opsiyonel)
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+EXPORT_FORMATS = ("csv", "parquet")
+
+# Parquet kolon tipleri (listede olmayan kolonlar string)
+PARQUET_TYPES = {
+    "id": "int64",
+    "response_time": "float64",
+    "question_cluster_id": "int64",
+}
+
+def _detect_format(path: str) -> str:
+    suffix = os.path.splitext(path)[1].lstrip(".").lower()
+    if suffix not in EXPORT_FORMATS:
+        raise ValueError(f"Format dosya uzantısından anlaşılamadı: {path} (csv / parquet)")
+    return suffix
+
+def _parquet_schema(columns: List[str]) -> "pa.Schema":
+    return pa.schema([
+        (column, getattr(pa, PARQUET_TYPES.get(column, "string"))())
+        for column in columns
+    ])
+
+def _parquet_value(column: str, value):
+    # SQLite created_at string, Supabase ISO string döner; diğer tipler str'e çevrilir
+    if value is None or column in PARQUET_TYPES:
+        return value
+    return value if isinstance(value, str) else str(value)
+
+def export_table(
+    db: FeedbackDB,
+    table: str,
+    path: str,
+    fmt: Optional[str] = None,
+    chunk_size: int = 5000,
+    filters: Optional[Dict[str, Optional[str]]] = None,
+    since: Union[str, datetime, None] = None,
+    until: Union[str, datetime, None] = None
+) -> Dict:
+    """
+    Tabloyu dosyaya stream ederek yaz
+
+    Args:
+        db: FeedbackDB (SQLite veya Supabase)
+        table: 'feedback' veya 'chat_history'
+        path: Çıktı dosyası
+        fmt: 'csv' / 'parquet' (None = dosya uzantısından)
+        chunk_size: Tek seferde okunan satır
+        filters: Eşitlik filtreleri (rating, route, session_id)
+        since: Bu tarihten sonra (dahil)
+        until: Bu tarihten önce (hariç)
+
+    Returns:
+        {"table", "format", "path", "rows", "seconds", "rows_per_sec", "bytes"}
+    """
+    fmt = fmt or _detect_format(path)
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Desteklenmeyen format: {fmt}")
+    if fmt == "parquet" and not PYARROW_AVAILABLE:
+        raise ImportError("Parquet export için pyarrow gerekli: pip install pyarrow")
+
+    chunks = db.iter_rows(table, chunk_size=chunk_size, filters=filters, since=since, until=until)
+    rows = 0
+    start = time.perf_counter()
+
+    if fmt == "csv":
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = None
+            for chunk in chunks:
+                if writer is None:
+                    writer = csv.DictWriter(f, fieldnames=list(chunk[0].keys()))
+                    writer.writeheader()
+                writer.writerows(chunk)
+                rows += len(chunk)
+    else:
+        parquet_writer = None
+        try:
+            for chunk in chunks:
+                if parquet_writer is None:
+                    columns = list(chunk[0].keys())
+                    schema = _parquet_schema(columns)
+                    parquet_writer = pq.ParquetWriter(path, schema, compression="zstd")
+                # Her chunk ayrı bir row group olarak yazılır
+                parquet_writer.write_table(pa.Table.from_pydict(
+                    {column: [_parquet_value(column, row.get(column)) for row in chunk] for column in columns},
+                    schema=schema
+                ))
+                rows += len(chunk)
+        finally:
+            if parquet_writer is not None:
+                parquet_writer.close()
+
+    # Hiç satır yoksa boş dosya
+    if rows == 0 and not os.path.exists(path):
+        open(path, "w").close()
+
+    seconds = time.perf_counter() - start
+    return {
+        "table": table,
+        "format": fmt,
+        "path": path,
+        "rows": rows,
+        "seconds": seconds,
+        "rows_per_sec": rows / seconds if seconds > 0 else 0.0,
+        "bytes": os.path.getsize(path),
+    }
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Feedback / chat history export (CSV, Parquet)")
+    parser.add_argument("table", choices=sorted(PAGE_FILTER_COLUMNS))
+    parser.add_argument("-o", "--output", required=True, help="Çıktı dosyası (.csv / .parquet)")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, help="Varsayılan: dosya uzantısı")
+    parser.add_argument("--db-path", default="feedback.db", help="SQLite dosyası (Supabase yoksa)")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--rating", choices=["positive", "negative"])
+    parser.add_argument("--route")
+    parser.add_argument("--session-id")
+    parser.add_argument("--since", help="YYYY-MM-DD (dahil)")
+    parser.add_argument("--until", help="YYYY-MM-DD (hariç)")
+    args = parser.parse_args(argv)
+
+    db = FeedbackDB(db_path=args.db_path, write_behind=False)
+    try:
+        result = export_table(
+            db,
+            args.table,
+            args.output,
+            fmt=args.format,
+            chunk_size=args.chunk_size,
+            filters={"rating": args.rating, "route": args.route, "session_id": args.session_id},
+            since=args.since,
+            until=args.until
+        )
+    finally:
+        db.close()
+
+    print(f"📤 {result['rows']:,} satır → {result['path']} ({result['format']}, {result['bytes'] / 1024:,.0f} KB)")
+    print(f"   ⏱️  {result['seconds']:.2f} sn, {result['rows_per_sec']:,.0f} satır/sn")
+
+if __name__ == "__main__":
+    main()
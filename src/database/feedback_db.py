@@ -4,11 +4,15 @@ Uses Supabase Python client (no psycopg2 needed!)
 Falls back to SQLite for local development
 """
 import os
+import re
 import sqlite3
-from datetime import datetime, timedelta
-from typing import Optional, List, Dict
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Iterator, List, Dict, Tuple, Union
 from pathlib import Path
 from dotenv import load_dotenv
+from src.database.connection import SQLiteConnectionManager
+from src.database.migrations import migrate, LATENCY_BUCKET_SQL, FTS_COLUMNS
+from src.database.write_behind import WriteBehindQueue
 
 load_dotenv()
 
@@ -19,10 +23,218 @@ try:
 except ImportError:
     SUPABASE_AVAILABLE = False
 
+FEEDBACK_COLUMNS = (
+    "session_id", "question", "answer", "rating", "route",
+    "sources", "issue_type", "comment", "user_email", "question_cluster_id"
+)
+CHAT_COLUMNS = ("session_id", "question", "answer", "route", "sources", "response_time", "question_cluster_id")
+
+# SQLite sorguları (sabit SQL → connection başına statement cache'ten gelir)
+INSERT_FEEDBACK_SQL = """
+    INSERT INTO feedback (session_id, question, answer, rating, route, sources, issue_type, comment, user_email, question_cluster_id)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+INSERT_CHAT_SQL = """
+    INSERT INTO chat_history (session_id, question, answer, route, sources, response_time, question_cluster_id)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+SELECT_ALL_FEEDBACK_SQL = "SELECT * FROM feedback ORDER BY created_at DESC LIMIT ?"
+SELECT_CHAT_HISTORY_SQL = "SELECT * FROM chat_history WHERE session_id = ? ORDER BY created_at DESC LIMIT ?"
+COUNT_CHATS_SQL = "SELECT COUNT(*) FROM chat_history"
+SELECT_RECENT_FEEDBACK_SQL = """
+    SELECT * FROM feedback
+    WHERE created_at >= datetime('now', '-' || ? || ' days')
+    ORDER BY created_at DESC
+"""
+
+# Analytics (Supabase karşılıkları: sql/supabase_analytics.sql)
+# Sayımlar günlük rollup tablolarından gelir (insert trigger'ları ile güncel)
+RATING_COUNTS_SQL = "SELECT rating, SUM(count) AS count FROM feedback_daily GROUP BY rating"
+ROUTE_STATS_SQL = """
+    SELECT
+        route,
+        SUM(count) AS total,
+        SUM(CASE WHEN rating = 'positive' THEN count ELSE 0 END) AS positive,
+        SUM(CASE WHEN rating = 'negative' THEN count ELSE 0 END) AS negative
+    FROM feedback_daily
+    GROUP BY route
+    ORDER BY total DESC
+"""
+ISSUE_TYPE_COUNTS_SQL = """
+    SELECT issue_type, SUM(count) AS count
+    FROM feedback_daily
+    WHERE issue_type <> ''
+    GROUP BY issue_type
+    ORDER BY count DESC
+"""
+DAILY_STATS_SQL = """
+    SELECT
+        d.day,
+        COALESCE(f.total, 0) AS feedback,
+        COALESCE(f.positive, 0) AS positive,
+        COALESCE(c.chats, 0) AS chats,
+        CASE WHEN c.rt_count > 0 THEN c.rt_sum / c.rt_count ELSE 0 END AS avg_response_time
+    FROM (
+        SELECT day FROM feedback_daily WHERE day >= ?
+        UNION
+        SELECT day FROM chat_daily WHERE day >= ?
+    ) d
+    LEFT JOIN (
+        SELECT day, SUM(count) AS total, SUM(CASE WHEN rating = 'positive' THEN count ELSE 0 END) AS positive
+        FROM feedback_daily WHERE day >= ? GROUP BY day
+    ) f ON f.day = d.day
+    LEFT JOIN (
+        SELECT day, SUM(chats) AS chats, SUM(response_time_sum) AS rt_sum, SUM(response_time_count) AS rt_count
+        FROM chat_daily WHERE day >= ? GROUP BY day
+    ) c ON c.day = d.day
+    ORDER BY d.day
+"""
+# Latency percentile'ları (chat_latency_daily histogram'ından)
+# Percentile = kümülatif sayının ilk kez p * toplam'ı geçtiği bucket'ın üst sınırı
+_LATENCY_PERCENTILES_SQL = """
+    WITH h AS (
+        SELECT {group} AS grp, bucket_ms, SUM(count) AS c
+        FROM chat_latency_daily
+        WHERE day >= ? AND (? IS NULL OR route = ?)
+        GROUP BY grp, bucket_ms
+    ), cum AS (
+        SELECT
+            grp,
+            bucket_ms,
+            SUM(c) OVER (PARTITION BY grp ORDER BY bucket_ms) AS running,
+            SUM(c) OVER (PARTITION BY grp) AS total
+        FROM h
+    )
+    SELECT
+        grp AS {group},
+        MAX(total) AS requests,
+        MIN(CASE WHEN running >= 0.50 * total THEN bucket_ms END) AS p50_ms,
+        MIN(CASE WHEN running >= 0.90 * total THEN bucket_ms END) AS p90_ms,
+        MIN(CASE WHEN running >= 0.99 * total THEN bucket_ms END) AS p99_ms
+    FROM cum
+    GROUP BY grp
+    ORDER BY grp
+"""
+LATENCY_BY_ROUTE_SQL = _LATENCY_PERCENTILES_SQL.format(group="route")
+LATENCY_BY_DAY_SQL = _LATENCY_PERCENTILES_SQL.format(group="day")
+
+# Compaction: raw satırları hâlâ duran günlerin rollup'ını yeniden hesapla
+# (arşivlenmiş günlerin rollup'ına dokunulmaz)
+REBUILD_ROLLUPS_SQL = [
+    "DELETE FROM feedback_daily WHERE day >= (SELECT date(MIN(created_at)) FROM feedback)",
+    """
+    INSERT INTO feedback_daily (day, route, rating, issue_type, count)
+    SELECT date(created_at), COALESCE(NULLIF(route, ''), 'unknown'), rating, COALESCE(issue_type, ''), COUNT(*)
+    FROM feedback
+    GROUP BY 1, 2, 3, 4
+    """,
+    "DELETE FROM chat_daily WHERE day >= (SELECT date(MIN(created_at)) FROM chat_history)",
+    "DELETE FROM chat_latency_daily WHERE day >= (SELECT date(MIN(created_at)) FROM chat_history)",
+    f"""
+    INSERT INTO chat_latency_daily (day, route, bucket_ms, count)
+    SELECT
+        date(created_at), COALESCE(NULLIF(route, ''), 'unknown'),
+        {LATENCY_BUCKET_SQL.format(rt="response_time")}, COUNT(*)
+    FROM chat_history
+    WHERE response_time > 0
+    GROUP BY 1, 2, 3
+    """,
+    """
+    INSERT INTO chat_daily (day, route, chats, response_time_sum, response_time_count)
+    SELECT
+        date(created_at), COALESCE(NULLIF(route, ''), 'unknown'), COUNT(*),
+        SUM(COALESCE(response_time, 0)), SUM(COALESCE(response_time, 0) > 0)
+    FROM chat_history
+    GROUP BY 1, 2
+    """,
+]
+# Soru kümeleri: question_cluster_id index'i üzerinde tek GROUP BY
+_TOP_QUESTIONS_SQL = """
+    SELECT c.id AS cluster_id, c.representative AS question, t.count
+    FROM (
+        SELECT question_cluster_id, COUNT(*) AS count
+        FROM {table}
+        WHERE question_cluster_id IS NOT NULL
+        GROUP BY question_cluster_id
+        ORDER BY count DESC
+        LIMIT ?
+    ) t
+    JOIN question_clusters c ON c.id = t.question_cluster_id
+    ORDER BY t.count DESC
+"""
+TOP_QUESTIONS_SQL = {
+    table: _TOP_QUESTIONS_SQL.format(table=table)
+    for table in ("feedback", "chat_history")
+}
+
+# Keyset pagination: tablo başına izin verilen eşitlik filtreleri
+PAGE_FILTER_COLUMNS = {
+    "feedback": ("rating", "route", "session_id"),
+    "chat_history": ("route", "session_id"),
+}
+
+# Full-text search: bm25 sırası (rank), eşleşen satırlar base tablodan
+SEARCH_SQL = {
+    table: f"""
+        SELECT t.*, s.rank AS score
+        FROM {table}_fts s
+        JOIN {table} t ON t.id = s.rowid
+        WHERE {table}_fts MATCH ? {{filters}}
+        ORDER BY s.rank
+        LIMIT ? OFFSET ?
+    """
+    for table in FTS_COLUMNS
+}
+_SEARCH_TOKEN_RE = re.compile(r"\w+")
+
+def build_fts_query(text: str) -> Optional[str]:
+    """
+    Kullanıcı aramasını FTS5 sorgusuna çevir
+
+    Her kelime tırnak içinde (FTS operatörleri etkisiz), hepsi
+    eşleşmeli; son kelime prefix olarak aranır ("fest" → "festup").
+    Örnek: "FESTUP ne zam" → '"festup" "ne" "zam"*'
+    """
+    tokens = _SEARCH_TOKEN_RE.findall(text.replace("ı", "i"))
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"' for token in tokens) + "*"
+
+# PostgREST varsayılan max-rows; sayfa (limit + 1) bunu aşarsa kesilir
+SUPABASE_MAX_ROWS = 1000
+
+def encode_cursor(row: Dict) -> str:
+    """Sayfanın son satırından cursor üret (created_at|id)"""
+    return f"{row['created_at']}|{row['id']}"
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    created_at, row_id = cursor.rsplit("|", 1)
+    return created_at, int(row_id)
+
+def _format_date(value: Union[str, datetime, None]) -> Optional[str]:
+    """
+    Tarih filtresini SQLite created_at formatına çevir
+
+    created_at UTC tutulur (CURRENT_TIMESTAMP); timezone'lu datetime'lar
+    önce UTC'ye çevrilir, naive datetime'lar UTC kabul edilir.
+    """
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    return value
+
 class FeedbackDB:
     """Feedback database manager - Supabase or SQLite"""
     
-    def __init__(self, db_path: str = "feedback.db"):
+    def __init__(self, db_path: str = "feedback.db", write_behind: Optional[bool] = None):
+        """
+        Args:
+            db_path: SQLite dosya yolu (Supabase yoksa)
+            write_behind: True → add_feedback/add_chat_history kayıtları
+                queue'ya ekler, background worker batch halinde yazar
+                (default: FEEDBACK_WRITE_BEHIND env variable)
+        """
         self.supabase_url = os.getenv("SUPABASE_URL")
         self.supabase_key = os.getenv("SUPABASE_KEY")
         
@@ -33,45 +245,29 @@ class FeedbackDB:
         else:
             self.db_type = "sqlite"
             self.db_path = db_path
+            self.connections = SQLiteConnectionManager(db_path)
             print(f"📊 Using SQLite database: {db_path}")
             self.init_sqlite()
+        
+        # Sorular write-behind worker'ında kümelenir (en çok sorulanlar, FAQ);
+        # senkron modda satırlar küme id'siz yazılır, --backfill doldurur
+        # Lazy import: question_clusters CLI olarak da çalışıyor (python -m)
+        from src.database.question_clusters import QuestionClusterIndex
+        self.question_clusters = QuestionClusterIndex(self)
+        
+        if write_behind is None:
+            write_behind = os.getenv("FEEDBACK_WRITE_BEHIND", "false").lower() == "true"
+        
+        self.write_queue: Optional[WriteBehindQueue] = None
+        if write_behind:
+            spill_path = str(Path(db_path).with_suffix(".spill.jsonl"))
+            self.write_queue = WriteBehindQueue(self._insert_batch, spill_path=spill_path)
+            print(f"📝 Write-behind mode (spill: {spill_path})")
     
     # ==================== SQLite ====================
     def init_sqlite(self):
-        """Create SQLite tables"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS feedback (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                session_id TEXT NOT NULL,
-                question TEXT NOT NULL,
-                answer TEXT NOT NULL,
-                route TEXT,
-                sources TEXT,
-                rating TEXT NOT NULL,
-                issue_type TEXT,
-                comment TEXT,
-                user_email TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS chat_history (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                session_id TEXT NOT NULL,
-                question TEXT NOT NULL,
-                answer TEXT NOT NULL,
-                route TEXT,
-                sources TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        conn.commit()
-        conn.close()
+        """Create/upgrade SQLite tables (versioned migrations)"""
+        migrate(self.connections.get())
     
     # ==================== ADD FEEDBACK ====================
     def add_feedback(
@@ -86,7 +282,16 @@ class FeedbackDB:
         comment: Optional[str] = None,
         user_email: Optional[str] = None
     ) -> int:
-        """Add feedback"""
+        """Add feedback (write-behind mode'da id yerine 0 döner)"""
+        if self.write_queue:
+            # Küme id'si worker'da atanır
+            self.write_queue.put("feedback", dict(zip(FEEDBACK_COLUMNS, (
+                session_id, question, answer, rating, route, sources, issue_type, comment, user_email, None
+            ))))
+            return 0
+        
+        # Request path'inde kümeleme yok (Supabase round trip, ilk kullanımda tablo yükleme)
+        cluster_id = None
         if self.db_type == "supabase":
             data = {
                 "session_id": session_id,
@@ -97,21 +302,18 @@ class FeedbackDB:
                 "sources": sources or "",
                 "issue_type": issue_type or "",
                 "comment": comment or "",
-                "user_email": user_email or ""
+                "user_email": user_email or "",
+                "question_cluster_id": cluster_id
             }
             response = self.client.table("feedback").insert(data).execute()
             return response.data[0]["id"] if response.data else 0
         else:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO feedback (session_id, question, answer, rating, route, sources, issue_type, comment, user_email)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (session_id, question, answer, rating, route, sources, issue_type, comment, user_email))
-            feedback_id = cursor.lastrowid
-            conn.commit()
-            conn.close()
-            return feedback_id
+            with self.connections.transaction() as conn:
+                cursor = conn.execute(
+                    INSERT_FEEDBACK_SQL,
+                    (session_id, question, answer, rating, route, sources, issue_type, comment, user_email, cluster_id)
+                )
+                return cursor.lastrowid
     
     # ==================== GET ALL FEEDBACK ====================
     def get_all_feedback(self, limit: int = 100) -> List[Dict]:
@@ -126,25 +328,19 @@ class FeedbackDB:
             )
             return response.data
         else:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM feedback ORDER BY created_at DESC LIMIT ?", (limit,))
-            rows = [dict(row) for row in cursor.fetchall()]
-            conn.close()
-            return rows
+            cursor = self.connections.get().execute(SELECT_ALL_FEEDBACK_SQL, (limit,))
+            return [dict(row) for row in cursor.fetchall()]
     
     # ==================== GET FEEDBACK STATS ====================
     def get_feedback_stats(self) -> Dict:
-        """Get feedback statistics"""
-        feedback_list = self.get_all_feedback(limit=10000)
-        
-        total = len(feedback_list)
-        ratings = {}
+        """Get feedback statistics (GROUP BY rating, tüm tablo üzerinde)"""
+        if self.db_type == "supabase":
+            rows = self.client.rpc("feedback_rating_counts").execute().data or []
+        else:
+            rows = self.connections.get().execute(RATING_COUNTS_SQL).fetchall()
         
-        for item in feedback_list:
-            rating = item.get("rating", "")
-            ratings[rating] = ratings.get(rating, 0) + 1
+        ratings = {row["rating"]: row["count"] for row in rows}
+        total = sum(ratings.values())
         
         positive = ratings.get("positive", 0)
         avg_rating = round((positive / total) * 100, 1) if total > 0 else 0
@@ -155,6 +351,121 @@ class FeedbackDB:
             "avg_rating": avg_rating
         }
     
+    # ==================== ANALYTICS ====================
+    def get_route_stats(self) -> List[Dict]:
+        """
+        Route bazında feedback sayıları
+        
+        Returns:
+            [{"route", "total", "positive", "negative"}, ...] (total'e göre azalan)
+        """
+        if self.db_type == "supabase":
+            return self.client.rpc("feedback_route_stats").execute().data or []
+        
+        rows = self.connections.get().execute(ROUTE_STATS_SQL).fetchall()
+        return [dict(row) for row in rows]
+    
+    def get_issue_type_counts(self) -> Dict[str, int]:
+        """Negatif feedback sorun tiplerinin dağılımı"""
+        if self.db_type == "supabase":
+            rows = self.client.rpc("feedback_issue_type_counts").execute().data or []
+        else:
+            rows = self.connections.get().execute(ISSUE_TYPE_COUNTS_SQL).fetchall()
+        
+        return {row["issue_type"]: row["count"] for row in rows}
+    
+    def get_daily_stats(self, days: int = 30) -> List[Dict]:
+        """
+        Günlük trend (rollup tablolarından)
+        
+        Returns:
+            [{"day", "feedback", "positive", "chats", "avg_response_time"}, ...] (tarihe göre artan)
+        """
+        if self.db_type == "supabase":
+            return self.client.rpc("daily_stats", {"days": days}).execute().data or []
+        
+        # Rollup günleri date(created_at), yani UTC
+        since = (datetime.now(timezone.utc).date() - timedelta(days=days)).isoformat()
+        rows = self.connections.get().execute(DAILY_STATS_SQL, (since,) * 4).fetchall()
+        return [dict(row) for row in rows]
+    
+    def get_latency_percentiles(
+        self,
+        group_by: str = "route",
+        days: int = 30,
+        route: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Cevap süresi percentile'ları (p50/p90/p99, ms)
+        
+        Günlük latency histogram'ından hesaplanır: sonuçlar 10 sn altında
+        100 ms, 60 sn altında 1 sn çözünürlüklüdür ve chat_history
+        arşivlense bile korunur.
+        
+        Args:
+            group_by: 'route' veya 'day'
+            days: Son kaç gün
+            route: Sadece bu route (None = hepsi)
+            
+        Returns:
+            [{"route" veya "day", "requests", "p50_ms", "p90_ms", "p99_ms"}, ...]
+        """
+        if group_by not in ("route", "day"):
+            raise ValueError(f"group_by 'route' veya 'day' olmalı: {group_by}")
+        
+        if self.db_type == "supabase":
+            return self.client.rpc(
+                f"latency_percentiles_by_{group_by}",
+                {"days": days, "route_filter": route}
+            ).execute().data or []
+        
+        # Rollup günleri date(created_at), yani UTC
+        since = (datetime.now(timezone.utc).date() - timedelta(days=days)).isoformat()
+        sql = LATENCY_BY_ROUTE_SQL if group_by == "route" else LATENCY_BY_DAY_SQL
+        rows = self.connections.get().execute(sql, (since, route, route)).fetchall()
+        return [dict(row) for row in rows]
+    
+    def rebuild_rollups(self):
+        """
+        Rollup tablolarını raw satırlardan yeniden hesapla (periyodik compaction)
+        
+        Trigger'lar rollup'ları yazma anında güncel tutar; bu job elle
+        yapılan düzeltmelerden sonra tutarlılığı geri getirmek içindir.
+        """
+        if self.db_type == "supabase":
+            self.client.rpc("rebuild_rollups").execute()
+            return
+        
+        with self.connections.transaction() as conn:
+            for sql in REBUILD_ROLLUPS_SQL:
+                conn.execute(sql)
+    
+    def get_top_questions(self, limit: int = 20, table: str = "feedback") -> List[Dict]:
+        """
+        En çok sorulan sorular (benzer sorular tek küme olarak sayılır)
+        
+        Küme id'si olmayan satırlar (eski satırlar, senkron yazma modu) için
+        `python -m src.database.question_clusters --backfill` çalıştırılmalı.
+        
+        Args:
+            limit: Küme sayısı
+            table: 'feedback' veya 'chat_history'
+        
+        Returns:
+            [{"cluster_id", "question", "count"}, ...] (count'a göre azalan,
+            question = kümenin temsilci sorusu)
+        """
+        if table not in TOP_QUESTIONS_SQL:
+            raise ValueError(f"Bilinmeyen tablo: {table}")
+        
+        if self.db_type == "supabase":
+            return self.client.rpc(
+                "top_question_clusters", {"source": table, "max_rows": limit}
+            ).execute().data or []
+        
+        rows = self.connections.get().execute(TOP_QUESTIONS_SQL[table], (limit,)).fetchall()
+        return [dict(row) for row in rows]
+    
     # ==================== CHAT HISTORY ====================
     def add_chat_history(
         self,
@@ -165,7 +476,14 @@ class FeedbackDB:
         sources: Optional[str] = None,
         response_time: Optional[float] = None
     ) -> int:
-        """Add chat to history"""
+        """Add chat to history (write-behind mode'da id yerine 0 döner)"""
+        if self.write_queue:
+            self.write_queue.put("chat_history", dict(zip(CHAT_COLUMNS, (
+                session_id, question, answer, route, sources, response_time or 0.0, None
+            ))))
+            return 0
+        
+        cluster_id = None  # add_feedback'teki gibi: --backfill doldurur
         if self.db_type == "supabase":
             data = {
                 "session_id": session_id,
@@ -173,21 +491,51 @@ class FeedbackDB:
                 "answer": answer,
                 "route": route or "",
                 "sources": sources or "",
-                "response_time": response_time or 0.0
+                "response_time": response_time or 0.0,
+                "question_cluster_id": cluster_id
             }
             response = self.client.table("chat_history").insert(data).execute()
             return response.data[0]["id"] if response.data else 0
         else:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO chat_history (session_id, question, answer, route, sources, response_time)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (session_id, question, answer, route, sources, response_time or 0.0))
-            chat_id = cursor.lastrowid
-            conn.commit()
-            conn.close()
-            return chat_id
+            with self.connections.transaction() as conn:
+                cursor = conn.execute(
+                    INSERT_CHAT_SQL,
+                    (session_id, question, answer, route, sources, response_time or 0.0, cluster_id)
+                )
+                return cursor.lastrowid
+    
+    # ==================== BATCH INSERT ====================
+    def _insert_batch(self, table: str, rows: List[Dict]):
+        """
+        Multi-row insert (write-behind worker kullanır)
+        
+        Args:
+            table: 'feedback' veya 'chat_history'
+            rows: Kolon adı → değer dict'leri
+        """
+        for row in rows:
+            # Eski spill kayıtlarında kolon hiç olmayabilir
+            if row.get("question_cluster_id") is None:
+                row["question_cluster_id"] = self.question_clusters.assign(row["question"])
+        
+        if self.db_type == "supabase":
+            # Supabase tarafında text kolonlarda NULL yerine boş string kullanılıyor
+            data = [
+                {k: ("" if v is None and k != "question_cluster_id" else v) for k, v in row.items()}
+                for row in rows
+            ]
+            self.client.table(table).insert(data).execute()
+        else:
+            sql, columns = (
+                (INSERT_FEEDBACK_SQL, FEEDBACK_COLUMNS) if table == "feedback"
+                else (INSERT_CHAT_SQL, CHAT_COLUMNS)
+            )
+            with self.connections.transaction() as conn:
+                conn.executemany(sql, [tuple(row[c] for c in columns) for row in rows])
+    
+    def get_write_queue_stats(self) -> Optional[Dict]:
+        """Write-behind queue metrikleri (mode kapalıysa None)"""
+        return self.write_queue.stats() if self.write_queue else None
     
     def get_chat_history(self, session_id: str, limit: int = 50) -> List[Dict]:
         """Get chat history for a session"""
@@ -202,16 +550,8 @@ class FeedbackDB:
             )
             return response.data
         else:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT * FROM chat_history WHERE session_id = ? ORDER BY created_at DESC LIMIT ?",
-                (session_id, limit)
-            )
-            rows = [dict(row) for row in cursor.fetchall()]
-            conn.close()
-            return rows
+            cursor = self.connections.get().execute(SELECT_CHAT_HISTORY_SQL, (session_id, limit))
+            return [dict(row) for row in cursor.fetchall()]
     
     def get_total_chats(self) -> int:
         """Get total chats"""
@@ -219,12 +559,7 @@ class FeedbackDB:
             response = self.client.table("chat_history").select("count", count="exact").execute()
             return response.count or 0
         else:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute("SELECT COUNT(*) FROM chat_history")
-            total = cursor.fetchone()[0]
-            conn.close()
-            return total
+            return self.connections.get().execute(COUNT_CHATS_SQL).fetchone()[0]
     
     def get_recent_feedback(self, days: int = 7) -> List[Dict]:
         """Get feedback from last N days"""
@@ -239,14 +574,233 @@ class FeedbackDB:
             )
             return response.data
         else:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT * FROM feedback
-                WHERE created_at >= datetime('now', '-' || ? || ' days')
-                ORDER BY created_at DESC
-            """, (days,))
-            rows = [dict(row) for row in cursor.fetchall()]
-            conn.close()
-            return rows
\ No newline at end of file
+            cursor = self.connections.get().execute(SELECT_RECENT_FEEDBACK_SQL, (days,))
+            return [dict(row) for row in cursor.fetchall()]
+    
+    # ==================== PAGINATION ====================
+    def get_feedback_page(
+        self,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        rating: Optional[str] = None,
+        route: Optional[str] = None,
+        since: Union[str, datetime, None] = None,
+        until: Union[str, datetime, None] = None
+    ) -> Dict:
+        """
+        Feedback'leri sayfa sayfa getir (yeniden eskiye)
+        
+        Keyset pagination (created_at, id): sayfa süresi tablo
+        büyüklüğünden ve sayfa numarasından bağımsızdır.
+        
+        Args:
+            limit: Sayfa boyutu
+            cursor: Önceki sayfanın next_cursor'ı (None = ilk sayfa)
+            rating: 'positive' / 'negative'
+            route: 'rag' / 'direct' / 'web_search'
+            since: Bu tarihten sonra (dahil)
+            until: Bu tarihten önce (hariç)
+            
+        Returns:
+            {"rows": [...], "next_cursor": str veya None (son sayfa)}
+        """
+        return self._get_page(
+            "feedback", limit, cursor,
+            {"rating": rating, "route": route}, since, until
+        )
+    
+    def get_chat_history_page(
+        self,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        session_id: Optional[str] = None,
+        route: Optional[str] = None,
+        since: Union[str, datetime, None] = None,
+        until: Union[str, datetime, None] = None
+    ) -> Dict:
+        """
+        Chat history'yi sayfa sayfa getir (yeniden eskiye)
+        
+        Args: get_feedback_page ile aynı, rating yerine session_id filtresi
+        
+        Returns:
+            {"rows": [...], "next_cursor": str veya None (son sayfa)}
+        """
+        return self._get_page(
+            "chat_history", limit, cursor,
+            {"session_id": session_id, "route": route}, since, until
+        )
+    
+    def iter_rows(
+        self,
+        table: str,
+        chunk_size: int = 5000,
+        filters: Optional[Dict[str, Optional[str]]] = None,
+        since: Union[str, datetime, None] = None,
+        until: Union[str, datetime, None] = None,
+        oldest_first: bool = False
+    ) -> Iterator[List[Dict]]:
+        """
+        Tablonun tamamını chunk chunk getir (varsayılan: yeniden eskiye)
+        
+        Export gibi tüm satırları gezen işler için: bellekte
+        aynı anda en fazla bir chunk tutulur.
+        
+        Args:
+            table: 'feedback' veya 'chat_history'
+            chunk_size: Chunk başına satır
+            filters: PAGE_FILTER_COLUMNS'taki kolonlar için eşitlik filtresi
+            since: Bu tarihten sonra (dahil)
+            until: Bu tarihten önce (hariç)
+            oldest_first: Eskiden yeniye sırala
+            
+        Yields:
+            Satır listeleri
+        """
+        if table not in PAGE_FILTER_COLUMNS:
+            raise ValueError(f"Bilinmeyen tablo: {table}")
+        if self.db_type == "supabase":
+            chunk_size = min(chunk_size, SUPABASE_MAX_ROWS - 1)
+        
+        cursor = None
+        while True:
+            page = self._get_page(table, chunk_size, cursor, filters or {}, since, until, oldest_first)
+            if page["rows"]:
+                yield page["rows"]
+            cursor = page["next_cursor"]
+            if not cursor:
+                return
+    
+    def _get_page(
+        self,
+        table: str,
+        limit: int,
+        cursor: Optional[str],
+        filters: Dict[str, Optional[str]],
+        since: Union[str, datetime, None],
+        until: Union[str, datetime, None],
+        oldest_first: bool = False
+    ) -> Dict:
+        filters = {
+            column: value for column, value in filters.items()
+            if value and column in PAGE_FILTER_COLUMNS[table]
+        }
+        since, until = _format_date(since), _format_date(until)
+        
+        # Son sayfayı anlamak için 1 fazla satır çek
+        if self.db_type == "supabase":
+            query = self.client.table(table).select("*")
+            for column, value in filters.items():
+                query = query.eq(column, value)
+            if since:
+                query = query.gte("created_at", since)
+            if until:
+                query = query.lt("created_at", until)
+            if cursor:
+                created_at, row_id = decode_cursor(cursor)
+                op = "gt" if oldest_first else "lt"
+                query = query.or_(
+                    f'created_at.{op}."{created_at}",and(created_at.eq."{created_at}",id.{op}.{row_id})'
+                )
+            rows = (
+                query.order("created_at", desc=not oldest_first)
+                .order("id", desc=not oldest_first)
+                .limit(limit + 1)
+                .execute()
+                .data
+            )
+            for row in rows:
+                # Full-text index kolonu (generated), veri değil
+                row.pop("search_vector", None)
+        else:
+            conditions, params = [], []
+            for column, value in filters.items():
+                conditions.append(f"{column} = ?")
+                params.append(value)
+            if since:
+                conditions.append("created_at >= ?")
+                params.append(since)
+            if until:
+                conditions.append("created_at < ?")
+                params.append(until)
+            if cursor:
+                conditions.append(f"(created_at, id) {'>' if oldest_first else '<'} (?, ?)")
+                params.extend(decode_cursor(cursor))
+            
+            where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+            direction = "ASC" if oldest_first else "DESC"
+            sql = f"SELECT * FROM {table} {where} ORDER BY created_at {direction}, id {direction} LIMIT ?"
+            params.append(limit + 1)
+            rows = [dict(row) for row in self.connections.get().execute(sql, params).fetchall()]
+        
+        next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+        return {"rows": rows[:limit], "next_cursor": next_cursor}
+    
+    # ==================== SEARCH ====================
+    def search(
+        self,
+        query: str,
+        table: str = "feedback",
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        rating: Optional[str] = None,
+        route: Optional[str] = None
+    ) -> Dict:
+        """
+        Soru, cevap ve yorumlarda full-text arama (alakaya göre sıralı)
+        
+        SQLite'ta FTS5 (bm25, soru eşleşmeleri daha ağır), Supabase'de
+        Postgres full-text search (search_text RPC).
+        
+        Args:
+            query: Aranan kelimeler (son kelime prefix olarak aranır)
+            table: 'feedback' veya 'chat_history'
+            limit: Sayfa boyutu
+            cursor: Önceki sayfanın next_cursor'ı (None = ilk sayfa)
+            rating: 'positive' / 'negative' (sadece feedback)
+            route: 'rag' / 'direct' / 'web_search'
+            
+        Returns:
+            {"rows": [... + "score"], "next_cursor": str veya None (son sayfa)}
+        """
+        if table not in FTS_COLUMNS:
+            raise ValueError(f"Bilinmeyen tablo: {table}")
+        
+        offset = int(cursor) if cursor else 0
+        filters = {
+            column: value for column, value in {"rating": rating, "route": route}.items()
+            if value and column in PAGE_FILTER_COLUMNS[table]
+        }
+        
+        # Son sayfayı anlamak için 1 fazla satır çek
+        if self.db_type == "supabase":
+            if not query.strip():
+                return {"rows": [], "next_cursor": None}
+            rows = self.client.rpc("search_text", {
+                "source": table,
+                "q": query,
+                "rating_filter": filters.get("rating"),
+                "route_filter": filters.get("route"),
+                "max_rows": limit + 1,
+                "skip": offset,
+            }).execute().data or []
+        else:
+            match = build_fts_query(query)
+            if not match:
+                return {"rows": [], "next_cursor": None}
+            
+            sql = SEARCH_SQL[table].format(
+                filters="".join(f" AND t.{column} = ?" for column in filters)
+            )
+            params = [match, *filters.values(), limit + 1, offset]
+            rows = [dict(row) for row in self.connections.get().execute(sql, params).fetchall()]
+        
+        next_cursor = str(offset + limit) if len(rows) > limit else None
+        return {"rows": rows[:limit], "next_cursor": next_cursor}
+    
+    def close(self):
+        """Bekleyen kayıtları yaz, SQLite connection'larını kapat"""
+        if self.write_queue:
+            self.write_queue.close()
+        if self.db_type == "sqlite":
+            self.connections.close_all()
\ No newline at end of file
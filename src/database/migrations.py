@@ -0,0 +1,315 @@
+"""
+SQLite Schema Migrations
+PRAGMA user_version ile versiyonlanan şema değişiklikleri
+
+Yeni migration eklemek için MIGRATIONS listesinin sonuna yeni versiyon ekle.
+Supabase karşılıkları: sql/supabase_migrations.sql
+"""
+import sqlite3
+from typing import Callable, List, NamedTuple, Optional, Union
+
+class Migration(NamedTuple):
+    """Tek bir şema versiyonu"""
+    version: int
+    description: str
+    # SQL statement listesi veya connection alan fonksiyon
+    apply: Union[List[str], Callable[[sqlite3.Connection], None]]
+
+# response_time (sn) → histogram bucket'ının üst sınırı (ms)
+# 0-10 sn: 100 ms, 10-60 sn: 1 sn çözünürlük, üstü tek bucket
+LATENCY_BUCKET_SQL = """CASE
+                    WHEN {rt} < 10 THEN (CAST({rt} * 10 AS INTEGER) + 1) * 100
+                    WHEN {rt} < 60 THEN (CAST({rt} AS INTEGER) + 1) * 1000
+                    ELSE 120000
+                END"""
+
+def _column_exists(conn: sqlite3.Connection, table: str, column: str) -> bool:
+    return any(row[1] == column for row in conn.execute(f"PRAGMA table_info({table})"))
+
+def _add_chat_response_time(conn: sqlite3.Connection):
+    # Bazı eski veritabanlarında kolon elle eklenmiş olabilir
+    if not _column_exists(conn, "chat_history", "response_time"):
+        conn.execute("ALTER TABLE chat_history ADD COLUMN response_time REAL DEFAULT 0.0")
+
+def _add_question_clusters(conn: sqlite3.Connection):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS question_clusters (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            representative TEXT NOT NULL,
+            normalized TEXT NOT NULL UNIQUE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    for table in ("feedback", "chat_history"):
+        if not _column_exists(conn, table, "question_cluster_id"):
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN question_cluster_id INTEGER")
+        conn.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{table}_question_cluster ON {table} (question_cluster_id)"
+        )
+
+def _add_question_cluster_generation(conn: sqlite3.Connection):
+    # rebuild_clusters her çalıştığında artar; process'lerdeki index'ler
+    # değiştiğini görünce silinmiş küme id'lerini bırakıp tablodan yeniden yükler
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS question_cluster_generation (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            generation INTEGER NOT NULL
+        )
+    """)
+    conn.execute("INSERT OR IGNORE INTO question_cluster_generation (id, generation) VALUES (1, 0)")
+
+# Full-text search tabloları: tablo → index'lenen kolonlar (ilki soru, ağırlığı yüksek)
+FTS_COLUMNS = {
+    "feedback": ("question", "answer", "comment"),
+    "chat_history": ("question", "answer"),
+}
+
+def fts_fold_sql(expr: str) -> str:
+    """
+    FTS'e giden metin ifadesi
+
+    unicode61 tokenizer küçük harfe çevirir ve aksanları siler (ş→s, İ→i)
+    ama noktasız ı'yı i'ye çevirmez; "kayıt" ve "kayit" aynı token olsun diye.
+    """
+    return f"replace(COALESCE({expr}, ''), 'ı', 'i')"
+
+def _add_fts(conn: sqlite3.Connection):
+    for table, columns in FTS_COLUMNS.items():
+        fts = f"{table}_fts"
+        column_list = ", ".join(columns)
+        new_values = ", ".join(fts_fold_sql(f"NEW.{c}") for c in columns)
+        old_values = ", ".join(fts_fold_sql(f"OLD.{c}") for c in columns)
+
+        # Contentless: metin base tabloda kalır, FTS sadece index tutar
+        conn.execute(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+                {column_list}, content='', tokenize='unicode61 remove_diacritics 2'
+            )
+        """)
+        # bm25 sıralamasında soru eşleşmeleri daha ağır
+        weights = ", ".join(["2.0"] + ["1.0"] * (len(columns) - 1))
+        conn.execute(f"INSERT INTO {fts} ({fts}, rank) VALUES ('rank', 'bm25({weights})')")
+
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{fts}_insert AFTER INSERT ON {table}
+            BEGIN
+                INSERT INTO {fts} (rowid, {column_list}) VALUES (NEW.id, {new_values});
+            END
+        """)
+        # Contentless tabloda silme eski değerlerle yapılır (retention bunu tetikler)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{fts}_delete AFTER DELETE ON {table}
+            BEGIN
+                INSERT INTO {fts} ({fts}, rowid, {column_list}) VALUES ('delete', OLD.id, {old_values});
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{fts}_update AFTER UPDATE OF {column_list} ON {table}
+            BEGIN
+                INSERT INTO {fts} ({fts}, rowid, {column_list}) VALUES ('delete', OLD.id, {old_values});
+                INSERT INTO {fts} (rowid, {column_list}) VALUES (NEW.id, {new_values});
+            END
+        """)
+        conn.execute(f"""
+            INSERT INTO {fts} (rowid, {column_list})
+            SELECT id, {", ".join(fts_fold_sql(c) for c in columns)} FROM {table}
+        """)
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "Base tables", [
+        """
+        CREATE TABLE IF NOT EXISTS feedback (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id TEXT NOT NULL,
+            question TEXT NOT NULL,
+            answer TEXT NOT NULL,
+            route TEXT,
+            sources TEXT,
+            rating TEXT NOT NULL,
+            issue_type TEXT,
+            comment TEXT,
+            user_email TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS chat_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id TEXT NOT NULL,
+            question TEXT NOT NULL,
+            answer TEXT NOT NULL,
+            route TEXT,
+            sources TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+    ]),
+    Migration(2, "chat_history.response_time", _add_chat_response_time),
+    Migration(3, "Indexes for session history, date ranges and rating/route filters", [
+        "CREATE INDEX IF NOT EXISTS idx_chat_history_session_created ON chat_history (session_id, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_chat_history_created ON chat_history (created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_feedback_created ON feedback (created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_feedback_rating_route ON feedback (rating, route)",
+    ]),
+    Migration(4, "Indexes for filtered keyset pagination", [
+        "CREATE INDEX IF NOT EXISTS idx_feedback_rating_created ON feedback (rating, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_feedback_route_created ON feedback (route, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_chat_history_route_created ON chat_history (route, created_at)",
+    ]),
+    Migration(5, "Daily rollups (feedback_daily, chat_daily) maintained by insert triggers", [
+        """
+        CREATE TABLE IF NOT EXISTS feedback_daily (
+            day TEXT NOT NULL,
+            route TEXT NOT NULL,
+            rating TEXT NOT NULL,
+            issue_type TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, route, rating, issue_type)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS chat_daily (
+            day TEXT NOT NULL,
+            route TEXT NOT NULL,
+            chats INTEGER NOT NULL DEFAULT 0,
+            response_time_sum REAL NOT NULL DEFAULT 0,
+            response_time_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, route)
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_feedback_daily AFTER INSERT ON feedback
+        BEGIN
+            INSERT INTO feedback_daily (day, route, rating, issue_type, count)
+            VALUES (
+                date(NEW.created_at),
+                COALESCE(NULLIF(NEW.route, ''), 'unknown'),
+                NEW.rating,
+                COALESCE(NEW.issue_type, ''),
+                1
+            )
+            ON CONFLICT (day, route, rating, issue_type) DO UPDATE SET count = count + 1;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_chat_daily AFTER INSERT ON chat_history
+        BEGIN
+            INSERT INTO chat_daily (day, route, chats, response_time_sum, response_time_count)
+            VALUES (
+                date(NEW.created_at),
+                COALESCE(NULLIF(NEW.route, ''), 'unknown'),
+                1,
+                COALESCE(NEW.response_time, 0),
+                COALESCE(NEW.response_time, 0) > 0
+            )
+            ON CONFLICT (day, route) DO UPDATE SET
+                chats = chats + 1,
+                response_time_sum = response_time_sum + excluded.response_time_sum,
+                response_time_count = response_time_count + excluded.response_time_count;
+        END
+        """,
+        # Mevcut satırlardan doldur
+        """
+        INSERT OR REPLACE INTO feedback_daily (day, route, rating, issue_type, count)
+        SELECT date(created_at), COALESCE(NULLIF(route, ''), 'unknown'), rating, COALESCE(issue_type, ''), COUNT(*)
+        FROM feedback
+        GROUP BY 1, 2, 3, 4
+        """,
+        """
+        INSERT OR REPLACE INTO chat_daily (day, route, chats, response_time_sum, response_time_count)
+        SELECT
+            date(created_at), COALESCE(NULLIF(route, ''), 'unknown'), COUNT(*),
+            SUM(COALESCE(response_time, 0)), SUM(COALESCE(response_time, 0) > 0)
+        FROM chat_history
+        GROUP BY 1, 2
+        """,
+    ]),
+    Migration(6, "Daily response time histogram (chat_latency_daily)", [
+        """
+        CREATE TABLE IF NOT EXISTS chat_latency_daily (
+            day TEXT NOT NULL,
+            route TEXT NOT NULL,
+            bucket_ms INTEGER NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, route, bucket_ms)
+        )
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_chat_latency_daily AFTER INSERT ON chat_history
+        WHEN NEW.response_time > 0
+        BEGIN
+            INSERT INTO chat_latency_daily (day, route, bucket_ms, count)
+            VALUES (
+                date(NEW.created_at),
+                COALESCE(NULLIF(NEW.route, ''), 'unknown'),
+                {LATENCY_BUCKET_SQL.format(rt="NEW.response_time")},
+                1
+            )
+            ON CONFLICT (day, route, bucket_ms) DO UPDATE SET count = count + 1;
+        END
+        """,
+        f"""
+        INSERT OR REPLACE INTO chat_latency_daily (day, route, bucket_ms, count)
+        SELECT
+            date(created_at), COALESCE(NULLIF(route, ''), 'unknown'),
+            {LATENCY_BUCKET_SQL.format(rt="response_time")}, COUNT(*)
+        FROM chat_history
+        WHERE response_time > 0
+        GROUP BY 1, 2, 3
+        """,
+    ]),
+    # Küme id'si olmayan satırlar: python -m src.database.question_clusters --backfill
+    Migration(7, "Question clusters (question_cluster_id on feedback and chat_history)", _add_question_clusters),
+    Migration(8, "Full-text search (feedback_fts, chat_history_fts)", _add_fts),
+    Migration(9, "Question cluster generation counter", _add_question_cluster_generation),
+]
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """Veritabanının mevcut şema versiyonu"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def migrate(conn: sqlite3.Connection, target: Optional[int] = None) -> int:
+    """
+    Bekleyen migration'ları sırayla uygula
+
+    Her migration kendi transaction'ında çalışır; hata olursa
+    o versiyon geri alınır ve exception yükseltilir.
+
+    Args:
+        conn: SQLite connection
+        target: Hedef versiyon (None = en son)
+
+    Returns:
+        Uygulama sonrası şema versiyonu
+    """
+    current = get_schema_version(conn)
+    target = MIGRATIONS[-1].version if target is None else target
+
+    for migration in MIGRATIONS:
+        if migration.version <= current or migration.version > target:
+            continue
+
+        try:
+            # IMMEDIATE: aynı anda başlayan worker'lar migration'ı sırayla uygular
+            conn.execute("BEGIN IMMEDIATE")
+            if get_schema_version(conn) >= migration.version:
+                conn.execute("COMMIT")
+                current = migration.version
+                continue
+
+            if callable(migration.apply):
+                migration.apply(conn)
+            else:
+                for statement in migration.apply:
+                    conn.execute(statement)
+            # PRAGMA parametre almıyor, versiyon int olduğu için güvenli
+            conn.execute(f"PRAGMA user_version = {migration.version}")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        print(f"🗄️  Migration {migration.version}: {migration.description}")
+        current = migration.version
+
+    return current
@@ -0,0 +1,336 @@
+"""
+Question Clusters
+Benzer soruları (büyük/küçük harf, noktalama, aksan, yazım farkları)
+aynı kümeye atar; feedback / chat_history satırları yazılırken
+question_cluster_id alır
+
+Kullanım:
+    # Küme id'si olmayan satırları kümele (senkron yazma modu, eski satırlar)
+    python -m src.database.question_clusters --backfill
+    # Tüm satırları baştan kümele
+    python -m src.database.question_clusters --rebuild
+"""
+import argparse
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+
+from src.utils.text import normalize_question, MinHashLSH
+
+# Kümeye katılmak için temsilci soruyla minimum 3-gram Jaccard benzerliği
+SIMILARITY_THRESHOLD = 0.7
+# Kesin benzerliği hesaplanan aday sayısı (en çok LSH band'i eşleşenler)
+MAX_CANDIDATES = 16
+# Normalize soru → küme id cache'i (LRU); düşen sorular LSH ile yine bulunur
+MAX_EXACT_ENTRIES = 50000
+# Küme generation'ının tekrar okunma aralığı (saniye); SQLite'ta her assign'da
+GENERATION_CHECK_INTERVAL = {"sqlite": 0.0, "supabase": 5.0}
+
+CLUSTERED_TABLES = ("feedback", "chat_history")
+
+class QuestionClusterIndex:
+    """
+    Process içi küme index'i (MinHash/LSH)
+
+    Her küme temsilci sorusunun (ilk görülen hali) 3-gram kümesiyle tutulur.
+    Yeni soru LSH ile aday kümelere bakılır, en benzer aday eşiği geçerse
+    onun id'si döner, yoksa yeni küme açılır. Index ilk kullanımda
+    question_clusters tablosundan yüklenir.
+
+    Başka bir process rebuild_clusters çalıştırırsa kümeler silinir ve
+    generation sayacı artar; index bunu assign'dan önce görür ve silinmiş
+    id'leri döndürmek yerine tablodan yeniden yüklenir.
+    """
+
+    def __init__(self, db, threshold: float = SIMILARITY_THRESHOLD):
+        """
+        Args:
+            db: FeedbackDB
+            threshold: Kümeye katılma eşiği
+        """
+        self.db = db
+        self.threshold = threshold
+        self.lsh = MinHashLSH()
+        self._shingles: Dict[int, Set[int]] = {}
+        self._exact: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._generation: Optional[int] = None
+        self._generation_checked = 0.0
+
+    # ==================== INDEX ====================
+    def _remember(self, normalized: str, cluster_id: int):
+        self._exact[normalized] = cluster_id
+        self._exact.move_to_end(normalized)
+        if len(self._exact) > MAX_EXACT_ENTRIES:
+            self._exact.popitem(last=False)
+
+    def _register(self, cluster_id: int, normalized: str, shingles: Set[int], signature: Tuple[int, ...]):
+        self._remember(normalized, cluster_id)
+        self._shingles[cluster_id] = shingles
+        self.lsh.insert(cluster_id, signature)
+
+    def _load(self):
+        for cluster_id, normalized in self._fetch_clusters():
+            shingles = self.lsh.shingles(normalized)
+            self._register(cluster_id, normalized, shingles, self.lsh.signature(normalized, shingles))
+        self._loaded = True
+
+    def __len__(self) -> int:
+        return len(self._shingles)
+
+    def _clear(self):
+        self.lsh.clear()
+        self._shingles.clear()
+        self._exact.clear()
+        self._loaded = False
+
+    def reset(self):
+        """Index'i boşalt (bir sonraki assign tablodan yükler)"""
+        with self._lock:
+            self._clear()
+            self._generation = None
+
+    def _check_generation(self):
+        """Kümeler başka bir process'te yeniden oluşturulduysa index'i boşalt (lock altında)"""
+        now = time.monotonic()
+        interval = GENERATION_CHECK_INTERVAL.get(self.db.db_type, 0.0)
+        if self._generation is not None and now - self._generation_checked < interval:
+            return
+
+        generation = self._fetch_generation()
+        self._generation_checked = now
+        if generation != self._generation:
+            if self._generation is not None:
+                print("🧩 Soru kümeleri yeniden oluşturulmuş, index tablodan yükleniyor")
+            self._clear()
+            self._generation = generation
+
+    def assign(self, question: Optional[str]) -> Optional[int]:
+        """
+        Sorunun küme id'si (gerekirse yeni küme açar)
+
+        Kümeleme hatası (tablo yok, bağlantı hatası) yazmayı engellemez:
+        satır küme id'si olmadan yazılır, --backfill sonradan doldurur.
+
+        Returns:
+            Küme id'si (boş soru veya hata durumunda None)
+        """
+        normalized = normalize_question(question or "")
+        if not normalized:
+            return None
+
+        try:
+            return self._assign(question, normalized)
+        except Exception as e:
+            print(f"⚠️  Soru kümelenemedi, küme id'si boş yazılıyor: {e}")
+            return None
+
+    def _assign(self, question: str, normalized: str) -> int:
+        with self._lock:
+            self._check_generation()
+            if not self._loaded:
+                self._load()
+
+            cluster_id = self._exact.get(normalized)
+            if cluster_id is not None:
+                self._exact.move_to_end(normalized)
+                return cluster_id
+
+            shingles = self.lsh.shingles(normalized)
+            signature = self.lsh.signature(normalized, shingles)
+
+            best_id, best_score = None, self.threshold
+            for candidate in self.lsh.candidates(signature, limit=MAX_CANDIDATES):
+                score = self.lsh.jaccard(shingles, self._shingles[candidate])
+                if score >= best_score:
+                    best_id, best_score = candidate, score
+
+            if best_id is not None:
+                self._remember(normalized, best_id)
+                return best_id
+
+            cluster_id = self._create_cluster(question.strip(), normalized)
+            self._register(cluster_id, normalized, shingles, signature)
+            return cluster_id
+
+    # ==================== STORAGE ====================
+    def _fetch_generation(self) -> int:
+        if self.db.db_type == "supabase":
+            rows = self.db.client.table("question_cluster_generation").select("generation").execute().data
+            return rows[0]["generation"] if rows else 0
+
+        row = self.db.connections.get().execute(
+            "SELECT generation FROM question_cluster_generation WHERE id = 1"
+        ).fetchone()
+        return row[0] if row else 0
+
+    def _fetch_clusters(self) -> List[Tuple[int, str]]:
+        if self.db.db_type == "supabase":
+            clusters, last_id = [], 0
+            while True:
+                rows = (
+                    self.db.client.table("question_clusters")
+                    .select("id, normalized")
+                    .gt("id", last_id)
+                    .order("id")
+                    .limit(1000)
+                    .execute()
+                    .data
+                )
+                if not rows:
+                    return clusters
+                clusters.extend((row["id"], row["normalized"]) for row in rows)
+                last_id = rows[-1]["id"]
+
+        rows = self.db.connections.get().execute(
+            "SELECT id, normalized FROM question_clusters ORDER BY id"
+        ).fetchall()
+        return [(row["id"], row["normalized"]) for row in rows]
+
+    def _create_cluster(self, representative: str, normalized: str) -> int:
+        # normalized UNIQUE: başka bir process aynı kümeyi açtıysa onunkini kullan
+        if self.db.db_type == "supabase":
+            table = self.db.client.table("question_clusters")
+            response = table.upsert(
+                {"representative": representative, "normalized": normalized},
+                on_conflict="normalized",
+                ignore_duplicates=True
+            ).execute()
+            if not response.data:
+                response = table.select("id").eq("normalized", normalized).execute()
+            return response.data[0]["id"]
+
+        with self.db.connections.transaction() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO question_clusters (representative, normalized) VALUES (?, ?)",
+                (representative, normalized)
+            )
+            return conn.execute(
+                "SELECT id FROM question_clusters WHERE normalized = ?", (normalized,)
+            ).fetchone()[0]
+
+def _unclustered_rows(db, table: str, last_id: int, chunk_size: int) -> List[Dict]:
+    if db.db_type == "supabase":
+        return (
+            db.client.table(table)
+            .select("id, question")
+            .is_("question_cluster_id", "null")
+            .gt("id", last_id)
+            .order("id")
+            .limit(chunk_size)
+            .execute()
+            .data
+        )
+    rows = db.connections.get().execute(
+        f"SELECT id, question FROM {table} WHERE question_cluster_id IS NULL AND id > ? ORDER BY id LIMIT ?",
+        (last_id, chunk_size)
+    ).fetchall()
+    return [dict(row) for row in rows]
+
+def _set_cluster_ids(db, table: str, by_cluster: Dict[Optional[int], List[int]]):
+    if db.db_type == "supabase":
+        for cluster_id, ids in by_cluster.items():
+            db.client.table(table).update({"question_cluster_id": cluster_id}).in_("id", ids).execute()
+    else:
+        with db.connections.transaction() as conn:
+            conn.executemany(
+                f"UPDATE {table} SET question_cluster_id = ? WHERE id = ?",
+                [(cluster_id, row_id) for cluster_id, ids in by_cluster.items() for row_id in ids]
+            )
+
+def backfill_clusters(db, chunk_size: int = 5000) -> Dict:
+    """
+    Küme id'si olmayan satırları mevcut kümelere ata (gerekirse yeni küme aç)
+
+    Senkron yazma modunda (write-behind kapalı) satırlar küme id'siz yazılır;
+    bu job periyodik olarak (cron) çalıştırılır. Kümeler silinmez.
+
+    Returns:
+        {"rows", "seconds"}
+    """
+    start = time.perf_counter()
+    rows_done = 0
+    for table in CLUSTERED_TABLES:
+        last_id = 0
+        while True:
+            rows = _unclustered_rows(db, table, last_id, chunk_size)
+            if not rows:
+                break
+            by_cluster: Dict[Optional[int], List[int]] = {}
+            for row in rows:
+                cluster_id = db.question_clusters.assign(row["question"])
+                if cluster_id is not None:
+                    by_cluster.setdefault(cluster_id, []).append(row["id"])
+            _set_cluster_ids(db, table, by_cluster)
+            rows_done += len(rows)
+            last_id = rows[-1]["id"]
+
+    return {"rows": rows_done, "seconds": time.perf_counter() - start}
+
+def rebuild_clusters(db, chunk_size: int = 5000) -> Dict:
+    """
+    Tüm kümeleri silip feedback ve chat_history'yi baştan kümele
+
+    Eski satırları (küme id'si olmayan) doldurmak ve process'ler arasında
+    ayrı açılmış benzer kümeleri birleştirmek için. Generation sayacını
+    artırır; çalışan app/API process'leri index'lerini yeniden yükler.
+
+    Returns:
+        {"rows", "clusters", "seconds"}
+    """
+    start = time.perf_counter()
+    clusters = db.question_clusters
+
+    if db.db_type == "supabase":
+        db.client.table("question_clusters").delete().gt("id", 0).execute()
+        db.client.rpc("bump_question_cluster_generation").execute()
+    else:
+        with db.connections.transaction() as conn:
+            conn.execute("DELETE FROM question_clusters")
+            conn.execute("UPDATE question_cluster_generation SET generation = generation + 1 WHERE id = 1")
+    clusters.reset()
+
+    rows_done = 0
+    for table in CLUSTERED_TABLES:
+        # Eskiden yeniye: temsilci soru kümenin ilk görülen hali olur
+        for chunk in db.iter_rows(table, chunk_size=chunk_size, oldest_first=True):
+            by_cluster: Dict[Optional[int], List[int]] = {}
+            for row in chunk:
+                by_cluster.setdefault(clusters.assign(row["question"]), []).append(row["id"])
+
+            _set_cluster_ids(db, table, by_cluster)
+            rows_done += len(chunk)
+
+    return {
+        "rows": rows_done,
+        "clusters": len(clusters),
+        "seconds": time.perf_counter() - start,
+    }
+
+def main(argv: Optional[List[str]] = None):
+    from src.database.feedback_db import FeedbackDB
+
+    parser = argparse.ArgumentParser(description="Soru kümeleri")
+    parser.add_argument("--rebuild", action="store_true", help="Tüm satırları baştan kümele")
+    parser.add_argument("--backfill", action="store_true", help="Küme id'si olmayan satırları kümele")
+    parser.add_argument("--db-path", default="feedback.db", help="SQLite dosyası (Supabase yoksa)")
+    parser.add_argument("--top", type=int, default=20, help="Gösterilecek küme sayısı")
+    args = parser.parse_args(argv)
+
+    db = FeedbackDB(db_path=args.db_path, write_behind=False)
+    try:
+        if args.rebuild:
+            result = rebuild_clusters(db)
+            print(f"🧩 {result['rows']:,} satır → {result['clusters']:,} küme ({result['seconds']:.1f} sn)")
+        elif args.backfill:
+            result = backfill_clusters(db)
+            print(f"🧩 {result['rows']:,} satır kümelendi ({result['seconds']:.1f} sn)")
+        for item in db.get_top_questions(limit=args.top, table="chat_history"):
+            print(f"   {item['count']:>6}  {item['question']}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+Chat History Retention
+Retention süresinden eski chat_history satırlarını aylık sıkıştırılmış
+arşiv dosyalarına (JSONL + gzip) taşır ve tablodan siler
+
+Rollup tabloları (chat_daily, chat_latency_daily) sadece INSERT trigger'ı
+ile güncellendiği için silme işleminden etkilenmez.
+
+Kullanım:
+    python -m src.database.retention --days 90 --archive-dir archives
+"""
+import argparse
+import gzip
+import json
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from src.database.feedback_db import FeedbackDB, SUPABASE_MAX_ROWS
+
+DEFAULT_RETENTION_DAYS = int(os.getenv("CHAT_RETENTION_DAYS", "90"))
+DEFAULT_ARCHIVE_DIR = os.getenv("CHAT_ARCHIVE_DIR", "archives")
+
+# Eskiden yeniye, (created_at, id) keyset ile
+SELECT_EXPIRED_CHATS_SQL = """
+    SELECT * FROM chat_history
+    WHERE created_at < ? AND (created_at, id) > (?, ?)
+    ORDER BY created_at, id
+    LIMIT ?
+"""
+
+def archive_path(archive_dir: str, month: str) -> Path:
+    """Ayın arşiv dosyası (ör. archives/chat_history_2026-01.jsonl.gz)"""
+    return Path(archive_dir) / f"chat_history_{month}.jsonl.gz"
+
+def read_archive(path: str) -> Iterator[Dict]:
+    """
+    Arşiv dosyasındaki satırları oku
+
+    Job yazma ile silme arasında kesilirse aynı satır tekrar arşivlenebilir;
+    okuyan taraf id'ye göre tekilleştirmeli.
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def _append_to_archives(archive_dir: str, rows: List[Dict]) -> Dict[str, int]:
+    """Satırları ay bazında arşiv dosyalarına ekle ve diske yaz (fsync)"""
+    by_month: Dict[str, List[Dict]] = {}
+    for row in rows:
+        by_month.setdefault(str(row["created_at"])[:7], []).append(row)
+
+    for month, month_rows in by_month.items():
+        # Her append ayrı bir gzip member; gzip.open hepsini art arda okur
+        with open(archive_path(archive_dir, month), "ab") as raw:
+            with gzip.GzipFile(fileobj=raw, mode="wb") as f:
+                for row in month_rows:
+                    f.write((json.dumps(row, ensure_ascii=False, default=str) + "\n").encode("utf-8"))
+            raw.flush()
+            os.fsync(raw.fileno())
+
+    return {month: len(month_rows) for month, month_rows in by_month.items()}
+
+def _expired_chunks(db: FeedbackDB, cutoff: str, chunk_size: int) -> Iterator[List[Dict]]:
+    """Cutoff'tan eski satırlar, eskiden yeniye chunk chunk"""
+    if db.db_type == "supabase":
+        # Her chunk silindiği için her seferinde baştan okunur
+        chunk_size = min(chunk_size, SUPABASE_MAX_ROWS)
+        while True:
+            rows = (
+                db.client.table("chat_history")
+                .select("*")
+                .lt("created_at", cutoff)
+                .order("created_at")
+                .order("id")
+                .limit(chunk_size)
+                .execute()
+                .data
+            )
+            if not rows:
+                return
+            yield rows
+    else:
+        last_created_at, last_id = "", 0
+        while True:
+            rows = [
+                dict(row) for row in db.connections.get().execute(
+                    SELECT_EXPIRED_CHATS_SQL, (cutoff, last_created_at, last_id, chunk_size)
+                ).fetchall()
+            ]
+            if not rows:
+                return
+            yield rows
+            last_created_at, last_id = rows[-1]["created_at"], rows[-1]["id"]
+
+def _delete_rows(db: FeedbackDB, ids: List[int]):
+    if db.db_type == "supabase":
+        db.client.table("chat_history").delete().in_("id", ids).execute()
+    else:
+        with db.connections.transaction() as conn:
+            conn.executemany("DELETE FROM chat_history WHERE id = ?", [(row_id,) for row_id in ids])
+
+def compact_sqlite(db: FeedbackDB):
+    """Boşalan sayfaları geri kazan, planner istatistiklerini güncelle"""
+    conn = db.connections.get()
+    conn.commit()
+    conn.execute("VACUUM")
+    conn.execute("ANALYZE")
+    # WAL dosyasını da küçült
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+def archive_chat_history(
+    db: FeedbackDB,
+    retention_days: int = DEFAULT_RETENTION_DAYS,
+    archive_dir: str = DEFAULT_ARCHIVE_DIR,
+    chunk_size: int = 5000,
+    compact: bool = True,
+    dry_run: bool = False
+) -> Dict:
+    """
+    Retention süresinden eski chat_history satırlarını arşivle ve sil
+
+    Her chunk önce arşiv dosyasına yazılır (fsync), sonra tablodan silinir;
+    job yarıda kesilirse satır kaybolmaz. Cutoff UTC gün başıdır, böylece
+    günler bütün olarak arşivlenir.
+
+    Args:
+        db: FeedbackDB (SQLite veya Supabase)
+        retention_days: Tabloda tutulacak gün sayısı
+        archive_dir: Arşiv dosyalarının klasörü
+        chunk_size: Tek seferde taşınan satır
+        compact: SQLite'ta sonunda VACUUM + ANALYZE
+        dry_run: Sadece say, yazma/silme yapma
+
+    Returns:
+        {"cutoff", "archived", "months", "seconds", "db_size_before", "db_size_after"}
+    """
+    # UTC gece yarısı: created_at UTC (CURRENT_TIMESTAMP) ve rollup'lar gün bazında;
+    # bir günün satırlarının yalnızca bir kısmı arşivlenirse rebuild_rollups o günü eksik sayar
+    cutoff = (datetime.now(timezone.utc).date() - timedelta(days=retention_days)).strftime("%Y-%m-%d 00:00:00")
+    is_sqlite = db.db_type == "sqlite"
+    size_before = os.path.getsize(db.db_path) if is_sqlite else None
+
+    if not dry_run:
+        os.makedirs(archive_dir, exist_ok=True)
+
+    start = time.perf_counter()
+    archived = 0
+    months: Dict[str, int] = {}
+
+    if dry_run:
+        if is_sqlite:
+            archived = db.connections.get().execute(
+                "SELECT COUNT(*) FROM chat_history WHERE created_at < ?", (cutoff,)
+            ).fetchone()[0]
+        else:
+            archived = db.client.table("chat_history").select("id", count="exact").lt(
+                "created_at", cutoff
+            ).execute().count
+    else:
+        for rows in _expired_chunks(db, cutoff, chunk_size):
+            for month, count in _append_to_archives(archive_dir, rows).items():
+                months[month] = months.get(month, 0) + count
+            _delete_rows(db, [row["id"] for row in rows])
+            archived += len(rows)
+
+        if is_sqlite and compact and archived:
+            compact_sqlite(db)
+
+    return {
+        "cutoff": cutoff,
+        "archived": archived,
+        "months": months,
+        "seconds": time.perf_counter() - start,
+        "db_size_before": size_before,
+        "db_size_after": os.path.getsize(db.db_path) if is_sqlite else None,
+    }
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="chat_history retention / arşivleme")
+    parser.add_argument("--days", type=int, default=DEFAULT_RETENTION_DAYS, help="Tabloda tutulacak gün")
+    parser.add_argument("--archive-dir", default=DEFAULT_ARCHIVE_DIR)
+    parser.add_argument("--db-path", default="feedback.db", help="SQLite dosyası (Supabase yoksa)")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--no-vacuum", action="store_true", help="VACUUM/ANALYZE atla")
+    parser.add_argument("--dry-run", action="store_true", help="Sadece arşivlenecek satırları say")
+    args = parser.parse_args(argv)
+
+    db = FeedbackDB(db_path=args.db_path, write_behind=False)
+    try:
+        result = archive_chat_history(
+            db,
+            retention_days=args.days,
+            archive_dir=args.archive_dir,
+            chunk_size=args.chunk_size,
+            compact=not args.no_vacuum,
+            dry_run=args.dry_run
+        )
+    finally:
+        db.close()
+
+    action = "arşivlenecek" if args.dry_run else "arşivlendi"
+    print(f"🗃️  {result['archived']:,} satır {action} (created_at < {result['cutoff']})")
+    for month, count in sorted(result["months"].items()):
+        print(f"   {archive_path(args.archive_dir, month)}: {count:,}")
+    if result["db_size_before"] is not None and not args.dry_run:
+        print(f"   💾 {result['db_size_before'] / 1024 / 1024:,.1f} MB → {result['db_size_after'] / 1024 / 1024:,.1f} MB")
+    print(f"   ⏱️  {result['seconds']:.2f} sn")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+-- HUGİP Assistant - Feedback analytics (Supabase / PostgreSQL)
+-- FeedbackDB bu fonksiyonları client.rpc(...) ile çağırır.
+-- Supabase SQL Editor'de bir kez çalıştırılması yeterli.
+-- Önce supabase_migrations.sql (rollup tabloları) uygulanmalı.
+
+CREATE OR REPLACE FUNCTION feedback_rating_counts()
+RETURNS TABLE (rating TEXT, count BIGINT)
+LANGUAGE sql STABLE AS $$
+    SELECT rating, SUM(count)::BIGINT FROM feedback_daily GROUP BY rating;
+$$;
+
+CREATE OR REPLACE FUNCTION feedback_route_stats()
+RETURNS TABLE (route TEXT, total BIGINT, positive BIGINT, negative BIGINT)
+LANGUAGE sql STABLE AS $$
+    SELECT
+        route,
+        SUM(count)::BIGINT AS total,
+        (SUM(count) FILTER (WHERE rating = 'positive'))::BIGINT AS positive,
+        (SUM(count) FILTER (WHERE rating = 'negative'))::BIGINT AS negative
+    FROM feedback_daily
+    GROUP BY route
+    ORDER BY total DESC;
+$$;
+
+CREATE OR REPLACE FUNCTION feedback_issue_type_counts()
+RETURNS TABLE (issue_type TEXT, count BIGINT)
+LANGUAGE sql STABLE AS $$
+    SELECT issue_type, SUM(count)::BIGINT AS count
+    FROM feedback_daily
+    WHERE issue_type <> ''
+    GROUP BY issue_type
+    ORDER BY count DESC;
+$$;
+
+CREATE OR REPLACE FUNCTION daily_stats(days INT DEFAULT 30)
+RETURNS TABLE (day DATE, feedback BIGINT, positive BIGINT, chats BIGINT, avg_response_time DOUBLE PRECISION)
+LANGUAGE sql STABLE AS $$
+    WITH f AS (
+        SELECT day, SUM(count) AS total, SUM(count) FILTER (WHERE rating = 'positive') AS positive
+        FROM feedback_daily WHERE day >= CURRENT_DATE - days GROUP BY day
+    ), c AS (
+        SELECT day, SUM(chats) AS chats, SUM(response_time_sum) AS rt_sum, SUM(response_time_count) AS rt_count
+        FROM chat_daily WHERE day >= CURRENT_DATE - days GROUP BY day
+    )
+    SELECT
+        COALESCE(f.day, c.day) AS day,
+        COALESCE(f.total, 0)::BIGINT,
+        COALESCE(f.positive, 0)::BIGINT,
+        COALESCE(c.chats, 0)::BIGINT,
+        CASE WHEN c.rt_count > 0 THEN c.rt_sum / c.rt_count ELSE 0 END
+    FROM f FULL OUTER JOIN c ON f.day = c.day
+    ORDER BY 1;
+$$;
+
+CREATE OR REPLACE FUNCTION rebuild_rollups()
+RETURNS VOID
+LANGUAGE sql AS $$
+    DELETE FROM feedback_daily WHERE day >= (SELECT MIN(created_at)::date FROM feedback);
+    INSERT INTO feedback_daily (day, route, rating, issue_type, count)
+    SELECT created_at::date, COALESCE(NULLIF(route, ''), 'unknown'), rating, COALESCE(issue_type, ''), COUNT(*)
+    FROM feedback GROUP BY 1, 2, 3, 4;
+
+    DELETE FROM chat_daily WHERE day >= (SELECT MIN(created_at)::date FROM chat_history);
+    INSERT INTO chat_daily (day, route, chats, response_time_sum, response_time_count)
+    SELECT
+        created_at::date, COALESCE(NULLIF(route, ''), 'unknown'), COUNT(*),
+        SUM(COALESCE(response_time, 0)), COUNT(*) FILTER (WHERE response_time > 0)
+    FROM chat_history GROUP BY 1, 2;
+
+    DELETE FROM chat_latency_daily WHERE day >= (SELECT MIN(created_at)::date FROM chat_history);
+    INSERT INTO chat_latency_daily (day, route, bucket_ms, count)
+    SELECT created_at::date, COALESCE(NULLIF(route, ''), 'unknown'), latency_bucket_ms(response_time), COUNT(*)
+    FROM chat_history WHERE response_time > 0 GROUP BY 1, 2, 3;
+$$;
+
+-- Eski imza (soruları string olarak gruplayan versiyon)
+DROP FUNCTION IF EXISTS feedback_top_questions(INT);
+
+CREATE OR REPLACE FUNCTION top_question_clusters(source TEXT DEFAULT 'feedback', max_rows INT DEFAULT 20)
+RETURNS TABLE (cluster_id BIGINT, question TEXT, count BIGINT)
+LANGUAGE plpgsql STABLE AS $$
+BEGIN
+    IF source NOT IN ('feedback', 'chat_history') THEN
+        RAISE EXCEPTION 'Bilinmeyen tablo: %', source;
+    END IF;
+    RETURN QUERY EXECUTE format(
+        'SELECT c.id, c.representative, t.count
+         FROM (
+             SELECT question_cluster_id, COUNT(*) AS count
+             FROM %I
+             WHERE question_cluster_id IS NOT NULL
+             GROUP BY question_cluster_id
+             ORDER BY count DESC
+             LIMIT $1
+         ) t
+         JOIN question_clusters c ON c.id = t.question_cluster_id
+         ORDER BY t.count DESC',
+        source
+    ) USING max_rows;
+END;
+$$;
+
+-- Percentile = kümülatif sayının ilk kez p * toplam'ı geçtiği bucket'ın üst sınırı
+CREATE OR REPLACE FUNCTION latency_percentiles_by_route(days INT DEFAULT 30, route_filter TEXT DEFAULT NULL)
+RETURNS TABLE (route TEXT, requests BIGINT, p50_ms INT, p90_ms INT, p99_ms INT)
+LANGUAGE sql STABLE AS $$
+    WITH h AS (
+        SELECT l.route AS grp, bucket_ms, SUM(count) AS c
+        FROM chat_latency_daily l
+        WHERE day >= CURRENT_DATE - days AND (route_filter IS NULL OR l.route = route_filter)
+        GROUP BY 1, 2
+    ), cum AS (
+        SELECT grp, bucket_ms,
+            SUM(c) OVER (PARTITION BY grp ORDER BY bucket_ms) AS running,
+            SUM(c) OVER (PARTITION BY grp) AS total
+        FROM h
+    )
+    SELECT
+        grp, MAX(total)::BIGINT,
+        MIN(bucket_ms) FILTER (WHERE running >= 0.50 * total),
+        MIN(bucket_ms) FILTER (WHERE running >= 0.90 * total),
+        MIN(bucket_ms) FILTER (WHERE running >= 0.99 * total)
+    FROM cum GROUP BY grp ORDER BY grp;
+$$;
+
+CREATE OR REPLACE FUNCTION latency_percentiles_by_day(days INT DEFAULT 30, route_filter TEXT DEFAULT NULL)
+RETURNS TABLE (day DATE, requests BIGINT, p50_ms INT, p90_ms INT, p99_ms INT)
+LANGUAGE sql STABLE AS $$
+    WITH h AS (
+        SELECT l.day AS grp, bucket_ms, SUM(count) AS c
+        FROM chat_latency_daily l
+        WHERE l.day >= CURRENT_DATE - days AND (route_filter IS NULL OR route = route_filter)
+        GROUP BY 1, 2
+    ), cum AS (
+        SELECT grp, bucket_ms,
+            SUM(c) OVER (PARTITION BY grp ORDER BY bucket_ms) AS running,
+            SUM(c) OVER (PARTITION BY grp) AS total
+        FROM h
+    )
+    SELECT
+        grp, MAX(total)::BIGINT,
+        MIN(bucket_ms) FILTER (WHERE running >= 0.50 * total),
+        MIN(bucket_ms) FILTER (WHERE running >= 0.90 * total),
+        MIN(bucket_ms) FILTER (WHERE running >= 0.99 * total)
+    FROM cum GROUP BY grp ORDER BY grp;
+$$;
+
+-- Full-text arama (FeedbackDB.search); satırlar + score (yüksek = daha alakalı)
+CREATE OR REPLACE FUNCTION search_text(
+    source TEXT,
+    q TEXT,
+    rating_filter TEXT DEFAULT NULL,
+    route_filter TEXT DEFAULT NULL,
+    max_rows INT DEFAULT 20,
+    skip INT DEFAULT 0
+)
+RETURNS SETOF JSONB
+LANGUAGE plpgsql STABLE AS $$
+BEGIN
+    IF source NOT IN ('feedback', 'chat_history') THEN
+        RAISE EXCEPTION 'Bilinmeyen tablo: %', source;
+    END IF;
+    RETURN QUERY EXECUTE format(
+        'SELECT (to_jsonb(t) - ''search_vector'') || jsonb_build_object(''score'', ts_rank_cd(t.search_vector, query))
+         FROM %I t, websearch_to_tsquery(''turkish'', $1) query
+         WHERE t.search_vector @@ query
+           %s
+           AND ($3 IS NULL OR t.route = $3)
+         ORDER BY ts_rank_cd(t.search_vector, query) DESC, t.id DESC
+         LIMIT $4 OFFSET $5',
+        source,
+        -- chat_history'de rating kolonu yok
+        CASE WHEN source = 'feedback' THEN 'AND ($2 IS NULL OR t.rating = $2)' ELSE '' END
+    ) USING q, rating_filter, route_filter, max_rows, skip;
+END;
+$$;
@@ -0,0 +1,175 @@
+-- HUGİP Assistant - Schema migrations (Supabase / PostgreSQL)
+-- src/database/migrations.py'deki SQLite versiyonlarının karşılıkları.
+-- Yeni versiyonları sırayla Supabase SQL Editor'de çalıştır.
+
+-- Version 2: chat_history.response_time
+ALTER TABLE chat_history ADD COLUMN IF NOT EXISTS response_time DOUBLE PRECISION DEFAULT 0.0;
+
+-- Version 3: Indexes for session history, date ranges and rating/route filters
+CREATE INDEX IF NOT EXISTS idx_chat_history_session_created ON chat_history (session_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_chat_history_created ON chat_history (created_at);
+CREATE INDEX IF NOT EXISTS idx_feedback_created ON feedback (created_at);
+CREATE INDEX IF NOT EXISTS idx_feedback_rating_route ON feedback (rating, route);
+
+-- Version 4: Indexes for filtered keyset pagination
+CREATE INDEX IF NOT EXISTS idx_feedback_rating_created ON feedback (rating, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_feedback_route_created ON feedback (route, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_chat_history_route_created ON chat_history (route, created_at, id);
+
+-- Version 5: Daily rollups (feedback_daily, chat_daily) maintained by insert triggers
+CREATE TABLE IF NOT EXISTS feedback_daily (
+    day DATE NOT NULL,
+    route TEXT NOT NULL,
+    rating TEXT NOT NULL,
+    issue_type TEXT NOT NULL,
+    count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, route, rating, issue_type)
+);
+
+CREATE TABLE IF NOT EXISTS chat_daily (
+    day DATE NOT NULL,
+    route TEXT NOT NULL,
+    chats BIGINT NOT NULL DEFAULT 0,
+    response_time_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    response_time_count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, route)
+);
+
+CREATE OR REPLACE FUNCTION trg_feedback_daily() RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO feedback_daily (day, route, rating, issue_type, count)
+    VALUES (NEW.created_at::date, COALESCE(NULLIF(NEW.route, ''), 'unknown'), NEW.rating, COALESCE(NEW.issue_type, ''), 1)
+    ON CONFLICT (day, route, rating, issue_type) DO UPDATE SET count = feedback_daily.count + 1;
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS feedback_daily_rollup ON feedback;
+CREATE TRIGGER feedback_daily_rollup AFTER INSERT ON feedback
+    FOR EACH ROW EXECUTE FUNCTION trg_feedback_daily();
+
+CREATE OR REPLACE FUNCTION trg_chat_daily() RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO chat_daily (day, route, chats, response_time_sum, response_time_count)
+    VALUES (
+        NEW.created_at::date,
+        COALESCE(NULLIF(NEW.route, ''), 'unknown'),
+        1,
+        COALESCE(NEW.response_time, 0),
+        CASE WHEN COALESCE(NEW.response_time, 0) > 0 THEN 1 ELSE 0 END
+    )
+    ON CONFLICT (day, route) DO UPDATE SET
+        chats = chat_daily.chats + 1,
+        response_time_sum = chat_daily.response_time_sum + EXCLUDED.response_time_sum,
+        response_time_count = chat_daily.response_time_count + EXCLUDED.response_time_count;
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS chat_daily_rollup ON chat_history;
+CREATE TRIGGER chat_daily_rollup AFTER INSERT ON chat_history
+    FOR EACH ROW EXECUTE FUNCTION trg_chat_daily();
+
+INSERT INTO feedback_daily (day, route, rating, issue_type, count)
+SELECT created_at::date, COALESCE(NULLIF(route, ''), 'unknown'), rating, COALESCE(issue_type, ''), COUNT(*)
+FROM feedback
+GROUP BY 1, 2, 3, 4
+ON CONFLICT (day, route, rating, issue_type) DO UPDATE SET count = EXCLUDED.count;
+
+INSERT INTO chat_daily (day, route, chats, response_time_sum, response_time_count)
+SELECT
+    created_at::date, COALESCE(NULLIF(route, ''), 'unknown'), COUNT(*),
+    SUM(COALESCE(response_time, 0)), COUNT(*) FILTER (WHERE response_time > 0)
+FROM chat_history
+GROUP BY 1, 2
+ON CONFLICT (day, route) DO UPDATE SET
+    chats = EXCLUDED.chats,
+    response_time_sum = EXCLUDED.response_time_sum,
+    response_time_count = EXCLUDED.response_time_count;
+
+-- Version 6: Daily response time histogram (chat_latency_daily)
+-- Bucket = üst sınır (ms): 0-10 sn 100 ms, 10-60 sn 1 sn çözünürlük, üstü 120000
+CREATE OR REPLACE FUNCTION latency_bucket_ms(rt DOUBLE PRECISION) RETURNS INT
+LANGUAGE sql IMMUTABLE AS $$
+    SELECT CASE
+        WHEN rt < 10 THEN (FLOOR(rt * 10)::INT + 1) * 100
+        WHEN rt < 60 THEN (FLOOR(rt)::INT + 1) * 1000
+        ELSE 120000
+    END;
+$$;
+
+CREATE TABLE IF NOT EXISTS chat_latency_daily (
+    day DATE NOT NULL,
+    route TEXT NOT NULL,
+    bucket_ms INT NOT NULL,
+    count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, route, bucket_ms)
+);
+
+CREATE OR REPLACE FUNCTION trg_chat_latency_daily() RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF COALESCE(NEW.response_time, 0) > 0 THEN
+        INSERT INTO chat_latency_daily (day, route, bucket_ms, count)
+        VALUES (NEW.created_at::date, COALESCE(NULLIF(NEW.route, ''), 'unknown'), latency_bucket_ms(NEW.response_time), 1)
+        ON CONFLICT (day, route, bucket_ms) DO UPDATE SET count = chat_latency_daily.count + 1;
+    END IF;
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS chat_latency_daily_rollup ON chat_history;
+CREATE TRIGGER chat_latency_daily_rollup AFTER INSERT ON chat_history
+    FOR EACH ROW EXECUTE FUNCTION trg_chat_latency_daily();
+
+INSERT INTO chat_latency_daily (day, route, bucket_ms, count)
+SELECT created_at::date, COALESCE(NULLIF(route, ''), 'unknown'), latency_bucket_ms(response_time), COUNT(*)
+FROM chat_history
+WHERE response_time > 0
+GROUP BY 1, 2, 3
+ON CONFLICT (day, route, bucket_ms) DO UPDATE SET count = EXCLUDED.count;
+
+-- Version 7: Question clusters (question_cluster_id on feedback and chat_history)
+-- Küme id'si olmayan satırlar: python -m src.database.question_clusters --backfill
+CREATE TABLE IF NOT EXISTS question_clusters (
+    id BIGSERIAL PRIMARY KEY,
+    representative TEXT NOT NULL,
+    normalized TEXT NOT NULL UNIQUE,
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+ALTER TABLE feedback ADD COLUMN IF NOT EXISTS question_cluster_id BIGINT;
+ALTER TABLE chat_history ADD COLUMN IF NOT EXISTS question_cluster_id BIGINT;
+CREATE INDEX IF NOT EXISTS idx_feedback_question_cluster ON feedback (question_cluster_id);
+CREATE INDEX IF NOT EXISTS idx_chat_history_question_cluster ON chat_history (question_cluster_id);
+
+-- Version 8: Full-text search (feedback_fts, chat_history_fts)
+-- SQLite'taki FTS5 tablolarının karşılığı: generated tsvector kolonu + GIN index
+ALTER TABLE feedback ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('turkish', COALESCE(question, '')), 'A') ||
+    setweight(to_tsvector('turkish', COALESCE(answer, '')), 'B') ||
+    setweight(to_tsvector('turkish', COALESCE(comment, '')), 'B')
+) STORED;
+ALTER TABLE chat_history ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('turkish', COALESCE(question, '')), 'A') ||
+    setweight(to_tsvector('turkish', COALESCE(answer, '')), 'B')
+) STORED;
+CREATE INDEX IF NOT EXISTS idx_feedback_search ON feedback USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS idx_chat_history_search ON chat_history USING GIN (search_vector);
+
+-- Version 9: Question cluster generation counter
+-- rebuild_clusters her çalıştığında artar; çalışan process'lerin index'leri
+-- silinmiş küme id'lerini bırakıp tablodan yeniden yüklenir
+CREATE TABLE IF NOT EXISTS question_cluster_generation (
+    id INT PRIMARY KEY CHECK (id = 1),
+    generation BIGINT NOT NULL
+);
+INSERT INTO question_cluster_generation (id, generation) VALUES (1, 0) ON CONFLICT (id) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION bump_question_cluster_generation()
+RETURNS BIGINT
+LANGUAGE sql AS $$
+    UPDATE question_cluster_generation SET generation = generation + 1 WHERE id = 1 RETURNING generation;
+$$;
@@ -0,0 +1,294 @@
+"""
+Write-Behind Queue
+Chat history ve feedback kayıtlarını request path dışında, batch halinde yazar
+"""
+import atexit
+import glob
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional, Tuple
+
+# (table, rows) alıp backend'e toplu insert yapan fonksiyon
+FlushFn = Callable[[str, List[Dict]], None]
+
+def _pid_alive(pid: int) -> bool:
+    """Process hâlâ çalışıyor mu (aynı makinede)"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+class WriteBehindQueue:
+    """
+    Bounded in-memory queue + background flush worker
+
+    - Kayıtlar queue'ya eklenir, çağıran taraf beklemez
+    - Worker batch_size kayıt veya flush_interval saniye dolunca
+      tablo başına tek bir multi-row insert yapar
+    - Backend hata verirse (veya queue doluysa) kayıtlar spill dosyasına
+      (JSONL) yazılır ve bir sonraki başarılı flush'ta tekrar denenir
+    - Process kapanırken kalan kayıtlar flush edilir (atexit)
+
+    Aynı spill dosyasını paylaşan birden fazla process (API worker'ları)
+    olabilir: replay, dosyayı process'e özel bir isimle atomik olarak
+    devralır, böylece iki worker aynı kayıtları yazmaz veya kaybetmez.
+    Replay dosyası kayıtlar yazıldıktan sonra silinir; replay sırasında
+    ölen process'lerin dosyaları açılışta spill'e geri alınır (en az bir
+    kez yazım). Tek başına da yazılamayan kayıtlar max_attempts replay'den
+    sonra dead-letter dosyasına taşınır.
+    """
+
+    def __init__(
+        self,
+        flush_fn: FlushFn,
+        spill_path: str = "write_behind_spill.jsonl",
+        max_size: int = 10000,
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+        max_attempts: int = 3
+    ):
+        """
+        Args:
+            flush_fn: Toplu insert fonksiyonu
+            spill_path: Backend erişilemezken kayıtların yazılacağı dosya
+            max_size: Queue kapasitesi
+            batch_size: Tek flush'taki maksimum kayıt
+            flush_interval: Batch dolmasa bile flush aralığı (saniye)
+            max_attempts: Tek başına yazılamayan kaydın dead-letter'a
+                taşınmadan önceki replay denemesi
+        """
+        self.flush_fn = flush_fn
+        self.spill_path = spill_path
+        root, ext = os.path.splitext(spill_path)
+        self.dead_letter_path = f"{root}.dead{ext or '.jsonl'}"
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_attempts = max_attempts
+
+        self._queue: "queue.Queue[Tuple[str, Dict]]" = queue.Queue(maxsize=max_size)
+        self._spill_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._metrics_lock = threading.Lock()
+
+        self.metrics = {
+            "enqueued": 0,
+            "flushed": 0,
+            "spilled": 0,
+            "dead_lettered": 0,
+            "failed_flushes": 0,
+            "flush_count": 0,
+            "total_flush_ms": 0.0,
+            "max_flush_ms": 0.0,
+            "last_flush_ms": 0.0,
+        }
+
+        self._recover_orphaned_replays()
+
+        self._worker = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._worker.start()
+        atexit.register(self.close)
+
+    # ==================== PRODUCER ====================
+    def put(self, table: str, row: Dict):
+        """Kaydı queue'ya ekle (bloklamaz)"""
+        try:
+            self._queue.put_nowait((table, row))
+            self._count("enqueued")
+        except queue.Full:
+            # Queue dolu: kaydı kaybetme, diske yaz
+            self._spill([(table, row)])
+
+    # ==================== WORKER ====================
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._take_batch(timeout=self.flush_interval)
+            if batch:
+                self._flush(batch)
+
+    def _take_batch(self, timeout: float) -> List[Tuple[str, Dict]]:
+        """Queue'dan en fazla batch_size kayıt al (timeout kadar bekle)"""
+        batch = []
+        deadline = time.monotonic() + timeout
+
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _flush(self, batch: List[Tuple[str, Dict]]):
+        """Batch'i yaz, başarısız kayıtları spill et"""
+        failed = self._write(batch)
+
+        if failed:
+            self._spill(failed)
+        elif os.path.exists(self.spill_path):
+            # Backend tekrar erişilebilir → spill dosyasını geri yükle
+            self._replay_spill()
+
+    def _write(self, batch: List[Tuple[str, Dict]]) -> List[Tuple[str, Dict]]:
+        """
+        Batch'i tablo başına tek insert ile yaz
+
+        Returns:
+            Yazılamayan kayıtlar
+        """
+        by_table: Dict[str, List[Dict]] = {}
+        for table, row in batch:
+            by_table.setdefault(table, []).append(row)
+
+        start = time.perf_counter()
+        failed = []
+        for table, rows in by_table.items():
+            try:
+                self.flush_fn(table, rows)
+                self._count("flushed", len(rows))
+            except Exception as e:
+                print(f"⚠️  Write-behind flush hatası ({table}, {len(rows)} kayıt): {e}")
+                self._count("failed_flushes")
+                failed.extend((table, row) for row in rows)
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self._metrics_lock:
+            self.metrics["flush_count"] += 1
+            self.metrics["total_flush_ms"] += elapsed_ms
+            self.metrics["last_flush_ms"] = elapsed_ms
+            self.metrics["max_flush_ms"] = max(self.metrics["max_flush_ms"], elapsed_ms)
+
+        return failed
+
+    # ==================== SPILL ====================
+    def _spill(self, records: List[Tuple[str, Dict]]):
+        self._append(self.spill_path, [{"table": table, "row": row} for table, row in records])
+        self._count("spilled", len(records))
+
+    def _append(self, path: str, entries: List[Dict]):
+        """JSONL dosyasına spill kayıtlarını ekle"""
+        if not entries:
+            return
+        with self._spill_lock:
+            with open(path, "a", encoding="utf-8") as f:
+                for entry in entries:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def _claim(self, path: str) -> Optional[str]:
+        """
+        Dosyayı process'e özel replay ismine taşı
+
+        Başka bir worker aynı dosyayı devralıyorsa rename'i yalnızca biri
+        kazanır (atomik). Returns: Yeni yol (dosya yoksa None)
+        """
+        replay_path = f"{self.spill_path}.{os.getpid()}-{uuid.uuid4().hex[:8]}.replay"
+        with self._spill_lock:
+            try:
+                os.replace(path, replay_path)
+            except FileNotFoundError:
+                return None
+        return replay_path
+
+    def _recover_orphaned_replays(self):
+        """Replay sırasında ölen process'lerin dosyalarını spill'e geri al"""
+        for path in glob.glob(f"{glob.escape(self.spill_path)}.*.replay"):
+            owner = os.path.basename(path)[len(os.path.basename(self.spill_path)) + 1:].split("-", 1)[0]
+            if owner.isdigit() and int(owner) != os.getpid() and _pid_alive(int(owner)):
+                continue
+            replay_path = self._claim(path)
+            if replay_path is None:
+                continue
+            with open(replay_path, encoding="utf-8") as f:
+                entries = [json.loads(line) for line in f if line.strip()]
+            self._append(self.spill_path, entries)
+            os.remove(replay_path)
+            print(f"🔁 Write-behind: yarım kalan replay'den {len(entries)} kayıt geri alındı ({os.path.basename(path)})")
+
+    def _replay_spill(self):
+        """Spill dosyasındaki kayıtları tekrar yazmayı dene"""
+        replay_path = self._claim(self.spill_path)
+        if replay_path is None:
+            return
+
+        with open(replay_path, encoding="utf-8") as f:
+            entries = [json.loads(line) for line in f if line.strip()]
+
+        print(f"🔁 Write-behind: {len(entries)} spill kaydı tekrar deneniyor")
+        retry, dead = [], []
+        backend_down = False
+        for i in range(0, len(entries), self.batch_size):
+            chunk = entries[i:i + self.batch_size]
+            if backend_down:
+                retry.extend(chunk)
+                continue
+            if not self._write([(e["table"], e["row"]) for e in chunk]):
+                continue
+
+            # Batch yazılamadı → kayıt kayıt dene, hatalı kaydı diğerlerinden ayır
+            for position, entry in enumerate(chunk):
+                if backend_down:
+                    retry.append(entry)
+                    continue
+                if not self._write([(entry["table"], entry["row"])]):
+                    continue
+                entry = {**entry, "attempts": entry.get("attempts", 0) + 1}
+                (dead if entry["attempts"] >= self.max_attempts else retry).append(entry)
+                # İlk kayıt da yazılamadı: backend yine erişilemiyor olabilir,
+                # kalanlar bir sonraki replay'de denenir
+                backend_down = position == 0
+
+        self._append(self.spill_path, retry)
+        if dead:
+            self._append(self.dead_letter_path, dead)
+            self._count("dead_lettered", len(dead))
+            print(f"☠️  Write-behind: {len(dead)} kayıt {self.max_attempts} denemede yazılamadı → {self.dead_letter_path}")
+        # Kayıtlar yazıldı veya spill/dead-letter'a geri alındı
+        os.remove(replay_path)
+
+    # ==================== METRICS ====================
+    def _count(self, name: str, value: int = 1):
+        """Sayaç artır (producer thread'leri ve worker aynı anda yazabilir)"""
+        with self._metrics_lock:
+            self.metrics[name] += value
+
+    # ==================== LIFECYCLE ====================
+    def flush(self):
+        """Queue'daki tüm kayıtları hemen yaz (çağıran thread'de)"""
+        while True:
+            batch = []
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                return
+            self._flush(batch)
+
+    def close(self):
+        """Worker'ı durdur ve kalan kayıtları flush et"""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._worker.join(timeout=self.flush_interval + 5)
+        self.flush()
+
+    def stats(self) -> Dict:
+        """Queue depth ve flush latency metrikleri"""
+        with self._metrics_lock:
+            metrics = dict(self.metrics)
+        flush_count = metrics["flush_count"]
+        return {
+            **metrics,
+            "queue_depth": self._queue.qsize(),
+            "avg_flush_ms": metrics["total_flush_ms"] / flush_count if flush_count else 0.0,
+        }
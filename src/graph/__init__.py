@@ -1,5 +1,5 @@
 """Graph module"""
 from .state import GraphState
-from .graph import build_graph
+from .graph import build_graph, initial_state, get_sources, STREAMED_NODES
 
-__all__ = ["GraphState", "build_graph"]
\ No newline at end of file
+__all__ = ["GraphState", "build_graph", "initial_state", "get_sources", "STREAMED_NODES"]
\ No newline at end of file
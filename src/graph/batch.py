@@ -0,0 +1,153 @@
+"""
+Batch Runner
+Birden fazla soruyu aynı graph üzerinden sınırlı eşzamanlılıkla çalıştırır
+(prompt regression testleri, SSS cevaplarının önceden üretilmesi,
+.NET backend'in toplu istekleri)
+
+Kullanım:
+    python -m src.graph.batch questions.txt -o answers.jsonl --concurrency 4
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from typing import Dict, List, Optional
+
+from src.graph.graph import build_graph, initial_state, get_sources
+from src.core.exceptions import AdmissionRejected
+from src.services.memory_service import MemoryService
+from src.services.vectorstore_service import get_vectorstore_service
+from src.utils.text import expand_query
+
+DEFAULT_CONCURRENCY = 4
+
+def _dedupe_key(question: str) -> str:
+    return " ".join(question.split())
+
+async def run_batch(
+    graph,
+    questions: List[str],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    embed: bool = True,
+    admission=None
+) -> Dict:
+    """
+    Soruları graph'tan geçir
+
+    Aynı sorular (boşluk farkları hariç) bir kez çalıştırılır. Tüm
+    soruların retrieve query'si (expand_query, sorunun kendi topic'i ile)
+    tek istekte embed edilir, retrieve node'u bunları cache'ten okur. Her soru kendi geçici session'ında çalışır
+    (birbirinin memory'sini görmez), session'lar sonunda silinir.
+
+    Args:
+        graph: build_graph() çıktısı
+        questions: Sorular (sıra korunur)
+        concurrency: Aynı anda çalışan graph sayısı
+        embed: Query embedding'lerini önceden toplu hesapla
+        admission: AdmissionController (API); her soru ayrı slot alır, böylece
+            batch'ler worker'ın toplam graph limitini aşamaz. Slot alınamayan
+            sorunun error'ı "admission: <sebep>" olur.
+
+    Returns:
+        {"items": [{index, question, answer, route, sources, latency, error, duplicate}],
+         "unique": int, "seconds": float}
+    """
+    start = time.perf_counter()
+    unique = list(dict.fromkeys(_dedupe_key(q) for q in questions))
+    memory = MemoryService()
+
+    if embed and unique:
+        # Geçici session'da tek mesaj var → session topic'i sorunun topic'i
+        queries = list(dict.fromkeys(expand_query(q, memory.detect_topic(q)) for q in unique))
+        try:
+            await asyncio.to_thread(get_vectorstore_service().embed_queries, queries)
+        except Exception as e:
+            # Embedding'ler retrieve sırasında tek tek hesaplanır
+            print(f"⚠️  Toplu embedding başarısız: {e}")
+
+    batch_id = uuid.uuid4().hex[:8]
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run_one(position: int, question: str) -> Dict:
+        session_id = f"batch-{batch_id}-{position}"
+        async with semaphore:
+            item_start = time.perf_counter()
+            if admission is not None:
+                try:
+                    await admission.acquire()
+                except AdmissionRejected as e:
+                    return {
+                        "answer": "", "route": "", "sources": [], "error": f"admission: {e.reason}",
+                        "latency": time.perf_counter() - item_start,
+                    }
+            run_start = time.perf_counter()
+            try:
+                result = await graph.ainvoke(initial_state(question, session_id))
+                outcome = {
+                    "answer": result.get("generation", ""),
+                    "route": result.get("decision", ""),
+                    "sources": get_sources(result),
+                    "error": None,
+                }
+            except Exception as e:
+                outcome = {"answer": "", "route": "", "sources": [], "error": str(e)}
+            finally:
+                if admission is not None:
+                    admission.release(time.perf_counter() - run_start)
+            outcome["latency"] = time.perf_counter() - item_start
+            memory.clear(session_id)
+            return outcome
+
+    results = await asyncio.gather(*(run_one(i, q) for i, q in enumerate(unique)))
+    by_question = dict(zip(unique, results))
+
+    items, seen = [], set()
+    for index, question in enumerate(questions):
+        key = _dedupe_key(question)
+        items.append({
+            "index": index,
+            "question": question,
+            **by_question[key],
+            # Tekrar eden soru: ilk geçtiği yerin sonucu kopyalanır
+            "duplicate": key in seen,
+        })
+        seen.add(key)
+
+    return {
+        "items": items,
+        "unique": len(unique),
+        "seconds": time.perf_counter() - start,
+    }
+
+def run_batch_sync(questions: List[str], graph=None, concurrency: int = DEFAULT_CONCURRENCY) -> Dict:
+    """run_batch'in senkron hali (script'ler ve testler için)"""
+    return asyncio.run(run_batch(graph or build_graph(), questions, concurrency=concurrency))
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Soruları toplu cevapla")
+    parser.add_argument("input", help="Her satırda bir soru")
+    parser.add_argument("-o", "--output", required=True, help="Çıktı (.jsonl)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    args = parser.parse_args(argv)
+
+    with open(args.input, encoding="utf-8") as f:
+        questions = [line.strip() for line in f if line.strip()]
+    if not questions:
+        print("⚠️  Soru bulunamadı")
+        return
+
+    result = run_batch_sync(questions, concurrency=args.concurrency)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        for item in result["items"]:
+            f.write(json.dumps(item, ensure_ascii=False) + "\n")
+
+    latencies = sorted(item["latency"] for item in result["items"] if not item["duplicate"])
+    errors = sum(1 for item in result["items"] if item["error"])
+    print(f"✅ {len(questions)} soru ({result['unique']} benzersiz) → {args.output}")
+    print(f"   ⏱️  {result['seconds']:.1f} sn, p50 {latencies[len(latencies) // 2]:.2f} sn, "
+          f"max {latencies[-1]:.2f} sn, {errors} hata")
+
+if __name__ == "__main__":
+    main()
@@ -16,6 +16,17 @@ from src.services.memory_service import MemoryService
 
 _memory_service = MemoryService()
 
+# Cevap token'ları stream edilen node'lar; router ve grader'ların structured
+# output'u "nostream" tag'li olduğu için bu node'larda da stream'e düşmez
+STREAMED_NODES = ("generate_rag", "reflection", "direct")
+
+def get_sources(state: GraphState) -> list:
+    """State'teki dökümanların kaynak isimleri"""
+    return [
+        doc.metadata.get("source", "Unknown")
+        for doc in state.get("documents") or []
+    ]
+
 def save_to_memory(state: GraphState) -> GraphState:
     """
     Final response'u memory'ye kaydet
@@ -25,12 +36,7 @@ def save_to_memory(state: GraphState) -> GraphState:
     
     # User mesajı zaten router'da kaydedildi
     # Şimdi assistant mesajını kaydet
-    sources = []
-    if state.get("documents"):
-        sources = [
-            doc.metadata.get("source", "Unknown") 
-            for doc in state["documents"]
-        ]
+    sources = get_sources(state)
     
     _memory_service.add_assistant_message(
         session_id=session_id,
@@ -41,6 +47,25 @@ def save_to_memory(state: GraphState) -> GraphState:
     
     return state
 
+def initial_state(question: str, session_id: str) -> GraphState:
+    """
+    Graph'a verilecek başlangıç state'i
+    
+    Args:
+        question: Kullanıcı sorusu
+        session_id: Conversation session identifier
+    """
+    return {
+        "question": question,
+        "generation": "",
+        "documents": [],
+        "decision": "",
+        "web_results": [],
+        "iterations": 0,
+        "session_id": session_id,
+        "generation_usage": {}
+    }
+
 def build_graph():
     """
     Kulüp Asistanı Graph'ını oluşturur (Reflection ile)
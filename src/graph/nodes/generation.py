@@ -10,7 +10,7 @@ class DirectNode:
     
     def __init__(self):
         self.llm_service = LLMService()
-        self.llm = self.llm_service.get_llm()
+        self.llm = self.llm_service.get_llm("direct")
         
         self.prompt = ChatPromptTemplate.from_messages([
             ("system", """Sen Haliç Üniversitesi Girişimcilik ve Pazarlama Kulübü (HUGİP) asistanısın.
@@ -60,7 +60,7 @@ class WebSearchNode:
     
     def __init__(self):
         self.llm_service = LLMService()
-        self.llm = self.llm_service.get_llm()
+        self.llm = self.llm_service.get_llm("generator")
         # TODO: Tavily client eklenecek
     
     def __call__(self, state: GraphState) -> GraphState:
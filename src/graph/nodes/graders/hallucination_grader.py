@@ -33,7 +33,7 @@ class HallucinationGrader:
     
     def __init__(self):
         self.llm_service = LLMService()
-        self.llm = self.llm_service.get_structured_llm(GradeHallucination)
+        self.llm = self.llm_service.get_structured_llm(GradeHallucination, role="grader")
         
         self.prompt = ChatPromptTemplate.from_messages([
             ("system", """Sen bir doğruluk denetleyicisisin (fact-checker).
@@ -33,7 +33,7 @@ class RelevanceGrader:
     
     def __init__(self):
         self.llm_service = LLMService()
-        self.llm = self.llm_service.get_structured_llm(GradeRelevance)
+        self.llm = self.llm_service.get_structured_llm(GradeRelevance, role="grader")
         
         self.prompt = ChatPromptTemplate.from_messages([
             ("system", """Sen bir alakalılık denetleyicisisin (relevance checker).
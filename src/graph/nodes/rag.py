@@ -2,11 +2,14 @@
 RAG Nodes
 Retrieve ve Generate node'ları
 """
+import time
 from langchain_core.prompts import ChatPromptTemplate
 from src.graph.state import GraphState
 from src.services.vectorstore_service import VectorStoreService
 from src.services.llm_services import LLMService
+from src.services.llm_usage import call_usage
 from src.services.memory_service import MemoryService
+from src.utils.text import expand_query
 
 class RetrieveNode:
     """Pinecone'dan döküman getiren node"""
@@ -33,16 +36,8 @@ class RetrieveNode:
         
         # Query'yi genişlet (eğer takip sorusu ise)
         # "detaylandır", "açıkla", "anlat" gibi kelimeler topic ile birleştir
-        expanded_query = question
-        
-        if last_topic and any(word in question.lower() for word in [
-            "detay", "açıkla", "anlat", "genişlet", "daha fazla", 
-            "kimler", "ne zaman", "nerede", "nasıl", "kaç",
-            "yeni", "hazırla", "güncelle", "değiştir", "tekrar",
-            "aynı", "o", "şu", "bunun"
-        ]):
-            # Topic'i query'e ekle
-            expanded_query = f"{last_topic} {question}"
+        expanded_query = expand_query(question, last_topic)
+        if expanded_query != question:
             print(f"\n   🔍 Query expanded: '{question}' → '{expanded_query}'")
         
         # Retrieve documents
@@ -60,7 +55,7 @@ class GenerateRAGNode:
     
     def __init__(self):
         self.llm_service = LLMService()
-        self.llm = self.llm_service.get_llm()
+        self.llm = self.llm_service.get_llm("generator")
         
         self.prompt = ChatPromptTemplate.from_messages([
             ("system", """Sen Haliç Üniversitesi Girişimcilik ve Pazarlama Kulübü asistanısın.
@@ -103,6 +98,7 @@ CONTEXT:
         
         # Generate
         chain = self.prompt | self.llm
+        start = time.perf_counter()
         response = chain.invoke({
             "context": context,
             "question": state["question"]
@@ -110,5 +106,6 @@ CONTEXT:
         
         return {
             **state,
-            "generation": response.content
+            "generation": response.content,
+            "generation_usage": call_usage(self.llm.model_name, response, time.perf_counter() - start)
         }
\ No newline at end of file
@@ -2,9 +2,11 @@
 Reflection Node
 Generation'ın kalitesini kontrol eder ve gerekirse regenerate eder
 """
+import time
 from src.graph.state import GraphState
 from src.graph.nodes.graders import HallucinationGrader
 from src.services.llm_services import LLMService
+from src.services.llm_usage import call_usage, cascade_tracker
 from langchain_core.prompts import ChatPromptTemplate
 
 class ReflectionNode:
@@ -14,12 +16,17 @@ class ReflectionNode:
     Generation'ı kontrol eder:
     - Hallucination var mı? → Regenerate
     - Hallucination yok mu? → Approve
+    
+    Cascade modunda (LLM_CASCADE) regeneration güçlü modelle (escalation
+    rolü) yapılır; ucuz tier'da kalan / escalate edilen cevaplar
+    cascade_tracker'a kaydedilir.
     """
     
     def __init__(self):
         self.hallucination_grader = HallucinationGrader()
         self.llm_service = LLMService()
-        self.llm = self.llm_service.get_llm()
+        self.cascade = self.llm_service.settings.LLM_CASCADE
+        self.llm = self.llm_service.get_llm("escalation" if self.cascade else "regenerator")
         
         # Regeneration prompt (daha dikkatli ama pozitif)
         self.regenerate_prompt = ChatPromptTemplate.from_messages([
@@ -75,6 +82,8 @@ CONTEXT:
         # Eğer grounded ise (hallucination yok)
         if hallucination_result.binary_score:
             print("   ✅ Quality check PASSED! Cevap documents'a sadık.")
+            if self.cascade and state.get("generation_usage"):
+                cascade_tracker.record(state["generation_usage"], self.llm.model_name)
             return {
                 **state,
                 "iterations": iterations + 1
@@ -93,7 +102,10 @@ CONTEXT:
             }
         
         # Regenerate
-        print("   🔄 Regenerating with more careful prompt...")
+        if self.cascade:
+            print(f"   ⬆️  Escalating to {self.llm.model_name}...")
+        else:
+            print("   🔄 Regenerating with more careful prompt...")
         
         # Context hazırla
         context = "\n\n---\n\n".join([
@@ -103,6 +115,7 @@ CONTEXT:
         
         # Regenerate
         chain = self.regenerate_prompt | self.llm
+        start = time.perf_counter()
         new_response = chain.invoke({
             "context": context,
             "question": question
@@ -110,6 +123,13 @@ CONTEXT:
         
         print(f"   ✅ Regenerated ({len(new_response.content)} characters)")
         
+        if self.cascade and state.get("generation_usage"):
+            cascade_tracker.record(
+                state["generation_usage"],
+                self.llm.model_name,
+                escalation=call_usage(self.llm.model_name, new_response, time.perf_counter() - start)
+            )
+        
         return {
             **state,
             "generation": new_response.content,
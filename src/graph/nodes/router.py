@@ -25,7 +25,7 @@ class RouterNode:
     def __init__(self):
         self.llm_service = LLMService()
         self.memory_service = MemoryService()
-        self.llm = self.llm_service.get_structured_llm(RouteDecision)
+        self.llm = self.llm_service.get_structured_llm(RouteDecision, role="router")
         
         self.prompt = ChatPromptTemplate.from_messages([
             ("system", """Sen Haliç Üniversitesi Girişimcilik ve Pazarlama Kulübü asistanısın.
@@ -2,7 +2,7 @@
 Graph State
 LangGraph state tanımı
 """
-from typing import TypedDict, List
+from typing import TypedDict, List, Dict, Any
 from langchain_core.documents import Document
 
 class GraphState(TypedDict):
@@ -19,6 +19,7 @@ class GraphState(TypedDict):
         web_results: Web arama sonuçları (opsiyonel)
         iterations: Reflection loop sayacı
         session_id: Conversation session identifier
+        generation_usage: RAG generation çağrısının model, süre ve token bilgisi (model cascade)
     """
     question: str
     generation: str
@@ -26,4 +27,5 @@ class GraphState(TypedDict):
     decision: str
     web_results: List[str]
     iterations: int
-    session_id: str
\ No newline at end of file
+    session_id: str
+    generation_usage: Dict[str, Any]
\ No newline at end of file
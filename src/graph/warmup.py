@@ -0,0 +1,89 @@
+"""
+Warm-up
+Deploy sonrası ilk isteğin ödediği maliyetleri (ağır import'lar, graph
+derleme, OpenAI / Pinecone TLS bağlantıları) process açılışında öder
+
+API lifespan'inde ve Streamlit'in process-wide resource'unda çağrılır.
+"""
+import time
+from typing import Callable, Dict, List, Optional
+
+from src.core.config import get_settings
+from src.graph.graph import build_graph
+from src.utils.text import expand_query
+
+# Arayüzdeki örnek sorular; embedding'leri warm-up'ta cache'lenir
+EXAMPLE_QUESTIONS: List[str] = [
+    "FESTUP nedir?",
+    "Social Media Talks'ta kimler konuşacak?",
+    "Kulübe nasıl üye olabilirim?",
+    "Yönetim kurulu kimlerden oluşur?",
+    "Dış İlişkiler ekibi ne yapar?",
+    "DigitalMAG hakkında bilgi ver",
+]
+
+def _step(steps: Dict, name: str, fn: Callable):
+    """Adımı çalıştır, süresini ve hatasını kaydet (hata warm-up'ı durdurmaz)"""
+    start = time.perf_counter()
+    try:
+        result = fn()
+        steps[name] = {"ok": True, "seconds": time.perf_counter() - start}
+        return result
+    except Exception as e:
+        steps[name] = {"ok": False, "seconds": time.perf_counter() - start, "error": str(e)}
+        print(f"⚠️  Warm-up adımı başarısız ({name}): {e}")
+        return None
+
+def warm_up(graph=None, questions: Optional[List[str]] = None) -> Dict:
+    """
+    Graph'ı kur ve upstream bağlantılarını ısıt
+
+    Adımlar:
+    1. graph: build_graph() (node'lar, LLM client'ları, Pinecone index)
+    2. embeddings: Örnek soruların retrieve query'lerinin embedding'i
+       (OpenAI bağlantısı, cache); yeni bir session'da sorunun kendi topic'i
+       ile expand_query çıktısı, yani RetrieveNode'un soracağı metin
+    3. retrieval: Örnek soruyla Pinecone sorgusu
+    4. llm: Generator client'ı ile OpenAI models listesi (WARMUP_LLM=False ile
+       kapatılır); completion yapılmaz, rol bazlı usage istatistiklerine yazılmaz
+
+    Sadece graph adımı zorunludur; diğerleri başarısız olursa ilk
+    istekler yine çalışır, sadece soğuk başlar.
+
+    Args:
+        graph: Hazır graph (None = burada kurulur)
+        questions: Embedding'i alınacak sorular (None = EXAMPLE_QUESTIONS)
+
+    Returns:
+        {"graph", "steps": {adım: {ok, seconds, error?}}, "seconds"}
+    """
+    from src.services.vectorstore_service import get_vectorstore_service
+    from src.services.llm_services import LLMService
+    from src.services.memory_service import MemoryService
+
+    settings = get_settings()
+    questions = questions or EXAMPLE_QUESTIONS
+    memory = MemoryService()
+    queries = list(dict.fromkeys(expand_query(q, memory.detect_topic(q)) for q in questions))
+    steps: Dict[str, Dict] = {}
+    start = time.perf_counter()
+
+    if graph is None:
+        start_graph = time.perf_counter()
+        graph = build_graph()
+        steps["graph"] = {"ok": True, "seconds": time.perf_counter() - start_graph}
+
+    vectorstore = _step(steps, "vectorstore", get_vectorstore_service)
+    if vectorstore is not None:
+        _step(steps, "embeddings", lambda: vectorstore.embed_queries(queries))
+        _step(steps, "retrieval", lambda: vectorstore.retrieve_documents(queries[0], k=1, use_mmr=False))
+
+    if settings.WARMUP_LLM:
+        # root_client: ChatOpenAI'ın paylaşılan http_client'lı OpenAI client'ı (callback'ler çalışmaz)
+        _step(steps, "llm", lambda: LLMService().get_llm("generator").root_client.models.list())
+
+    seconds = time.perf_counter() - start
+    print(f"🔥 Warm-up tamamlandı ({seconds:.1f} sn): " + ", ".join(
+        f"{name} {'✅' if step['ok'] else '❌'} {step['seconds']:.2f}s" for name, step in steps.items()
+    ))
+    return {"graph": graph, "steps": steps, "seconds": seconds}
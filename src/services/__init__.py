@@ -2,5 +2,14 @@
 from .llm_services import LLMService
 from .vectorstore_service import VectorStoreService
 from .memory_service import MemoryService
+from .session_store import SessionStore, InMemorySessionStore, SQLiteSessionStore, RedisSessionStore
 
-__all__ = ["LLMService", "VectorStoreService", "MemoryService"]
\ No newline at end of file
+__all__ = [
+    "LLMService",
+    "VectorStoreService",
+    "MemoryService",
+    "SessionStore",
+    "InMemorySessionStore",
+    "SQLiteSessionStore",
+    "RedisSessionStore",
+]
\ No newline at end of file
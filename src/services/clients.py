@@ -0,0 +1,152 @@
+"""
+Client Registry
+Upstream başına (OpenAI, Pinecone) process genelinde tek client ve tek
+connection pool
+
+Tüm node'lar, grader'lar, servisler ve ingestion script'leri client'larını
+buradan alır; böylece her upstream için bağlantılar keep-alive ile yeniden
+kullanılır, her yeni client için TCP + TLS handshake ödenmez.
+"""
+import asyncio
+import threading
+from typing import Callable, Dict, List
+
+import httpx
+
+from src.core.config import get_settings
+
+_lock = threading.Lock()
+_http_clients: Dict[str, httpx.Client] = {}
+_async_http_clients: Dict[str, httpx.AsyncClient] = {}
+_shared: Dict[str, object] = {}
+# Client'ları tutan cache'lerin temizleyicileri (LLMService, get_vectorstore_service)
+_close_hooks: List[Callable[[], None]] = []
+
+def register_close_hook(hook: Callable[[], None]):
+    """
+    Client'lar kapatılınca çağrılacak fonksiyon
+
+    Paylaşılan client'ı cache'leyen modüller kendi cache'lerini temizler;
+    sonraki çağrılar yeni client'larla yeniden oluşturulur.
+    """
+    _close_hooks.append(hook)
+
+def _client_options() -> Dict:
+    settings = get_settings()
+    return {
+        "limits": httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE,
+            # httpx varsayılanı 5 sn: seyrek trafikte her istek yeni handshake öder
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY
+        ),
+        "timeout": httpx.Timeout(settings.HTTP_READ_TIMEOUT, connect=settings.HTTP_CONNECT_TIMEOUT),
+    }
+
+def get_http_client(upstream: str = "openai") -> httpx.Client:
+    """
+    Upstream için paylaşılan sync HTTP client
+
+    Args:
+        upstream: Upstream adı ('openai', ...); her biri ayrı pool
+    """
+    with _lock:
+        if upstream not in _http_clients:
+            _http_clients[upstream] = httpx.Client(**_client_options())
+        return _http_clients[upstream]
+
+def get_async_http_client(upstream: str = "openai") -> httpx.AsyncClient:
+    """Upstream için paylaşılan async HTTP client (API'nin event loop'u)"""
+    with _lock:
+        if upstream not in _async_http_clients:
+            _async_http_clients[upstream] = httpx.AsyncClient(**_client_options())
+        return _async_http_clients[upstream]
+
+def _get_shared(name: str, factory):
+    with _lock:
+        if name in _shared:
+            return _shared[name]
+    # Factory ağ isteği yapabilir (Pinecone describe_index), lock dışında çalışır
+    instance = factory()
+    with _lock:
+        return _shared.setdefault(name, instance)
+
+def get_embeddings():
+    """Paylaşılan OpenAIEmbeddings (OpenAI pool'unu kullanır)"""
+    def factory():
+        from langchain_openai import OpenAIEmbeddings
+        settings = get_settings()
+        return OpenAIEmbeddings(
+            model=settings.EMBEDDING_MODEL,
+            openai_api_key=settings.OPENAI_API_KEY,
+            http_client=get_http_client("openai"),
+            http_async_client=get_async_http_client("openai")
+        )
+    return _get_shared("embeddings", factory)
+
+def get_pinecone_client():
+    """Paylaşılan Pinecone client"""
+    def factory():
+        from pinecone import Pinecone
+        return Pinecone(api_key=get_settings().PINECONE_API_KEY)
+    return _get_shared("pinecone", factory)
+
+def get_pinecone_index(index_name: str = None):
+    """
+    Paylaşılan Pinecone index (urllib3 pool'u index başına)
+
+    Args:
+        index_name: Index adı (default: settings.PINECONE_INDEX_NAME)
+    """
+    settings = get_settings()
+    index_name = index_name or settings.PINECONE_INDEX_NAME
+    return _get_shared(
+        f"pinecone_index:{index_name}",
+        lambda: get_pinecone_client().Index(
+            index_name,
+            pool_threads=settings.PINECONE_POOL_SIZE,
+            connection_pool_maxsize=settings.PINECONE_POOL_SIZE
+        )
+    )
+
+def _release_sync() -> List[httpx.AsyncClient]:
+    """Sync client'ları kapat, registry'yi ve bağlı cache'leri boşalt; async client'ları döndür"""
+    with _lock:
+        for client in _http_clients.values():
+            client.close()
+        async_clients = list(_async_http_clients.values())
+        _http_clients.clear()
+        _async_http_clients.clear()
+        _shared.clear()
+    for hook in _close_hooks:
+        hook()
+    return async_clients
+
+def close_clients():
+    """
+    Tüm client'ları kapat (Streamlit / script'ler)
+
+    Registry'ye bağlı cache'ler de temizlenir; sonraki get_* çağrıları yeni
+    client açar. Kapatmadan önce alınmış instance'lar (ör. kurulu graph'ın
+    node'ları) artık kullanılmamalı. Event loop içinden aclose_clients kullan.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        pass
+    else:
+        raise RuntimeError("Event loop içinde close_clients yerine await aclose_clients() kullanın")
+
+    async_clients = _release_sync()
+
+    async def close_async():
+        for client in async_clients:
+            await client.aclose()
+
+    if async_clients:
+        asyncio.run(close_async())
+
+async def aclose_clients():
+    """Async client'lar dahil hepsini kapat (API lifespan sonunda)"""
+    for client in _release_sync():
+        await client.aclose()
@@ -2,34 +2,114 @@
 LLM Service
 LLM instance'larını yöneten servis
 """
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
 from langchain_openai import ChatOpenAI
 from src.core.config import get_settings
+from src.services.clients import get_http_client, get_async_http_client, register_close_hook
+from src.services.llm_usage import UsageCallbackHandler
+
+# Model profili tanımlanabilen roller
+# router: rag/web_search/direct sınıflandırması
+# generator: RAG ve web search cevabı
+# grader: hallucination / relevance kontrolü (boolean)
+# regenerator: reflection sonrası yeniden üretim
+# direct: selamlama, genel sohbet
+# summarizer: conversation memory özeti
+# escalation: cascade modunda grounding başarısızsa güçlü model ile yeniden üretim
+LLM_ROLES = ("router", "generator", "grader", "regenerator", "direct", "summarizer", "escalation")
+
+@dataclass(frozen=True)
+class ModelProfile:
+    """Bir rolün model ayarları"""
+    model: str
+    temperature: float
+    max_tokens: Optional[int] = None
+    timeout: Optional[float] = None
+
+def get_model_profile(role: str) -> ModelProfile:
+    """
+    Rolün profili: LLM_ROLE_PROFILES'taki alanlar, verilmeyenler için LLM_* ayarları
+    (escalation rolünün varsayılan modeli LLM_ESCALATION_MODEL)
+
+    Args:
+        role: LLM_ROLES'tan biri
+    """
+    if role not in LLM_ROLES:
+        raise ValueError(f"Bilinmeyen LLM rolü: {role} ({', '.join(LLM_ROLES)})")
+
+    settings = get_settings()
+    overrides = settings.LLM_ROLE_PROFILES.get(role, {})
+    default_model = settings.LLM_ESCALATION_MODEL if role == "escalation" else settings.LLM_MODEL
+    return ModelProfile(
+        model=overrides.get("model", default_model),
+        temperature=overrides.get("temperature", settings.LLM_TEMPERATURE),
+        max_tokens=overrides.get("max_tokens"),
+        timeout=overrides.get("timeout", settings.LLM_TIMEOUT)
+    )
 
 class LLMService:
     """LLM factory ve yönetim servisi"""
-    
+
+    # Aynı rol ve ayarlı ChatOpenAI instance'ı tüm node'lar paylaşır
+    _llms: Dict[Tuple, ChatOpenAI] = {}
+    _llms_lock = threading.Lock()
+
     def __init__(self):
         self.settings = get_settings()
-    
-    def get_llm(self, temperature: float = None) -> ChatOpenAI:
+
+    def get_llm(self, role: str = "generator", temperature: float = None, max_tokens: int = None) -> ChatOpenAI:
         """
-        Standard LLM instance
-        
+        Rolün LLM instance'ı
+
+        Instance'lar (rol, profil) başına bir kez oluşturulur, paylaşılan
+        OpenAI HTTP client'ını kullanır ve çağrıları rol adıyla
+        usage_tracker'a kaydeder.
+
         Args:
-            temperature: Override default temperature
+            role: LLM_ROLES'tan biri (model, temperature, max_tokens, timeout profili)
+            temperature: Profili override et
+            max_tokens: Profili override et (None = profildeki değer)
         """
-        return ChatOpenAI(
-            model=self.settings.LLM_MODEL,
-            temperature=temperature or self.settings.LLM_TEMPERATURE,
-            api_key=self.settings.OPENAI_API_KEY
-        )
-    
-    def get_structured_llm(self, pydantic_model):
+        profile = get_model_profile(role)
+        temperature = profile.temperature if temperature is None else temperature
+        max_tokens = profile.max_tokens if max_tokens is None else max_tokens
+
+        key = (role, profile.model, temperature, max_tokens, profile.timeout)
+        with self._llms_lock:
+            if key not in self._llms:
+                self._llms[key] = ChatOpenAI(
+                    model=profile.model,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    timeout=profile.timeout,
+                    api_key=self.settings.OPENAI_API_KEY,
+                    http_client=get_http_client("openai"),
+                    http_async_client=get_async_http_client("openai"),
+                    # Özel http_client verilince varsayılan kapanıyor; streaming'de de token sayısı gelsin
+                    stream_usage=True,
+                    callbacks=[UsageCallbackHandler(role, profile.model)]
+                )
+            return self._llms[key]
+
+    def get_structured_llm(self, pydantic_model, role: str = "grader"):
         """
         Structured output için LLM
         Router ve grader'larda kullanılır
-        
+
+        "nostream" tag'i: JSON çıktısı LangGraph'ın messages stream'ine
+        (API SSE, Streamlit) cevap token'ı olarak düşmez.
+
         Args:
             pydantic_model: Pydantic model class
+            role: LLM_ROLES'tan biri
         """
-        return self.get_llm().with_structured_output(pydantic_model)
\ No newline at end of file
+        return self.get_llm(role).with_structured_output(pydantic_model).with_config(tags=["nostream"])
+
+def _clear_llms():
+    with LLMService._llms_lock:
+        LLMService._llms.clear()
+
+# Client'lar kapatılınca eski http_client'ı tutan instance'lar bırakılır
+register_close_hook(_clear_llms)
@@ -0,0 +1,250 @@
+"""
+LLM Usage
+Rol bazında (router, generator, grader, ...) LLM çağrı sayısı, gecikme,
+token ve maliyet istatistikleri
+
+Her rolün ChatOpenAI instance'ına UsageCallbackHandler bağlanır;
+istatistikler process içinde tutulur (API: /metrics).
+"""
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+# USD / 1M token (input, output)
+MODEL_PRICES: Dict[str, Tuple[float, float]] = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-nano": (0.10, 0.40),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+}
+
+def estimate_cost(model: str, input_tokens: int, output_tokens: int) -> Optional[float]:
+    """
+    Tahmini maliyet (USD)
+
+    Returns:
+        Fiyatı bilinmeyen model için None
+    """
+    # Tarihli sürümler (gpt-4o-mini-2024-07-18) ana modelin fiyatını kullanır
+    prices = MODEL_PRICES.get(model) or next(
+        (price for name, price in sorted(MODEL_PRICES.items(), key=lambda item: -len(item[0]))
+         if model.startswith(name + "-")),
+        None
+    )
+    if prices is None:
+        return None
+    return (input_tokens * prices[0] + output_tokens * prices[1]) / 1_000_000
+
+class LLMUsageTracker:
+    """Rol bazında kümülatif LLM kullanımı (thread-safe)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._roles: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, role: str, model: str, latency: float, input_tokens: int, output_tokens: int, error: bool = False):
+        cost = estimate_cost(model, input_tokens, output_tokens)
+        with self._lock:
+            stats = self._roles.setdefault(role, {
+                "model": model,
+                "calls": 0,
+                "errors": 0,
+                "latency": 0.0,
+                "max_latency": 0.0,
+                "input_tokens": 0,
+                "output_tokens": 0,
+                "cost_usd": 0.0,
+            })
+            stats["model"] = model
+            stats["calls"] += 1
+            stats["errors"] += int(error)
+            stats["latency"] += latency
+            stats["max_latency"] = max(stats["max_latency"], latency)
+            stats["input_tokens"] += input_tokens
+            stats["output_tokens"] += output_tokens
+            stats["cost_usd"] += cost or 0.0
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns:
+            {rol: {model, calls, errors, avg_latency_ms, max_latency_ms,
+                   input_tokens, output_tokens, cost_usd}}
+        """
+        with self._lock:
+            return {
+                role: {
+                    "model": stats["model"],
+                    "calls": stats["calls"],
+                    "errors": stats["errors"],
+                    "avg_latency_ms": round(stats["latency"] / stats["calls"] * 1000, 1),
+                    "max_latency_ms": round(stats["max_latency"] * 1000, 1),
+                    "input_tokens": stats["input_tokens"],
+                    "output_tokens": stats["output_tokens"],
+                    "cost_usd": round(stats["cost_usd"], 6),
+                }
+                for role, stats in self._roles.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._roles.clear()
+
+    def report(self) -> str:
+        """Okunabilir tablo (script'ler ve testler için)"""
+        lines = [f"   {'rol':<12} {'model':<16} {'çağrı':>6} {'ort. ms':>9} {'token (in/out)':>16} {'USD':>10}"]
+        for role, stats in sorted(self.snapshot().items()):
+            lines.append(
+                f"   {role:<12} {stats['model']:<16} {stats['calls']:>6} {stats['avg_latency_ms']:>9.1f} "
+                f"{stats['input_tokens']:>8}/{stats['output_tokens']:<7} {stats['cost_usd']:>10.5f}"
+            )
+        return "\n".join(lines)
+
+usage_tracker = LLMUsageTracker()
+
+class UsageCallbackHandler(BaseCallbackHandler):
+    """Bir rolün LLM çağrılarını usage_tracker'a kaydeder"""
+
+    # Async çağrılarda executor'a gönderilmeden event loop'ta çalışsın (iş çok küçük)
+    run_inline = True
+
+    def __init__(self, role: str, model: str, tracker: LLMUsageTracker = usage_tracker):
+        self.role = role
+        self.model = model
+        self.tracker = tracker
+        self._starts: Dict[UUID, float] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs):
+        self._starts[run_id] = time.perf_counter()
+
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID, **kwargs):
+        self._starts[run_id] = time.perf_counter()
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs):
+        latency = time.perf_counter() - self._starts.pop(run_id, time.perf_counter())
+        input_tokens, output_tokens = 0, 0
+
+        # usage_metadata (streaming dahil), yoksa llm_output.token_usage
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    input_tokens += usage.get("input_tokens", 0)
+                    output_tokens += usage.get("output_tokens", 0)
+        if not (input_tokens or output_tokens):
+            token_usage = (response.llm_output or {}).get("token_usage") or {}
+            input_tokens = token_usage.get("prompt_tokens", 0)
+            output_tokens = token_usage.get("completion_tokens", 0)
+
+        self.tracker.record(self.role, self.model, latency, input_tokens, output_tokens)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs):
+        latency = time.perf_counter() - self._starts.pop(run_id, time.perf_counter())
+        self.tracker.record(self.role, self.model, latency, 0, 0, error=True)
+
+def call_usage(model: str, response, latency: float) -> Dict[str, Any]:
+    """
+    Tek bir LLM cevabının kullanımı (cascade kayıtları için)
+
+    Args:
+        model: Çağrılan model
+        response: AIMessage (usage_metadata ile)
+        latency: Çağrı süresi (saniye)
+    """
+    usage = getattr(response, "usage_metadata", None) or {}
+    return {
+        "model": model,
+        "latency": latency,
+        "input_tokens": usage.get("input_tokens", 0),
+        "output_tokens": usage.get("output_tokens", 0),
+    }
+
+def _call_cost(call: Dict[str, Any], model: str = None) -> float:
+    return estimate_cost(model or call["model"], call["input_tokens"], call["output_tokens"]) or 0.0
+
+class CascadeTracker:
+    """
+    Model cascade sayaçları (thread-safe)
+
+    Baseline: her RAG cevabını doğrudan güçlü modelin üretmesi. Ucuz tier'da
+    kalan cevapların güçlü model maliyeti aynı token sayısıyla, gecikmesi ise
+    gözlenen escalation çağrılarının ortalamasıyla tahmin edilir.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def record(self, first: Dict[str, Any], strong_model: str, escalation: Dict[str, Any] = None):
+        """
+        Args:
+            first: Ucuz tier çağrısı (call_usage)
+            strong_model: Escalation tier'ının modeli
+            escalation: Grounding başarısızsa güçlü tier çağrısı (call_usage)
+        """
+        # Maliyetler lock dışında; process ömrü boyunca sadece toplamlar tutulur
+        actual_cost = _call_cost(first)
+        if escalation:
+            actual_cost += _call_cost(escalation)
+            baseline_cost = _call_cost(escalation)
+        else:
+            baseline_cost = _call_cost(first, strong_model)
+
+        with self._lock:
+            self._requests += 1
+            self._latency += first["latency"]
+            self._actual_cost += actual_cost
+            self._baseline_cost += baseline_cost
+            if escalation:
+                self._escalated += 1
+                self._escalation_latency += escalation["latency"]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Returns:
+            {requests, cheap_tier, escalated, cheap_ratio,
+             latency_ms: {actual, baseline, saved}, cost_usd: {actual, baseline, saved}}
+            Henüz escalation görülmediyse gecikme baseline'ı None
+        """
+        with self._lock:
+            requests, escalated = self._requests, self._escalated
+            latency, escalation_latency = self._latency, self._escalation_latency
+            actual_cost, baseline_cost = self._actual_cost, self._baseline_cost
+
+        actual_latency = latency + escalation_latency
+        baseline_latency = None
+        if escalated:
+            # Escalate edilenler gerçek güçlü çağrı, ucuz tier'da kalanlar ortalama güçlü çağrı
+            baseline_latency = escalation_latency + (requests - escalated) * escalation_latency / escalated
+
+        return {
+            "requests": requests,
+            "cheap_tier": requests - escalated,
+            "escalated": escalated,
+            "cheap_ratio": round((requests - escalated) / requests, 3) if requests else None,
+            "latency_ms": {
+                "actual": round(actual_latency * 1000, 1),
+                "baseline": round(baseline_latency * 1000, 1) if baseline_latency is not None else None,
+                "saved": round((baseline_latency - actual_latency) * 1000, 1) if baseline_latency is not None else None,
+            },
+            "cost_usd": {
+                "actual": round(actual_cost, 6),
+                "baseline": round(baseline_cost, 6),
+                "saved": round(baseline_cost - actual_cost, 6),
+            },
+        }
+
+    def reset(self):
+        with self._lock:
+            self._requests = 0
+            self._escalated = 0
+            self._latency = 0.0
+            self._escalation_latency = 0.0
+            self._actual_cost = 0.0
+            self._baseline_cost = 0.0
+
+cascade_tracker = CascadeTracker()
@@ -2,25 +2,85 @@
 Memory Service
 Conversation history'yi yönetir (session-based)
 """
-from typing import List, Dict, Optional
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime
+from src.core.config import get_settings
+from src.services.llm_services import LLMService
+from src.services.session_store import SessionStore, InMemorySessionStore, create_session_store
+from src.utils.text import KeywordAutomaton, estimate_tokens
+from langchain_core.prompts import ChatPromptTemplate
+
+# Varsayılan konu tablosu (öncelik sırasına göre)
+# Corpus'a yeni etkinlik eklenince TOPICS_FILE güncellenir
+DEFAULT_TOPIC_KEYWORDS: List[Tuple[str, str]] = [
+    ("FESTUP", "FESTUP"),
+    ("Social Media Talks", "Social Media Talks"),
+    ("DigitalMAG", "DigitalMAG"),
+    ("HUGİP Akademi", "HUGİP Akademi"),
+    ("üyelik", "üyelik"),
+    ("üye ol", "üyelik"),
+    ("yönetim kurulu", "yönetim"),
+    ("kulüp", "kulüp"),
+    ("etkinlik", "etkinlik"),
+]
+
+def load_topic_keywords(path: str) -> List[Tuple[str, str]]:
+    """
+    Konu keyword tablosunu JSON dosyasından yükle
+    
+    Dosya formatı: [["FESTUP", "FESTUP"], ["üye ol", "üyelik"], ...]
+    (öncelik sırasına göre). Dosya yoksa varsayılan tablo kullanılır.
+    
+    Args:
+        path: JSON dosya yolu
+        
+    Returns:
+        (keyword, topic) listesi
+    """
+    topics_path = Path(path)
+    if not topics_path.exists():
+        return DEFAULT_TOPIC_KEYWORDS
+    
+    try:
+        with open(topics_path, encoding="utf-8") as f:
+            return [(keyword, topic) for keyword, topic in json.load(f)]
+    except (ValueError, TypeError) as e:
+        print(f"⚠️  Topic dosyası okunamadı ({path}): {e}")
+        return DEFAULT_TOPIC_KEYWORDS
 
 class ConversationMemory:
     """
-    Basit in-memory conversation storage
+    Session-based conversation storage
     
-    Production'da Redis veya DB kullanılmalı.
-    Şimdilik dictionary ile in-memory.
+    Session record'ları bir SessionStore'da tutulur:
+    varsayılan in-memory, çoklu worker için SQLite veya Redis.
     """
     
-    def __init__(self, max_history: int = 10):
+    def __init__(
+        self, 
+        max_history: int = 10,
+        topic_keywords: Optional[List[Tuple[str, str]]] = None,
+        topic_window: int = 6,
+        keep_evicted: bool = False,
+        store: Optional[SessionStore] = None
+    ):
         """
         Args:
             max_history: Kaç mesaj saklanacak (default: 10 = 5 user + 5 assistant)
+            topic_keywords: (keyword, topic) tablosu, öncelik sırasına göre
+            topic_window: Topic tespitinde bakılacak son mesaj sayısı
+            keep_evicted: Max history'den taşan mesajları özetlenmek üzere sakla
+            store: Session backend (default: InMemorySessionStore)
         """
-        # session_id -> messages
-        self.sessions: Dict[str, List[Dict]] = {}
+        # session_id -> {"messages": [...], "topic": ..., "summary": ..., "pending": [...]}
+        self.store = store or InMemorySessionStore()
         self.max_history = max_history
+        self.topic_window = topic_window
+        self.keep_evicted = keep_evicted
+        self.topic_matcher = KeywordAutomaton(topic_keywords or DEFAULT_TOPIC_KEYWORDS)
     
     def add_message(
         self, 
@@ -38,29 +98,66 @@ class ConversationMemory:
             content: Mesaj içeriği
             metadata: Ek bilgiler (route, sources, vb.)
         """
-        if session_id not in self.sessions:
-            self.sessions[session_id] = []
-        
-        # Duplicate prevention: Son mesaj aynı mı kontrol et
-        if self.sessions[session_id]:
-            last_message = self.sessions[session_id][-1]
-            if (last_message["role"] == role and 
-                last_message["content"] == content):
-                # Aynı mesaj, ekleme!
-                return
-        
         message = {
             "role": role,
             "content": content,
             "timestamp": datetime.now().isoformat(),
-            "metadata": metadata or {}
+            "metadata": metadata or {},
+            # Mesajdaki en öncelikli topic (bir kez hesaplanır)
+            "topic_rank": self.topic_matcher.best_match(content)
         }
         
-        self.sessions[session_id].append(message)
+        def updater(record: Optional[Dict]) -> Optional[Dict]:
+            return self._append(record, message)
+        
+        self.store.update(session_id, updater)
+    
+    def _append(self, record: Optional[Dict], message: Dict) -> Optional[Dict]:
+        """Record'a mesaj ekle, history'yi kırp, topic'i güncelle"""
+        if record is None:
+            record = {
+                "messages": [],
+                "topic": None,
+                "summary": "",
+                "pending": [],
+                # Mesaj id sayacı ve pending'e eklenen son mesaj id'si
+                "next_id": 0,
+                "queued_id": -1,
+                # apply_summary'de compare-and-set için
+                "summary_version": 0
+            }
+        
+        messages = record["messages"]
+        
+        # Duplicate prevention: Son mesaj aynı mı kontrol et
+        if messages:
+            last_message = messages[-1]
+            if (last_message["role"] == message["role"] and 
+                last_message["content"] == message["content"]):
+                # Aynı mesaj, ekleme!
+                return None
+        
+        message_id = record.get("next_id", 0)
+        record["next_id"] = message_id + 1
+        messages.append({**message, "id": message_id})
         
         # Max history'yi aş, eski mesajları sil
-        if len(self.sessions[session_id]) > self.max_history:
-            self.sessions[session_id] = self.sessions[session_id][-self.max_history:]
+        if len(messages) > self.max_history:
+            if self.keep_evicted:
+                # Silinen mesajlar rolling summary'ye eklenecek
+                # (token bütçesinden düşüp zaten eklenmiş olanlar hariç)
+                self._queue_for_summary(record, messages[:-self.max_history])
+            record["messages"] = messages = messages[-self.max_history:]
+        
+        # Session topic'ini güncelle (son N mesajdaki en öncelikli topic)
+        topics = self.topic_matcher.topics
+        ranks = [
+            m["topic_rank"] for m in messages[-self.topic_window:]
+            if m.get("topic_rank") is not None and m["topic_rank"] < len(topics)
+        ]
+        record["topic"] = topics[min(ranks)] if ranks else None
+        
+        return record
     
     def get_history(
         self, 
@@ -77,10 +174,11 @@ class ConversationMemory:
         Returns:
             List of messages
         """
-        if session_id not in self.sessions:
+        record = self.store.load(session_id)
+        if record is None:
             return []
         
-        messages = self.sessions[session_id]
+        messages = record["messages"]
         
         if last_n:
             return messages[-last_n:]
@@ -90,7 +188,8 @@ class ConversationMemory:
     def get_context_string(
         self, 
         session_id: str, 
-        last_n: int = 6
+        last_n: int = 6,
+        token_budget: Optional[int] = None
     ) -> str:
         """
         Context string olarak history
@@ -99,10 +198,15 @@ class ConversationMemory:
         Args:
             session_id: Session identifier
             last_n: Son N mesaj (default: 6 = 3 user + 3 assistant)
+            token_budget: Verilirse rolling summary + bütçeye sığan son mesajlar
+                (last_n ve 150 karakter kesmesi yerine)
             
         Returns:
             Formatted conversation history
         """
+        if token_budget is not None:
+            return self._get_budgeted_context(session_id, token_budget)
+        
         messages = self.get_history(session_id, last_n)
         
         if not messages:
@@ -117,51 +221,230 @@ class ConversationMemory:
         
         return "\n".join(context_lines)
     
+    def _get_budgeted_context(self, session_id: str, token_budget: int) -> str:
+        """
+        Summary + yeniden eskiye, token bütçesine sığan mesajlar
+        
+        Prompt boyutu konuşma uzunluğundan bağımsız olarak sabit kalır.
+        Bütçeye sığmayan mesajlar (keep_evicted ise) özetlenmek üzere
+        pending'e eklenir, böylece prompt'tan düşen bilgi kaybolmaz.
+        """
+        record = self.store.load(session_id)
+        if record is None:
+            return ""
+        
+        summary = record["summary"]
+        history = record["messages"]
+        remaining = token_budget
+        
+        summary_line = ""
+        if summary:
+            summary_line = f"[ÖNCEKİ KONUŞMA ÖZETİ] {summary}"
+            remaining -= estimate_tokens(summary_line)
+        
+        context_lines = []
+        for msg in reversed(history):
+            if remaining <= 0:
+                break
+            
+            role_label = "Kullanıcı" if msg["role"] == "user" else "Asistan"
+            line = f"{role_label}: {msg['content']}"
+            tokens = estimate_tokens(line)
+            
+            if tokens > remaining:
+                if context_lines:
+                    break
+                # En son mesaj tek başına bütçeyi aşıyorsa kırp
+                line = line[:remaining * 4] + "..."
+                tokens = remaining
+            
+            context_lines.append(line)
+            remaining -= tokens
+        
+        dropped = history[:len(history) - len(context_lines)]
+        if self.keep_evicted and self._unqueued(record, dropped):
+            self._queue_dropped(session_id, dropped[-1])
+        
+        context_lines.reverse()
+        if summary_line:
+            context_lines.insert(0, summary_line)
+        
+        return "\n".join(context_lines)
+    
+    @staticmethod
+    def _unqueued(record: Dict, messages: List[Dict]) -> List[Dict]:
+        """Henüz pending'e eklenmemiş mesajlar"""
+        queued_id = record.get("queued_id", -1)
+        return [m for m in messages if m.get("id") is None or m["id"] > queued_id]
+    
+    def _queue_for_summary(self, record: Dict, messages: List[Dict]):
+        """Mesajları (bir kez) pending'e ekle"""
+        new = self._unqueued(record, messages)
+        record["pending"].extend(new)
+        ids = [m["id"] for m in new if m.get("id") is not None]
+        if ids:
+            record["queued_id"] = max(ids)
+    
+    def _queue_dropped(self, session_id: str, last_dropped: Dict):
+        """Token bütçesinden düşen mesajları (last_dropped dahil) pending'e ekle"""
+        def updater(record: Optional[Dict]) -> Optional[Dict]:
+            if record is None:
+                return None
+            messages = record["messages"]
+            if last_dropped not in messages:
+                return None
+            dropped = messages[:messages.index(last_dropped) + 1]
+            if not self._unqueued(record, dropped):
+                # Başka bir worker eklemiş
+                return None
+            self._queue_for_summary(record, dropped)
+            return record
+        
+        self.store.update(session_id, updater)
+    
+    def get_summary(self, session_id: str) -> str:
+        """Session'ın rolling summary'si"""
+        record = self.store.load(session_id)
+        if record is None:
+            return ""
+        
+        return record["summary"]
+    
+    def get_pending_summary(self, session_id: str) -> Tuple[str, List[Dict], int]:
+        """
+        Özetlenmeyi bekleyen mesajlar
+        
+        Returns:
+            (mevcut summary, özetlenecek mesajlar, summary versiyonu)
+        """
+        record = self.store.load(session_id)
+        if record is None:
+            return "", [], 0
+        
+        return record["summary"], list(record["pending"]), record.get("summary_version", 0)
+    
+    def apply_summary(self, session_id: str, summary: str, consumed: List[Dict], version: int) -> bool:
+        """
+        Yeni summary'yi kaydet, özetlenen mesajları pending'den çıkar
+        
+        Compare-and-set: summary başka bir worker tarafından güncellendiyse
+        (versiyon değişti) veya pending artık bu mesajlarla başlamıyorsa
+        (session silindi/yeniden açıldı) kaydedilmez.
+        
+        Args:
+            session_id: Session identifier
+            summary: Güncellenmiş rolling summary
+            consumed: Summary'ye dahil edilen pending mesajları
+            version: get_pending_summary'nin döndürdüğü versiyon
+            
+        Returns:
+            Kaydedildi mi
+        """
+        def key(message: Dict) -> Tuple:
+            return message.get("id"), message["timestamp"]
+        
+        def updater(record: Optional[Dict]) -> Optional[Dict]:
+            if record is None or record.get("summary_version", 0) != version:
+                return None
+            pending = record["pending"]
+            if [key(m) for m in pending[:len(consumed)]] != [key(m) for m in consumed]:
+                return None
+            record["summary"] = summary
+            record["summary_version"] = version + 1
+            del pending[:len(consumed)]
+            return record
+        
+        return self.store.update(session_id, updater) is not None
+    
     def clear_session(self, session_id: str):
         """Session'ı temizle"""
-        if session_id in self.sessions:
-            del self.sessions[session_id]
+        self.store.delete(session_id)
+    
+    def detect_topic(self, text: str) -> Optional[str]:
+        """Metinde geçen en öncelikli topic (session'a bakmadan)"""
+        rank = self.topic_matcher.best_match(text)
+        topics = self.topic_matcher.topics
+        return topics[rank] if rank is not None and rank < len(topics) else None
     
     def get_last_topic(self, session_id: str) -> Optional[str]:
         """
-        Son konuşulan topic'i çıkar (basit heuristic)
+        Son konuşulan topic
+        
+        Topic mesaj eklenirken güncellenir, burada sadece okunur.
         
         Returns:
             Son bahsedilen önemli kelime/topic
         """
-        messages = self.get_history(session_id, last_n=6)
-        
-        if not messages:
+        record = self.store.load(session_id)
+        if record is None:
             return None
         
-        # Tüm mesajlara bak (user + assistant)
-        all_content = " ".join([m["content"] for m in messages])
-        
-        # Basit keyword extraction
-        # Öncelik sırasına göre kontrol et
-        keywords = [
-            ("FESTUP", "FESTUP"),
-            ("Social Media Talks", "Social Media Talks"),
-            ("DigitalMAG", "DigitalMAG"),
-            ("HUGİP Akademi", "HUGİP Akademi"),
-            ("üyelik", "üyelik"),
-            ("üye ol", "üyelik"),
-            ("yönetim kurulu", "yönetim"),
-            ("kulüp", "kulüp"),
-            ("etkinlik", "etkinlik"),
-        ]
+        return record["topic"]
+
+
+class ConversationSummarizer:
+    """
+    Rolling summary üretici
+    
+    Mevcut özet + history'den düşen mesajları tek bir kısa özete birleştirir.
+    """
+    
+    def __init__(self, max_tokens: int = 200):
+        self.llm_service = LLMService()
+        self.llm = self.llm_service.get_llm("summarizer", max_tokens=max_tokens)
         
-        for keyword, topic in keywords:
-            if keyword.lower() in all_content.lower():
-                return topic
+        self.prompt = ChatPromptTemplate.from_messages([
+            ("system", """Sen bir konuşma özetleyicisisin.
+
+Görevi: Mevcut özeti ve yeni mesajları birleştirerek TEK bir kısa özet yaz.
+
+KURALLAR:
+1. Konuşulan etkinlik/kulüp konularını (FESTUP, Social Media Talks vb.) MUTLAKA koru
+2. Kullanıcının sorduğu soruları ve verilen önemli bilgileri (tarih, isim) kısaca yaz
+3. Selamlaşma gibi önemsiz kısımları atla
+4. Türkçe ve en fazla birkaç cümle yaz
+"""),
+            ("human", """MEVCUT ÖZET:
+{summary}
+
+YENİ MESAJLAR:
+{messages}
+
+Güncellenmiş özet:""")
+        ])
+    
+    def summarize(self, summary: str, messages: List[Dict]) -> str:
+        """
+        Args:
+            summary: Mevcut rolling summary (boş olabilir)
+            messages: Özete eklenecek mesajlar
+            
+        Returns:
+            Güncellenmiş summary
+        """
+        lines = "\n".join(
+            f"{'Kullanıcı' if m['role'] == 'user' else 'Asistan'}: {m['content']}"
+            for m in messages
+        )
+        
+        chain = self.prompt | self.llm
+        response = chain.invoke({
+            "summary": summary or "(yok)",
+            "messages": lines
+        })
         
-        return None
+        return response.content.strip()
 
 
 class MemoryService:
     """
     Memory Service Wrapper
     Singleton pattern ile tek instance
+    
+    MEMORY_MODE:
+    - 'window': Son N mesaj (her mesaj 150 karaktere kırpılır)
+    - 'summary': Rolling summary + token bütçesine sığan son mesajlar.
+      Summary her turn sonrası arka planda güncellenir (request path'te değil).
     """
     
     _instance = None
@@ -169,7 +452,22 @@ class MemoryService:
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(MemoryService, cls).__new__(cls)
-            cls._instance.memory = ConversationMemory(max_history=10)
+            settings = get_settings()
+            cls._instance.settings = settings
+            cls._instance.summary_mode = settings.MEMORY_MODE == "summary"
+            cls._instance.memory = ConversationMemory(
+                max_history=10,
+                topic_keywords=load_topic_keywords(settings.TOPICS_FILE),
+                keep_evicted=cls._instance.summary_mode,
+                store=create_session_store(settings)
+            )
+            cls._instance._summarizer = None
+            cls._instance._summary_executor = None
+            if cls._instance.summary_mode:
+                cls._instance._summary_executor = ThreadPoolExecutor(
+                    max_workers=1,
+                    thread_name_prefix="memory-summary"
+                )
         return cls._instance
     
     def add_user_message(self, session_id: str, content: str):
@@ -191,15 +489,49 @@ class MemoryService:
             metadata["sources"] = sources
         
         self.memory.add_message(session_id, "assistant", content, metadata)
+        
+        # Turn bitti → summary'yi arka planda güncelle
+        if self.summary_mode:
+            self._summary_executor.submit(self._update_summary, session_id)
+    
+    def _update_summary(self, session_id: str):
+        """Pending mesajları rolling summary'ye ekle (background thread)"""
+        summary, pending, version = self.memory.get_pending_summary(session_id)
+        if not pending:
+            return
+        
+        try:
+            if self._summarizer is None:
+                self._summarizer = ConversationSummarizer(
+                    max_tokens=self.settings.SUMMARY_MAX_TOKENS
+                )
+            new_summary = self._summarizer.summarize(summary, pending)
+        except Exception as e:
+            # Pending mesajlar bir sonraki turn'de tekrar denenir
+            print(f"⚠️  Summary güncellenemedi ({session_id[:8]}): {e}")
+            return
+        
+        if not self.memory.apply_summary(session_id, new_summary, pending, version):
+            # Başka bir worker özetledi veya session silindi; kalan pending sonraki turn'de
+            print(f"⚠️  Summary güncel değil, kaydedilmedi ({session_id[:8]})")
     
     def get_context(self, session_id: str, last_n: int = 6) -> str:
         """Context string"""
+        if self.summary_mode:
+            return self.memory.get_context_string(
+                session_id,
+                token_budget=self.settings.HISTORY_TOKEN_BUDGET
+            )
         return self.memory.get_context_string(session_id, last_n)
     
     def get_last_topic(self, session_id: str) -> Optional[str]:
         """Son topic"""
         return self.memory.get_last_topic(session_id)
     
+    def detect_topic(self, text: str) -> Optional[str]:
+        """Metnin topic'i"""
+        return self.memory.detect_topic(text)
+    
     def clear(self, session_id: str):
         """Session temizle"""
         self.memory.clear_session(session_id)
\ No newline at end of file
@@ -0,0 +1,234 @@
+"""
+Session Store
+Conversation session kayıtlarının saklandığı backend'ler
+
+- memory: Tek process (varsayılan, eski davranış)
+- sqlite: Aynı makinedeki birden fazla worker (WAL mode)
+- redis: Birden fazla makine (network store)
+"""
+import json
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+# Redis client (opsiyonel)
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+# Record'u alıp güncellenmiş halini döndüren fonksiyon (None = kaydetme)
+RecordUpdater = Callable[[Optional[Dict]], Optional[Dict]]
+
+class SessionStore:
+    """Session store arayüzü"""
+
+    def load(self, session_id: str) -> Optional[Dict]:
+        """Session record'unu getir (yoksa None)"""
+        raise NotImplementedError
+
+    def update(self, session_id: str, updater: RecordUpdater) -> Optional[Dict]:
+        """
+        Atomik read-modify-write
+
+        Args:
+            session_id: Session identifier
+            updater: Mevcut record'u (veya None) alıp yeni record'u döndürür
+
+        Returns:
+            Kaydedilen record
+        """
+        raise NotImplementedError
+
+    def delete(self, session_id: str):
+        """Session'ı sil"""
+        raise NotImplementedError
+
+class InMemorySessionStore(SessionStore):
+    """Process içi dictionary store"""
+
+    def __init__(self):
+        self.sessions: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def load(self, session_id: str) -> Optional[Dict]:
+        return self.sessions.get(session_id)
+
+    def update(self, session_id: str, updater: RecordUpdater) -> Optional[Dict]:
+        with self._lock:
+            record = updater(self.sessions.get(session_id))
+            if record is not None:
+                self.sessions[session_id] = record
+            return record
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self.sessions.pop(session_id, None)
+
+class SQLiteSessionStore(SessionStore):
+    """
+    SQLite store (WAL mode)
+
+    Aynı makinedeki tüm worker'lar aynı dosyayı paylaşır.
+    WAL sayesinde okumalar yazmaları bloklamaz; update'ler
+    BEGIN IMMEDIATE ile process'ler arası serileştirilir.
+    TTL'i dolmuş satırlar açılışta ve her purge_every yazmada silinir
+    (Redis'te TTL'i sunucu uygular).
+    """
+
+    def __init__(self, db_path: str = "sessions.db", ttl_seconds: int = 86400, purge_every: int = 1000):
+        """
+        Args:
+            db_path: SQLite dosya yolu
+            ttl_seconds: Son yazmadan sonra session'ın geçerli kaldığı süre
+            purge_every: Kaç yazmada bir süresi dolmuş session'lar silinir (0 = kapalı)
+        """
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.purge_every = purge_every
+        self._local = threading.local()
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+
+        conn = self._conn()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_updated_at ON sessions (updated_at)")
+        self.purge_expired()
+
+    def _conn(self) -> sqlite3.Connection:
+        """Thread-local connection"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # isolation_level=None → transaction'ları kendimiz yönetiyoruz
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def load(self, session_id: str) -> Optional[Dict]:
+        row = self._conn().execute(
+            "SELECT data, updated_at FROM sessions WHERE session_id = ?",
+            (session_id,)
+        ).fetchone()
+
+        if row is None or self._expired(row[1]):
+            return None
+        return json.loads(row[0])
+
+    def update(self, session_id: str, updater: RecordUpdater) -> Optional[Dict]:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT data, updated_at FROM sessions WHERE session_id = ?",
+                (session_id,)
+            ).fetchone()
+            current = None
+            if row is not None and not self._expired(row[1]):
+                current = json.loads(row[0])
+
+            record = updater(current)
+            if record is not None:
+                conn.execute(
+                    "INSERT OR REPLACE INTO sessions (session_id, data, updated_at) VALUES (?, ?, ?)",
+                    (session_id, json.dumps(record, ensure_ascii=False), time.time())
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        if record is not None and self._should_purge():
+            self.purge_expired()
+        return record
+
+    def _should_purge(self) -> bool:
+        if self.purge_every <= 0:
+            return False
+        with self._writes_lock:
+            self._writes += 1
+            return self._writes % self.purge_every == 0
+
+    def delete(self, session_id: str):
+        self._conn().execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def purge_expired(self) -> int:
+        """TTL'i dolmuş session'ları sil"""
+        cursor = self._conn().execute(
+            "DELETE FROM sessions WHERE updated_at < ?",
+            (time.time() - self.ttl_seconds,)
+        )
+        return cursor.rowcount
+
+    def _expired(self, updated_at: float) -> bool:
+        return time.time() - updated_at > self.ttl_seconds
+
+class RedisSessionStore(SessionStore):
+    """
+    Redis store (birden fazla makine)
+
+    Update'ler WATCH/MULTI ile optimistic transaction olarak yapılır,
+    TTL Redis tarafından uygulanır.
+    """
+
+    def __init__(self, url: str, ttl_seconds: int = 86400, prefix: str = "hugip:session:"):
+        if not REDIS_AVAILABLE:
+            raise ImportError("Redis session store için 'redis' paketi gerekli: pip install redis")
+
+        self.client = redis.Redis.from_url(url)
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+
+    def load(self, session_id: str) -> Optional[Dict]:
+        data = self.client.get(self.prefix + session_id)
+        return json.loads(data) if data else None
+
+    def update(self, session_id: str, updater: RecordUpdater) -> Optional[Dict]:
+        key = self.prefix + session_id
+
+        with self.client.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(key)
+                    data = pipe.get(key)
+                    record = updater(json.loads(data) if data else None)
+
+                    pipe.multi()
+                    if record is not None:
+                        pipe.set(key, json.dumps(record, ensure_ascii=False), ex=self.ttl_seconds)
+                    pipe.execute()
+                    return record
+                except redis.WatchError:
+                    # Başka bir worker aynı anda yazdı, tekrar dene
+                    continue
+
+    def delete(self, session_id: str):
+        self.client.delete(self.prefix + session_id)
+
+def create_session_store(settings) -> SessionStore:
+    """
+    Settings'e göre session store oluştur
+
+    Args:
+        settings: SESSION_BACKEND, SESSION_DB_PATH, SESSION_STORE_URL, SESSION_TTL_SECONDS
+    """
+    backend = settings.SESSION_BACKEND
+
+    if backend == "sqlite":
+        print(f"🧠 Using SQLite session store: {settings.SESSION_DB_PATH}")
+        return SQLiteSessionStore(settings.SESSION_DB_PATH, settings.SESSION_TTL_SECONDS)
+
+    if backend == "redis":
+        print("🧠 Using Redis session store")
+        return RedisSessionStore(settings.SESSION_STORE_URL, settings.SESSION_TTL_SECONDS)
+
+    return InMemorySessionStore()
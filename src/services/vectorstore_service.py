@@ -3,29 +3,64 @@ Vectorstore Service
 Pinecone vectorstore yönetimi
 """
 from langchain_pinecone import PineconeVectorStore
-from langchain_openai import OpenAIEmbeddings
 from langchain_core.documents import Document
-from typing import List
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, List, Optional
+import threading
 from src.core.config import get_settings
+from src.services.clients import get_embeddings, get_pinecone_index, register_close_hook
+
+# Önceden hesaplanmış query embedding'leri (process içi, tüm instance'lar paylaşır)
+QUERY_EMBEDDING_CACHE_SIZE = 1024
 
 class VectorStoreService:
     """Pinecone vectorstore servisi"""
     
+    _query_embeddings: "OrderedDict[str, List[float]]" = OrderedDict()
+    _query_embeddings_lock = threading.Lock()
+    
     def __init__(self):
         self.settings = get_settings()
         
-        # Embeddings
-        self.embeddings = OpenAIEmbeddings(
-            model="text-embedding-3-small",
-            openai_api_key=self.settings.OPENAI_API_KEY
-        )
-        
-        # Vectorstore
+        # Paylaşılan client'lar (tek OpenAI pool'u, tek Pinecone index bağlantısı)
+        self.embeddings = get_embeddings()
         self.vectorstore = PineconeVectorStore(
-            index_name=self.settings.PINECONE_INDEX_NAME,
+            index=get_pinecone_index(),
             embedding=self.embeddings
         )
     
+    def embed_queries(self, queries: List[str]) -> Dict[str, List[float]]:
+        """
+        Query embedding'lerini tek API çağrısında hesaplayıp cache'le
+        
+        Batch çalıştırmada her soru için ayrı embedding isteği yerine
+        kullanılır; retrieve_documents aynı query için cache'ten okur.
+        
+        Args:
+            queries: Sorgular (tekrarlar ve cache'te olanlar atlanır)
+            
+        Returns:
+            {query: embedding}
+        """
+        cache = VectorStoreService._query_embeddings
+        with self._query_embeddings_lock:
+            missing = list(dict.fromkeys(q for q in queries if q not in cache))
+        
+        vectors = self.embeddings.embed_documents(missing) if missing else []
+        
+        with self._query_embeddings_lock:
+            for query, vector in zip(missing, vectors):
+                cache[query] = vector
+                cache.move_to_end(query)
+            while len(cache) > QUERY_EMBEDDING_CACHE_SIZE:
+                cache.popitem(last=False)
+            return {q: cache[q] for q in queries if q in cache}
+    
+    def _cached_embedding(self, query: str) -> Optional[List[float]]:
+        with self._query_embeddings_lock:
+            return VectorStoreService._query_embeddings.get(query)
+    
     def retrieve_documents(
         self, 
         query: str, 
@@ -44,6 +79,16 @@ class VectorStoreService:
             List[Document]: Retrieved dökümanlar
         """
         k = k or self.settings.RETRIEVAL_K
+        
+        # embed_queries ile önceden hesaplandıysa embedding isteği atlanır
+        embedding = self._cached_embedding(query)
+        if embedding is not None:
+            if use_mmr:
+                return self.vectorstore.max_marginal_relevance_search_by_vector(
+                    embedding, k=k, fetch_k=k * 3, lambda_mult=0.7
+                )
+            return self.vectorstore.similarity_search_by_vector(embedding, k=k)
+        
         if use_mmr:
             # MMR: Relevance + Diversity
             # fetch_k: İlk kaç dökümanı çek (sonra k tanesini seç)
@@ -72,4 +117,12 @@ class VectorStoreService:
         Debugging ve kalite kontrolü için
         """
         k = k or self.settings.RETRIEVAL_K
-        return self.vectorstore.similarity_search_with_score(query, k=k)
\ No newline at end of file
+        return self.vectorstore.similarity_search_with_score(query, k=k)
+
+@lru_cache()
+def get_vectorstore_service() -> VectorStoreService:
+    """Process genelinde paylaşılan instance (batch, warm-up)"""
+    return VectorStoreService()
+
+# Client'lar kapatılınca paylaşılan instance yeniden oluşturulsun
+register_close_hook(get_vectorstore_service.cache_clear)
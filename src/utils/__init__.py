@@ -0,0 +1,4 @@
+"""Utils module"""
+from .text import turkish_casefold, normalize_question, expand_query, estimate_tokens, KeywordAutomaton, MinHashLSH
+
+__all__ = ["turkish_casefold", "normalize_question", "expand_query", "estimate_tokens", "KeywordAutomaton", "MinHashLSH"]
\ No newline at end of file
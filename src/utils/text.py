@@ -0,0 +1,249 @@
+"""
+Text Utilities
+Türkçe metin normalizasyonu, çoklu keyword eşleştirme ve
+MinHash/LSH ile benzer metin bulma
+"""
+import random
+import re
+import zlib
+from collections import Counter, deque
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Türkçe'ye özgü büyük/küçük harf dönüşümleri
+# str.lower() "İ" harfini "i̇" (i + combining dot) yapar, "I" harfini "i" yapar
+_TURKISH_UPPER_MAP = str.maketrans({"İ": "i", "I": "ı"})
+
+
+def turkish_casefold(text: str) -> str:
+    """
+    Türkçe kurallarına uygun lowercase
+
+    Örnek: "HUGİP Akademi" → "hugip akademi", "ISPARTA" → "ısparta"
+    """
+    return text.translate(_TURKISH_UPPER_MAP).lower()
+
+
+# Aksansız yazılmış sorular aynı kümeye düşsün diye
+_TURKISH_ASCII_MAP = str.maketrans("çğıöşüâîû", "cgiosuaiu")
+_NON_WORD_RE = re.compile(r"[^\w\s]+")
+_SPACE_RE = re.compile(r"\s+")
+# Ek almış soru kelimeleri → kök ("FESTUP nedir" ile "FESTUP ne" aynı soru)
+_QUESTION_WORDS = {
+    "nedir": "ne",
+    "nelerdir": "neler",
+    "kimdir": "kim",
+    "nasildir": "nasil",
+    "neresidir": "neresi",
+    "midir": "mi",
+    "mudur": "mu",
+}
+
+
+def normalize_question(text: str) -> str:
+    """
+    Soru karşılaştırma için normalize et
+
+    Türkçe lowercase, aksanları kaldır, noktalama sil, boşlukları tekle,
+    soru kelimelerini köke indir.
+    Örnek: "FESTUP Nedir?" → "festup ne", "Şubat'ta mı" → "subatta mi"
+    """
+    text = turkish_casefold(text).translate(_TURKISH_ASCII_MAP)
+    text = _NON_WORD_RE.sub("", text)
+    return " ".join(_QUESTION_WORDS.get(word, word) for word in _SPACE_RE.split(text) if word)
+
+
+# Takip sorusu işaretleri: fiil kökleri ek alabilir ("detaylandır", "anlatır"),
+# diğerleri tam kelime olarak eşleşir ("o" → "okul" veya "ürün" değil)
+_FOLLOW_UP_STEMS = ("detay", "açıkla", "anlat", "genişlet", "hazırla", "güncelle", "değiştir")
+_FOLLOW_UP_WORDS = (
+    "daha fazla", "kimler", "ne zaman", "nerede", "nasıl", "kaç",
+    "yeni", "tekrar", "aynı", "o", "şu", "bunun"
+)
+_FOLLOW_UP_RE = re.compile(
+    r"\b(?:" + "|".join(_FOLLOW_UP_STEMS) + r")\w*"
+    + r"|\b(?:" + "|".join(word.replace(" ", r"\s+") for word in _FOLLOW_UP_WORDS) + r")\b"
+)
+
+
+def expand_query(question: str, topic: Optional[str]) -> str:
+    """
+    Takip sorusunu son topic ile genişlet (retrieve query'si)
+
+    RetrieveNode, batch embedding ve warm-up aynı query'yi üretsin diye
+    tek yerde. Örnek: ("Ne zaman?", "FESTUP") → "FESTUP Ne zaman?"
+
+    Args:
+        question: Kullanıcı sorusu
+        topic: Session'ın son topic'i (yoksa soru aynen döner)
+    """
+    if topic and _FOLLOW_UP_RE.search(turkish_casefold(question)):
+        return f"{topic} {question}"
+    return question
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Yaklaşık token sayısı (~4 karakter = 1 token)
+
+    Prompt bütçesi hesapları için yeterli; tokenizer gerektirmez.
+    """
+    return len(text) // 4 + 1
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick keyword matcher
+
+    Tüm keyword'ler tek bir automaton'a derlenir, metin tek geçişte
+    taranır (keyword sayısından bağımsız). Eşleştirme turkish_casefold
+    edilmiş metin üzerinde yapılır.
+    """
+
+    def __init__(self, keywords: Iterable[Tuple[str, str]]):
+        """
+        Args:
+            keywords: (keyword, topic) listesi, öncelik sırasına göre
+                (ilk eleman en yüksek öncelik)
+        """
+        self.topics: List[str] = []
+        # state -> {char: next_state}
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # state -> bu state'te biten keyword'lerin öncelik index'leri
+        self._output: List[List[int]] = [[]]
+
+        for priority, (keyword, topic) in enumerate(keywords):
+            self.topics.append(topic)
+            self._add(turkish_casefold(keyword), priority)
+
+        self._build()
+
+    def _add(self, keyword: str, priority: int):
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append(priority)
+
+    def _build(self):
+        """Failure link'lerini BFS ile hesapla"""
+        queue = deque(self._goto[0].values())
+
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._output[next_state] = (
+                    self._output[next_state] + self._output[self._fail[next_state]]
+                )
+
+    def best_match(self, text: str) -> Optional[int]:
+        """
+        Metinde geçen en yüksek öncelikli keyword'ün index'i
+
+        Returns:
+            Öncelik index'i (topics listesinde) veya None
+        """
+        best = None
+        state = 0
+
+        for char in turkish_casefold(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+
+            for priority in self._output[state]:
+                if best is None or priority < best:
+                    best = priority
+                    if best == 0:
+                        return best
+
+        return best
+
+
+class MinHashLSH:
+    """
+    MinHash imzaları + LSH band index'i
+
+    Metinler karakter 3-gram kümelerine ayrılır; iki metnin imzalarında
+    eşit olan pozisyon oranı Jaccard benzerliğini tahmin eder. İmza
+    bands × rows parçaya bölünür, en az bir bandı aynı olan metinler
+    aday olur (~(1/bands)^(1/rows) benzerliğin üstü yüksek olasılıkla).
+    Adaylar çağıran tarafta jaccard() ile kesin olarak doğrulanmalı.
+    """
+
+    def __init__(self, num_perm: int = 60, bands: int = 20, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm, bands'e tam bölünmeli")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+
+        # h_i(x) = x XOR mask_i (32-bit permütasyon, min() C seviyesinde döner)
+        # seed sabit → imzalar process'ler arasında aynı
+        rng = random.Random(seed)
+        self._masks = [rng.getrandbits(32) for _ in range(num_perm)]
+        # band index → band hash → key'ler
+        self._buckets: List[Dict[Tuple[int, ...], Set[int]]] = [{} for _ in range(bands)]
+
+    @staticmethod
+    def shingles(text: str, k: int = 3) -> Set[int]:
+        """Karakter k-gram'larının (kelime sınırları dahil) 32-bit hash'leri"""
+        padded = f" {text} "
+        if len(padded) <= k:
+            return {zlib.crc32(padded.encode("utf-8"))}
+        return {
+            zlib.crc32(padded[i:i + k].encode("utf-8"))
+            for i in range(len(padded) - k + 1)
+        }
+
+    @staticmethod
+    def jaccard(a: Set[int], b: Set[int]) -> float:
+        """Kesin Jaccard benzerliği"""
+        return len(a & b) / len(a | b) if a or b else 1.0
+
+    def signature(self, text: str, hashes: Optional[Set[int]] = None) -> Tuple[int, ...]:
+        """Metnin MinHash imzası (shingle hash'leri hazırsa tekrar hesaplanmaz)"""
+        hashes = hashes or self.shingles(text)
+        return tuple(min(map(mask.__xor__, hashes)) for mask in self._masks)
+
+    @staticmethod
+    def similarity(sig_a: Tuple[int, ...], sig_b: Tuple[int, ...]) -> float:
+        """Tahmini Jaccard benzerliği"""
+        return sum(x == y for x, y in zip(sig_a, sig_b)) / len(sig_a)
+
+    def _bands(self, signature: Tuple[int, ...]):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows]
+
+    def insert(self, key: int, signature: Tuple[int, ...]):
+        """İmzayı key ile index'e ekle"""
+        for band, chunk in self._bands(signature):
+            self._buckets[band].setdefault(chunk, set()).add(key)
+
+    def candidates(self, signature: Tuple[int, ...], limit: Optional[int] = None) -> List[int]:
+        """
+        En az bir bandı eşleşen key'ler
+
+        Args:
+            signature: Aranan imza
+            limit: En çok band'i eşleşen ilk N aday (None = hepsi)
+        """
+        hits: Counter = Counter()
+        for band, chunk in self._bands(signature):
+            hits.update(self._buckets[band].get(chunk, ()))
+        return [key for key, _ in hits.most_common(limit)]
+
+    def clear(self):
+        self._buckets = [{} for _ in range(self.bands)]
@@ -0,0 +1,151 @@
+"""
+Model Cascade Benchmark
+Lokal mock OpenAI sunucusuna karşı RAG generation + reflection'ı
+cascade modunda (ucuz model, grounding başarısızsa güçlü model) ve her
+cevabı güçlü modelin ürettiği baseline ile karşılaştırır
+
+Mock sunucu model başına sabit gecikme ile cevap verir; hallucination
+grader her FAIL_EVERY'inci cevabı reddeder.
+
+Kullanım:
+    python tests/bench_cascade.py [fail_every]
+"""
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+REQUESTS = 40
+FAIL_EVERY = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+CHEAP_MODEL, STRONG_MODEL = "gpt-4o-mini", "gpt-4o"
+MODEL_LATENCY_MS = {CHEAP_MODEL: 40, STRONG_MODEL: 160}
+GRADER_LATENCY_MS = 20
+
+grades = {"count": 0}
+grades_lock = threading.Lock()
+
+class MockOpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def setup(self):
+        super().setup()
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+
+        if request.get("response_format") or request.get("tools"):
+            # Hallucination grader (structured output)
+            with grades_lock:
+                grades["count"] += 1
+                grounded = grades["count"] % FAIL_EVERY != 0
+            time.sleep(GRADER_LATENCY_MS / 1000)
+            content = json.dumps({"binary_score": grounded, "reasoning": "bench"})
+            usage = {"prompt_tokens": 900, "completion_tokens": 15}
+        else:
+            time.sleep(MODEL_LATENCY_MS.get(request["model"], 40) / 1000)
+            content = "FESTUP 4 Aralık'ta Haliç Üniversitesi'nde yapılacak."
+            usage = {"prompt_tokens": 800, "completion_tokens": 80}
+
+        body = json.dumps({
+            "id": "chatcmpl-bench",
+            "object": "chat.completion",
+            "created": 0,
+            "model": request["model"],
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {**usage, "total_tokens": sum(usage.values())},
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+server = ThreadingHTTPServer(("127.0.0.1", 0), MockOpenAIHandler)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+
+# Settings ve ChatOpenAI import'tan önce
+os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{server.server_address[1]}/v1"
+os.environ["LLM_CASCADE"] = "true"
+os.environ["LLM_ROLE_PROFILES"] = json.dumps({
+    "generator": {"model": CHEAP_MODEL},
+    "escalation": {"model": STRONG_MODEL},
+})
+
+from langchain_core.documents import Document
+
+from src.graph.graph import initial_state
+from src.graph.nodes.rag import GenerateRAGNode
+from src.graph.nodes.reflection import ReflectionNode
+from src.services.llm_services import LLMService
+from src.services.llm_usage import cascade_tracker, estimate_cost
+
+DOCUMENTS = [Document(page_content="FESTUP 4 Aralık'ta yapılacak.", metadata={"source": "festup.pdf"})]
+
+def run(generate_node: GenerateRAGNode, reflection_node: ReflectionNode) -> float:
+    """REQUESTS soruyu generate + reflection'dan geçir, toplam süreyi döndür"""
+    grades["count"] = 0
+    start = time.perf_counter()
+    for i in range(REQUESTS):
+        state = {**initial_state("FESTUP ne zaman?", f"bench-{i}"), "decision": "rag", "documents": DOCUMENTS}
+        reflection_node(generate_node(state))
+    return time.perf_counter() - start
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print(f"🪜 Model Cascade Benchmark ({REQUESTS} RAG cevabı, her {FAIL_EVERY}. cevap grounding'den kalır)")
+    print("=" * 70)
+
+    generate_node = GenerateRAGNode()
+    reflection_node = ReflectionNode()
+    assert reflection_node.cascade
+
+    # Node'ların print'leri tabloyu bozmasın
+    stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+    try:
+        cascade_seconds = run(generate_node, reflection_node)
+
+        # Baseline: güçlü model üretir, başarısızsa yine güçlü model yeniden üretir
+        generate_node.llm = LLMService().get_llm("escalation")
+        reflection_node.cascade = False
+        baseline_seconds = run(generate_node, reflection_node)
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+    stats = cascade_tracker.snapshot()
+    print(f"\n   ucuz tier'da kalan: {stats['cheap_tier']}/{stats['requests']} ({stats['cheap_ratio']:.0%})"
+          f"   escalate: {stats['escalated']}")
+
+    print(f"\n   {'':<22} {'süre (sn)':>10} {'generation USD':>16}")
+    print(f"   {'cascade':<22} {cascade_seconds:>10.2f} {stats['cost_usd']['actual']:>16.5f}")
+    baseline_cost = REQUESTS * estimate_cost(STRONG_MODEL, 800, 80) * (1 + 1 / FAIL_EVERY)
+    print(f"   {'baseline (güçlü model)':<22} {baseline_seconds:>10.2f} {baseline_cost:>16.5f}")
+
+    print("\n   cascade_tracker tahmini (her cevap tek güçlü çağrı):")
+    print(f"      gecikme: {stats['latency_ms']['actual']:.0f} ms, baseline {stats['latency_ms']['baseline']:.0f} ms"
+          f" → {stats['latency_ms']['saved']:.0f} ms kazanç")
+    print(f"      maliyet: {stats['cost_usd']['actual']:.5f} USD, baseline {stats['cost_usd']['baseline']:.5f} USD"
+          f" → {stats['cost_usd']['saved']:.5f} USD kazanç")
+
+    assert stats["requests"] == REQUESTS
+    assert stats["escalated"] == REQUESTS // FAIL_EVERY
+
+    server.shutdown()
+
+    print("\n" + "=" * 70)
+    print("✅ BENCHMARK TAMAMLANDI!")
+    print("=" * 70)
@@ -0,0 +1,130 @@
+"""
+FeedbackDB SQLite Benchmark
+Eski (her işlemde yeni connection, rollback journal) ve yeni
+(thread-local connection, WAL) yaklaşımı karşılaştırır
+
+Ölçülenler:
+- Insert/sn (tek thread)
+- Yazma devam ederken eşzamanlı okuma latency'si (p50 / p99)
+
+Kullanım:
+    python tests/bench_feedback_db.py [insert_sayısı]
+"""
+import sys
+import os
+import time
+import sqlite3
+import tempfile
+import threading
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+# Benchmark her zaman lokal SQLite üzerinde çalışır
+os.environ.pop("SUPABASE_URL", None)
+os.environ.pop("SUPABASE_KEY", None)
+
+from src.database.feedback_db import FeedbackDB, INSERT_FEEDBACK_SQL, SELECT_ALL_FEEDBACK_SQL
+
+READER_THREADS = 4
+READS_PER_THREAD = 200
+
+class LegacyFeedbackDB:
+    """Eski davranış: her çağrıda connect → execute → commit → close"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+
+    def add_feedback(self, session_id, question, answer, rating, route=None):
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute(
+            INSERT_FEEDBACK_SQL,
+            (session_id, question, answer, rating, route, None, None, None, None, None)
+        )
+        conn.commit()
+        conn.close()
+
+    def get_all_feedback(self, limit=100):
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        rows = [dict(row) for row in conn.execute(SELECT_ALL_FEEDBACK_SQL, (limit,)).fetchall()]
+        conn.close()
+        return rows
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+def bench(name: str, db, n_inserts: int):
+    # 1. Insert throughput
+    start = time.perf_counter()
+    for i in range(n_inserts):
+        db.add_feedback(
+            session_id=f"session-{i % 100}",
+            question=f"FESTUP ne zaman? ({i})",
+            answer="FESTUP 4 Aralık'ta yapılacak." * 5,
+            rating="positive" if i % 3 else "negative",
+            route="rag"
+        )
+    insert_rate = n_inserts / (time.perf_counter() - start)
+
+    # 2. Yazma devam ederken okuma latency'si
+    latencies = []
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def writer():
+        i = 0
+        while not stop.is_set():
+            db.add_feedback(f"writer-{i}", "Soru", "Cevap", "positive", "rag")
+            i += 1
+
+    def reader():
+        local = []
+        for _ in range(READS_PER_THREAD):
+            t = time.perf_counter()
+            db.get_all_feedback(limit=50)
+            local.append((time.perf_counter() - t) * 1000)
+        with lock:
+            latencies.extend(local)
+
+    writer_thread = threading.Thread(target=writer)
+    writer_thread.start()
+    readers = [threading.Thread(target=reader) for _ in range(READER_THREADS)]
+    for t in readers:
+        t.start()
+    for t in readers:
+        t.join()
+    stop.set()
+    writer_thread.join()
+
+    print(f"\n   📊 {name}")
+    print(f"      Insert: {insert_rate:,.0f} /sn")
+    print(f"      Okuma latency (yazma sırasında): p50 {percentile(latencies, 50):.2f} ms, p99 {percentile(latencies, 99):.2f} ms")
+
+if __name__ == "__main__":
+    n_inserts = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    print("=" * 70)
+    print("⏱️  FeedbackDB SQLite Benchmark")
+    print("=" * 70)
+    print(f"\n{n_inserts} insert, {READER_THREADS} okuyucu thread × {READS_PER_THREAD} okuma")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Eski: tablolar aynı şemayla, rollback journal mode
+        legacy_path = str(Path(tmp) / "legacy.db")
+        FeedbackDB(db_path=legacy_path).close()
+        conn = sqlite3.connect(legacy_path)
+        conn.execute("PRAGMA journal_mode=DELETE")
+        conn.close()
+        bench("ÖNCE (connection per call, rollback journal)", LegacyFeedbackDB(legacy_path), n_inserts)
+
+        db = FeedbackDB(db_path=str(Path(tmp) / "pooled.db"))
+        bench("SONRA (thread-local connection, WAL)", db, n_inserts)
+        db.close()
+
+    print("\n" + "=" * 70)
+    print("✅ BENCHMARK TAMAMLANDI!")
+    print("=" * 70)
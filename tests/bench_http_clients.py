@@ -0,0 +1,132 @@
+"""
+HTTP Client Benchmark
+Lokal mock OpenAI sunucusuna karşı her istekte yeni client ile
+paylaşılan (registry) client'ı karşılaştırır
+
+Mock sunucu her yeni bağlantıda HANDSHAKE_MS bekler (TCP + TLS handshake
+ve ağ gecikmesinin yerine); keep-alive ile yeniden kullanılan bağlantılar
+bu maliyeti ödemez.
+
+Kullanım:
+    python tests/bench_http_clients.py [handshake_ms]
+"""
+import json
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+import httpx
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+
+from src.services.clients import get_http_client
+
+REQUESTS = 50
+HANDSHAKE_MS = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+
+CHAT_RESPONSE = {
+    "id": "chatcmpl-bench",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "gpt-4o-mini",
+    "choices": [{
+        "index": 0,
+        "message": {"role": "assistant", "content": "FESTUP Aralık'ta."},
+        "finish_reason": "stop",
+    }],
+    "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+}
+
+EMBEDDING_RESPONSE = {
+    "object": "list",
+    "data": [{"object": "embedding", "index": 0, "embedding": [0.1] * 64}],
+    "model": "text-embedding-3-small",
+    "usage": {"prompt_tokens": 3, "total_tokens": 3},
+}
+
+class MockOpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def setup(self):
+        # Yeni bağlantı: handshake maliyeti
+        time.sleep(HANDSHAKE_MS / 1000)
+        super().setup()
+        # Header ve body ayrı yazılıyor; Nagle + delayed ACK 40 ms eklemesin
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        payload = CHAT_RESPONSE if self.path.endswith("/chat/completions") else EMBEDDING_RESPONSE
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+def bench(label: str, request_fn):
+    latencies = []
+    for _ in range(REQUESTS):
+        start = time.perf_counter()
+        request_fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+    print(f"      {label:<28} p50 {percentile(latencies, 50):6.2f} ms   p99 {percentile(latencies, 99):6.2f} ms")
+    return percentile(latencies, 50)
+
+if __name__ == "__main__":
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockOpenAIHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+    print("=" * 70)
+    print(f"🌐 HTTP Client Benchmark (mock handshake {HANDSHAKE_MS} ms, {REQUESTS} istek)")
+    print("=" * 70)
+
+    def new_chat_client():
+        with httpx.Client() as client:
+            ChatOpenAI(model="gpt-4o-mini", api_key="bench", base_url=base_url, http_client=client).invoke("FESTUP?")
+
+    shared_llm = ChatOpenAI(
+        model="gpt-4o-mini", api_key="bench", base_url=base_url, http_client=get_http_client("bench")
+    )
+
+    def new_embeddings_client():
+        with httpx.Client() as client:
+            OpenAIEmbeddings(
+                api_key="bench", base_url=base_url, http_client=client, check_embedding_ctx_length=False
+            ).embed_query("FESTUP?")
+
+    shared_embeddings = OpenAIEmbeddings(
+        api_key="bench", base_url=base_url, http_client=get_http_client("bench"), check_embedding_ctx_length=False
+    )
+
+    print("\n   💬 Chat completion")
+    before = bench("yeni client / istek", new_chat_client)
+    after = bench("paylaşılan client", lambda: shared_llm.invoke("FESTUP?"))
+    print(f"      → istek başına {before - after:.1f} ms kazanç")
+
+    print("\n   🔢 Embedding")
+    before = bench("yeni client / istek", new_embeddings_client)
+    after = bench("paylaşılan client", lambda: shared_embeddings.embed_query("FESTUP?"))
+    print(f"      → istek başına {before - after:.1f} ms kazanç")
+
+    server.shutdown()
+
+    print("\n" + "=" * 70)
+    print("✅ BENCHMARK TAMAMLANDI!")
+    print("=" * 70)
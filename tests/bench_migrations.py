@@ -0,0 +1,108 @@
+"""
+Schema Migration Benchmark
+1M satırlık feedback ve chat_history tablolarında index'siz (v2) ve
+index'li (son versiyon) sorgu sürelerini karşılaştırır
+
+Kullanım:
+    python tests/bench_migrations.py [satır_sayısı]
+"""
+import sys
+import time
+import random
+import sqlite3
+import tempfile
+from pathlib import Path
+from datetime import datetime, timedelta
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.database.migrations import migrate
+from src.database.feedback_db import (
+    SELECT_CHAT_HISTORY_SQL,
+    SELECT_RECENT_FEEDBACK_SQL,
+)
+
+N_SESSIONS = 50000
+REPEAT = 20
+
+QUERIES = [
+    ("get_chat_history (session_id, ORDER BY created_at)",
+     SELECT_CHAT_HISTORY_SQL, lambda: (f"session-{random.randrange(N_SESSIONS)}", 50)),
+    ("get_recent_feedback (son 7 gün)",
+     SELECT_RECENT_FEEDBACK_SQL, lambda: (7,)),
+    ("feedback WHERE rating + route",
+     "SELECT COUNT(*) FROM feedback WHERE rating = ? AND route = ?", lambda: ("negative", "web_search")),
+]
+
+def populate(conn: sqlite3.Connection, n_rows: int):
+    """Son 2 yıla yayılmış n_rows chat + n_rows feedback"""
+    now = datetime.now()
+    routes = ["rag", "direct", "web_search"]
+
+    def created_at(i):
+        return (now - timedelta(minutes=(n_rows - i) * 1051200 // n_rows)).strftime("%Y-%m-%d %H:%M:%S")
+
+    batch = 50000
+    for start in range(0, n_rows, batch):
+        chats = [
+            (f"session-{i % N_SESSIONS}", f"Soru {i}", "Cevap", routes[i % 3], None, 1.5, created_at(i))
+            for i in range(start, min(start + batch, n_rows))
+        ]
+        conn.executemany(
+            "INSERT INTO chat_history (session_id, question, answer, route, sources, response_time, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            chats
+        )
+        feedback = [
+            (f"session-{i % N_SESSIONS}", f"Soru {i}", "Cevap", "positive" if i % 4 else "negative",
+             routes[i % 3], created_at(i))
+            for i in range(start, min(start + batch, n_rows))
+        ]
+        conn.executemany(
+            "INSERT INTO feedback (session_id, question, answer, rating, route, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            feedback
+        )
+        conn.commit()
+
+def run_queries(conn: sqlite3.Connection, label: str):
+    print(f"\n   📊 {label}")
+    for name, sql, params in QUERIES:
+        start = time.perf_counter()
+        for _ in range(REPEAT):
+            conn.execute(sql, params()).fetchall()
+        avg_ms = (time.perf_counter() - start) / REPEAT * 1000
+
+        plan = conn.execute("EXPLAIN QUERY PLAN " + sql, params()).fetchall()
+        plan_text = "; ".join(row[-1] for row in plan)
+        print(f"      {name}: {avg_ms:.2f} ms  [{plan_text}]")
+
+if __name__ == "__main__":
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    print("=" * 70)
+    print("🗄️  Migration Benchmark")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sqlite3.connect(str(Path(tmp) / "bench.db"))
+        migrate(conn, target=2)
+
+        print(f"\n⏳ {n_rows:,} chat_history + {n_rows:,} feedback satırı ekleniyor...")
+        start = time.perf_counter()
+        populate(conn, n_rows)
+        print(f"   ✅ {time.perf_counter() - start:.1f} sn")
+
+        run_queries(conn, "ÖNCE (index yok)")
+
+        start = time.perf_counter()
+        version = migrate(conn)
+        print(f"\n   ⏱️  Migration → v{version}: {time.perf_counter() - start:.1f} sn")
+
+        run_queries(conn, "SONRA (index'li)")
+        conn.close()
+
+    print("\n" + "=" * 70)
+    print("✅ BENCHMARK TAMAMLANDI!")
+    print("=" * 70)
@@ -0,0 +1,117 @@
+"""
+Chat History Retention Benchmark
+1 yıllık chat_history'yi 90 günlük retention ile arşivler; öncesi/sonrası
+veritabanı boyutu, insert hızı ve session history sorgu süresini ölçer,
+rollup'ların değişmediğini kontrol eder
+
+Kullanım:
+    python tests/bench_retention.py [satır_sayısı]
+"""
+import sys
+import os
+import time
+import random
+import tempfile
+from pathlib import Path
+from datetime import datetime, timedelta, timezone
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+# Benchmark her zaman lokal SQLite üzerinde çalışır
+os.environ.pop("SUPABASE_URL", None)
+os.environ.pop("SUPABASE_KEY", None)
+
+from src.database.feedback_db import FeedbackDB, SELECT_CHAT_HISTORY_SQL
+from src.database.retention import archive_chat_history, archive_path, read_archive
+
+N_SESSIONS = 20000
+REPEAT = 200
+
+def populate(db: FeedbackDB, n_rows: int):
+    """Son 365 güne yayılmış n_rows chat"""
+    now = datetime.now(timezone.utc)  # created_at UTC (CURRENT_TIMESTAMP)
+    routes = ["rag", "direct", "web_search"]
+    answer = "FESTUP 4 Aralık'ta Haliç Kongre Merkezi'nde yapılacak. " * 10
+    conn = db.connections.get()
+
+    batch = 50000
+    for start in range(0, n_rows, batch):
+        conn.executemany(
+            "INSERT INTO chat_history (session_id, question, answer, route, sources, response_time, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (f"session-{i % N_SESSIONS}", f"Soru {i}", answer, routes[i % 3], None, 1.5,
+                 (now - timedelta(minutes=(n_rows - i) * 525600 // n_rows)).strftime("%Y-%m-%d %H:%M:%S"))
+                for i in range(start, min(start + batch, n_rows))
+            ]
+        )
+        conn.commit()
+
+def measure(db: FeedbackDB, label: str):
+    conn = db.connections.get()
+
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        conn.execute(SELECT_CHAT_HISTORY_SQL, (f"session-{random.randrange(N_SESSIONS)}", 50)).fetchall()
+    lookup_ms = (time.perf_counter() - start) / REPEAT * 1000
+
+    start = time.perf_counter()
+    for i in range(REPEAT):
+        db.add_chat_history(f"bench-{i}", "Soru", "Cevap", route="rag", response_time=1.0)
+    insert_ms = (time.perf_counter() - start) / REPEAT * 1000
+
+    rows = conn.execute("SELECT COUNT(*) FROM chat_history").fetchone()[0]
+    size_mb = os.path.getsize(db.db_path) / 1024 / 1024
+    print(f"\n   📊 {label}")
+    print(f"      Satır: {rows:,}, DB: {size_mb:,.1f} MB")
+    print(f"      Session history: {lookup_ms:.2f} ms, insert: {insert_ms:.2f} ms")
+
+def rollup_snapshot(db: FeedbackDB):
+    conn = db.connections.get()
+    return (
+        conn.execute("SELECT SUM(chats), SUM(response_time_count) FROM chat_daily").fetchone()[:],
+        conn.execute("SELECT SUM(count) FROM chat_latency_daily").fetchone()[:],
+    )
+
+if __name__ == "__main__":
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+
+    print("=" * 70)
+    print("🗃️  Retention Benchmark")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = FeedbackDB(db_path=str(Path(tmp) / "bench.db"), write_behind=False)
+
+        print(f"\n⏳ {n_rows:,} chat_history satırı ekleniyor...")
+        populate(db, n_rows)
+        measure(db, "ÖNCE (365 gün)")
+        rollups_before = rollup_snapshot(db)
+
+        archive_dir = str(Path(tmp) / "archives")
+        result = archive_chat_history(db, retention_days=90, archive_dir=archive_dir)
+        print(f"\n   🗃️  {result['archived']:,} satır {len(result['months'])} aylık arşive taşındı ({result['seconds']:.1f} sn)")
+
+        archived_files = [archive_path(archive_dir, month) for month in result["months"]]
+        archive_rows = sum(1 for path in archived_files for _ in read_archive(path))
+        archive_mb = sum(os.path.getsize(path) for path in archived_files) / 1024 / 1024
+        print(f"      Arşiv: {archive_rows:,} satır, {archive_mb:,.1f} MB")
+
+        measure(db, "SONRA (90 gün)")
+        # measure() her seferinde REPEAT chat ekler
+        rollups_after = rollup_snapshot(db)
+        print(f"\n   Rollup'lar korundu: {rollups_before} → {rollups_after}")
+        assert archive_rows == result["archived"]
+        assert rollups_after[0][0] == rollups_before[0][0] + REPEAT
+
+        # Compaction arşivlenmiş günlere dokunmamalı, kalan günleri eksik saymamalı
+        db.rebuild_rollups()
+        rollups_rebuilt = rollup_snapshot(db)
+        print(f"   rebuild_rollups sonrası: {rollups_rebuilt}")
+        assert rollups_rebuilt == rollups_after
+        db.close()
+
+    print("\n" + "=" * 70)
+    print("✅ BENCHMARK TAMAMLANDI!")
+    print("=" * 70)
@@ -0,0 +1,96 @@
+"""
+Full-Text Search Benchmark
+chat_history'de LIKE '%...%' taraması ile FTS5 aramasını karşılaştırır
+
+Kullanım:
+    python tests/bench_search.py [satır_sayısı]
+"""
+import sys
+import os
+import time
+import random
+import tempfile
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+# Benchmark her zaman lokal SQLite üzerinde çalışır
+os.environ.pop("SUPABASE_URL", None)
+os.environ.pop("SUPABASE_KEY", None)
+
+from src.database.feedback_db import FeedbackDB
+
+REPEAT = 50
+WORDS = [
+    "festup", "akademi", "başvuru", "kayıt", "etkinlik", "konuşmacı", "haliç", "aralık",
+    "şubat", "bilet", "program", "gönüllü", "sertifika", "online", "istanbul", "ankara",
+]
+FILLER = [f"kelime{i}" for i in range(5000)]
+QUERIES = ["festup kayıt", "akademi başvuru", "sertifika", "gönüllü ankara", "konuş"]
+
+def populate(db: FeedbackDB, n_rows: int):
+    rng = random.Random(1)
+    conn = db.connections.get()
+    batch = 20000
+    for start in range(0, n_rows, batch):
+        rows = []
+        for i in range(start, min(start + batch, n_rows)):
+            # Konu kelimeleri satırların ~%5'inde geçer
+            question = " ".join(
+                rng.choice(WORDS) if rng.random() < 0.05 else rng.choice(FILLER) for _ in range(8)
+            )
+            answer = " ".join(rng.choice(FILLER) for _ in range(40))
+            rows.append((f"session-{i % 5000}", question, answer, "rag", None, 1.0))
+        conn.executemany(
+            "INSERT INTO chat_history (session_id, question, answer, route, sources, response_time) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            rows
+        )
+        conn.commit()
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+def bench(label: str, fn):
+    latencies = []
+    for i in range(REPEAT):
+        start = time.perf_counter()
+        fn(QUERIES[i % len(QUERIES)])
+        latencies.append((time.perf_counter() - start) * 1000)
+    print(f"      {label}: p50 {percentile(latencies, 50):.2f} ms, p99 {percentile(latencies, 99):.2f} ms")
+
+if __name__ == "__main__":
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    print("=" * 70)
+    print("🔍 Full-Text Search Benchmark")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = FeedbackDB(db_path=str(Path(tmp) / "bench.db"), write_behind=False)
+
+        print(f"\n⏳ {n_rows:,} chat_history satırı ekleniyor (FTS trigger'ları dahil)...")
+        start = time.perf_counter()
+        populate(db, n_rows)
+        print(f"   ✅ {time.perf_counter() - start:.1f} sn")
+
+        conn = db.connections.get()
+
+        def like_search(query):
+            conditions = " AND ".join("(question LIKE ? OR answer LIKE ?)" for _ in query.split())
+            params = [p for word in query.split() for p in (f"%{word}%", f"%{word}%")]
+            return conn.execute(
+                f"SELECT * FROM chat_history WHERE {conditions} ORDER BY created_at DESC LIMIT 20", params
+            ).fetchall()
+
+        print(f"\n   📊 {REPEAT} arama, ilk sayfa (20 satır)")
+        bench("LIKE '%...%'", like_search)
+        bench("FTS5 (bm25)", lambda q: db.search(q, table="chat_history", limit=20))
+        bench("FTS5, 10. sayfa", lambda q: db.search(q, table="chat_history", limit=20, cursor="180"))
+        db.close()
+
+    print("\n" + "=" * 70)
+    print("✅ BENCHMARK TAMAMLANDI!")
+    print("=" * 70)
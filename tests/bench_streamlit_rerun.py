@@ -0,0 +1,87 @@
+"""
+Streamlit Rerun Benchmark
+Sohbet geçmişi büyüdükçe rerun ve feedback tıklaması süresini ölçer
+
+Geçmişteki cevapların son UNRATED_TAIL tanesi ve en eski cevap
+puanlanmamış, diğerleri puanlanmış kabul edilir; puanlanmamış eski
+cevabın da feedback butonlarının gösterildiği kontrol edilir.
+
+Kullanım:
+    python tests/bench_streamlit_rerun.py
+"""
+import os
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from streamlit.testing.v1 import AppTest
+
+import src.database.feedback_db as feedback_db
+
+# Feedback tıklamaları geçici SQLite'a yazılır
+os.environ.pop("SUPABASE_URL", None)
+os.environ.pop("SUPABASE_KEY", None)
+TMP_DIR = tempfile.mkdtemp()
+_FeedbackDB = feedback_db.FeedbackDB
+
+class BenchFeedbackDB(_FeedbackDB):
+    def __init__(self, *args, **kwargs):
+        super().__init__(db_path=os.path.join(TMP_DIR, "bench.db"), write_behind=True)
+
+feedback_db.FeedbackDB = BenchFeedbackDB
+
+APP_FILE = str(project_root / "app.py")
+HISTORY_SIZES = (10, 50, 200, 500)
+REPEAT = 5
+UNRATED_TAIL = 5
+
+def fake_history(n_messages: int):
+    messages = []
+    for i in range(n_messages // 2):
+        messages.append({"role": "user", "content": f"Soru {i}: FESTUP ne zaman yapılıyor?"})
+        messages.append({
+            "role": "assistant",
+            "content": f"Cevap {i}: FESTUP her yıl Aralık ayında Haliç Üniversitesi'nde yapılıyor. " * 3,
+            "sources": ["data/festup.pdf", "data/etkinlikler.pdf"],
+            "route": "rag",
+        })
+    return messages
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("🖥️  Streamlit Rerun Benchmark")
+    print("=" * 70)
+
+    print(f"\n   {'mesaj':>6} {'ilk run (ms)':>13} {'rerun (ms)':>11} {'👍 tıklama (ms)':>16}")
+    for n_messages in HISTORY_SIZES:
+        app = AppTest.from_file(APP_FILE, default_timeout=300)
+        app.session_state["messages"] = fake_history(n_messages)
+        assistant_idx = list(range(1, n_messages, 2))
+        app.session_state["feedback_given"] = {f"feedback_{idx}" for idx in assistant_idx[1:-UNRATED_TAIL]}
+        first = timed(app.run)
+
+        reruns = sorted(timed(app.run) for _ in range(REPEAT))
+        assert app.button(key="thumbs_up_1") is not None
+
+        # Son cevabın 👍 butonu
+        last_idx = n_messages - 1
+        click = timed(lambda: app.button(key=f"thumbs_up_{last_idx}").click().run())
+        assert f"feedback_{last_idx}" in app.session_state["feedback_given"]
+
+        print(f"   {n_messages:>6} {first:>13.1f} {reruns[REPEAT // 2]:>11.1f} {click:>16.1f}")
+
+    print("\n" + "=" * 70)
+    print("✅ BENCHMARK TAMAMLANDI!")
+    print("=" * 70)
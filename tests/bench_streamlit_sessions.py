@@ -0,0 +1,93 @@
+"""
+Streamlit Session Benchmark
+Yeni browser session'larının graph / FeedbackDB'yi yeniden kurmadığını,
+session başına açılış süresi ve belleğin sabit kaldığını ölçer
+
+Kullanım:
+    python tests/bench_streamlit_sessions.py [session_sayısı]
+"""
+import sys
+import time
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from streamlit.testing.v1 import AppTest
+
+import src.graph.warmup as warmup
+import src.database.feedback_db as feedback_db
+
+APP_FILE = str(project_root / "app.py")
+CHECKPOINTS = (1, 5, 10, 20, 50)
+
+builds = {"graph": 0, "db": 0}
+
+# app.py her run'da bu isimleri modülden import eder: sayaçlı sarmala
+_warm_up = warmup.warm_up
+_FeedbackDB = feedback_db.FeedbackDB
+
+def counting_warm_up(*args, **kwargs):
+    builds["graph"] += 1
+    return _warm_up(*args, **kwargs)
+
+class CountingFeedbackDB(_FeedbackDB):
+    def __init__(self, *args, **kwargs):
+        builds["db"] += 1
+        super().__init__(*args, **kwargs)
+
+warmup.warm_up = counting_warm_up
+feedback_db.FeedbackDB = CountingFeedbackDB
+
+def peak_rss_mb() -> float:
+    """Process'in en yüksek RSS'i (MB, Linux); ölçülemiyorsa 0"""
+    if resource is None:
+        return 0.0
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def open_session() -> float:
+    """Yeni bir browser session'ı aç (ilk script run), süreyi döndür"""
+    start = time.perf_counter()
+    app = AppTest.from_file(APP_FILE, default_timeout=300)
+    app.run()
+    if app.exception:
+        raise RuntimeError(app.exception[0].message)
+    return time.perf_counter() - start
+
+if __name__ == "__main__":
+    n_sessions = int(sys.argv[1]) if len(sys.argv) > 1 else max(CHECKPOINTS)
+
+    print("=" * 70)
+    print("🧪 Streamlit Session Benchmark")
+    print("=" * 70)
+
+    print("\n⏳ İlk session (graph kurulumu + warm-up)...")
+    first = open_session()
+    print(f"   ✅ {first:.2f} sn")
+
+    baseline = peak_rss_mb()
+    print(f"   📦 Peak RSS: {baseline:.0f} MB")
+
+    print(f"\n   {'session':>8} {'açılış (ms)':>12} {'+RSS (MB)':>10} {'graph':>6} {'db':>4}")
+    durations = []
+    for i in range(2, n_sessions + 1):
+        durations.append(open_session())
+        if i in CHECKPOINTS or i == n_sessions:
+            recent = durations[-5:]
+            print(f"   {i:>8} {sum(recent) / len(recent) * 1000:>12.1f} {peak_rss_mb() - baseline:>10.1f} "
+                  f"{builds['graph']:>6} {builds['db']:>4}")
+
+    assert builds["graph"] == 1, f"Graph {builds['graph']} kez kuruldu"
+    assert builds["db"] == 1, f"FeedbackDB {builds['db']} kez kuruldu"
+
+    print("\n" + "=" * 70)
+    print("✅ BENCHMARK TAMAMLANDI! (graph ve FeedbackDB process başına bir kez)")
+    print("=" * 70)
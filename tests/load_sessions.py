@@ -0,0 +1,107 @@
+"""
+Multi-worker Session Load Test
+Takip sorularının ("Ne zaman yapılıyor?") farklı worker'a düştüğünde
+doğru topic'le yönlendirilip yönlendirilmediğini ve throughput'u ölçer
+
+Kullanım:
+    python tests/load_sessions.py [session_sayısı]
+"""
+import sys
+import os
+import time
+import uuid
+import tempfile
+from pathlib import Path
+from multiprocessing import Pool
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.services.memory_service import ConversationMemory
+from src.services.session_store import InMemorySessionStore, SQLiteSessionStore
+
+# İlk soru → beklenen topic
+CONVERSATIONS = [
+    ("FESTUP nedir?", "FESTUP"),
+    ("Social Media Talks hakkında bilgi ver", "Social Media Talks"),
+    ("DigitalMAG etkinliği ne?", "DigitalMAG"),
+    ("HUGİP Akademi'de neler var?", "HUGİP Akademi"),
+]
+FOLLOW_UP = "Ne zaman yapılıyor?"
+
+_memory = None
+
+def init_worker(backend: str, db_path: str):
+    """Her worker process kendi ConversationMemory'sini oluşturur"""
+    global _memory
+    store = SQLiteSessionStore(db_path) if backend == "sqlite" else InMemorySessionStore()
+    _memory = ConversationMemory(max_history=10, store=store)
+
+def first_turn(task):
+    session_id, question = task
+    _memory.add_message(session_id, "user", question)
+    _memory.add_message(session_id, "assistant", f"{question} hakkında bilgi...")
+    return os.getpid()
+
+def follow_up_turn(task):
+    session_id, expected_topic = task
+    _memory.add_message(session_id, "user", FOLLOW_UP)
+    # Router ve RetrieveNode bu topic ile takip sorusunu genişletir
+    topic = _memory.get_last_topic(session_id)
+    _memory.add_message(session_id, "assistant", "Tarih bilgisi...")
+    return os.getpid(), topic == expected_topic
+
+def run(backend: str, workers: int, n_sessions: int, db_path: str):
+    sessions = [
+        (str(uuid.uuid4()), *CONVERSATIONS[i % len(CONVERSATIONS)])
+        for i in range(n_sessions)
+    ]
+
+    with Pool(workers, initializer=init_worker, initargs=(backend, db_path)) as pool:
+        start = time.perf_counter()
+        first_pids = pool.map(first_turn, [(sid, q) for sid, q, _ in sessions], chunksize=1)
+        results = pool.map(follow_up_turn, [(sid, topic) for sid, _, topic in sessions], chunksize=1)
+        elapsed = time.perf_counter() - start
+
+    correct = sum(1 for _, ok in results if ok)
+    moved = sum(1 for pid, (pid2, _) in zip(first_pids, results) if pid != pid2)
+    requests = n_sessions * 4  # 2 turn × (user + assistant)
+
+    return {
+        "correct": correct,
+        "moved": moved,
+        "throughput": requests / elapsed,
+    }
+
+if __name__ == "__main__":
+    n_sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    print("=" * 70)
+    print("🧠 Multi-worker Session Load Test")
+    print("=" * 70)
+    print(f"\nSession sayısı: {n_sessions} (her biri 1 ilk soru + 1 takip sorusu)")
+
+    for backend in ["memory", "sqlite"]:
+        print(f"\n{'='*70}")
+        print(f"💾 Backend: {backend.upper()}")
+        print("=" * 70)
+
+        for workers in [1, 4, 8]:
+            with tempfile.TemporaryDirectory() as tmp:
+                db_path = str(Path(tmp) / "sessions.db")
+                result = run(backend, workers, n_sessions, db_path)
+
+            accuracy = result["correct"] / n_sessions * 100
+            print(
+                f"   👷 {workers} worker: "
+                f"doğru topic {result['correct']}/{n_sessions} ({accuracy:.1f}%), "
+                f"worker değiştiren takip sorusu {result['moved']}, "
+                f"{result['throughput']:.0f} mesaj/sn"
+            )
+
+    print("\n" + "=" * 70)
+    print("✅ LOAD TEST TAMAMLANDI!")
+    print("=" * 70)
+    print("\n📊 Değerlendirme:")
+    print("   ✅ SQLite backend'de doğruluk her worker sayısında %100 olmalı")
+    print("   ⚠️  Memory backend'de worker değiştiren takip soruları topic'i kaybeder")
@@ -0,0 +1,65 @@
+"""
+Session Store Test
+SQLite session store'da süresi dolmuş session'ların silindiğini test eder
+(açılışta ve her purge_every yazmada)
+
+Kullanım:
+    python tests/test_session_store.py
+"""
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.services.session_store import SQLiteSessionStore
+
+TTL_SECONDS = 60
+PURGE_EVERY = 10
+EXPIRED = 25
+
+def expire_rows(store: SQLiteSessionStore, count: int):
+    """TTL'i dolmuş count session ekle (updated_at geçmişte)"""
+    old = time.time() - TTL_SECONDS - 1
+    conn = store._conn()
+    conn.executemany(
+        "INSERT OR REPLACE INTO sessions (session_id, data, updated_at) VALUES (?, '{}', ?)",
+        [(f"expired-{i}", old) for i in range(count)]
+    )
+
+def count_rows(store: SQLiteSessionStore) -> int:
+    return store._conn().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+def touch(record):
+    return {**(record or {}), "touched": True}
+
+print("=" * 70)
+print("🧹 Session Store Test - Süresi dolmuş session temizliği")
+print("=" * 70)
+
+with tempfile.TemporaryDirectory() as tmp:
+    db_path = os.path.join(tmp, "sessions.db")
+
+    print(f"\n1️⃣ Her {PURGE_EVERY} yazmada temizlik...")
+    store = SQLiteSessionStore(db_path, ttl_seconds=TTL_SECONDS, purge_every=PURGE_EVERY)
+    expire_rows(store, EXPIRED)
+    for i in range(PURGE_EVERY - 1):
+        store.update(f"live-{i}", touch)
+    assert count_rows(store) == EXPIRED + PURGE_EVERY - 1, "purge_every dolmadan silindi"
+    store.update("live-last", touch)
+    assert count_rows(store) == PURGE_EVERY, f"süresi dolmuş satırlar kaldı: {count_rows(store)}"
+    assert store.load("live-0") == {"touched": True}
+    print(f"   ✅ {EXPIRED} süresi dolmuş session silindi, {PURGE_EVERY} aktif session duruyor")
+
+    print("\n2️⃣ Açılışta temizlik...")
+    expire_rows(store, EXPIRED)
+    reopened = SQLiteSessionStore(db_path, ttl_seconds=TTL_SECONDS, purge_every=0)
+    assert count_rows(reopened) == PURGE_EVERY, f"açılışta silinmedi: {count_rows(reopened)}"
+    print(f"   ✅ {EXPIRED} süresi dolmuş session açılışta silindi")
+
+print("\n" + "=" * 70)
+print("✅ SESSION STORE TEST TAMAMLANDI!")
+print("=" * 70)
@@ -14,9 +14,9 @@ load_dotenv()
 
 from langchain_community.document_loaders import PyPDFLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_openai import OpenAIEmbeddings
 from langchain_pinecone import PineconeVectorStore
 from src.core.config import get_settings
+from src.services.clients import get_embeddings, get_pinecone_index
 import os
 
 def upload_pdfs(pdf_folder: str):
@@ -58,10 +58,7 @@ def upload_pdfs(pdf_folder: str):
     )
     
     # Embeddings
-    embeddings = OpenAIEmbeddings(
-        model="text-embedding-3-small",
-        openai_api_key=settings.OPENAI_API_KEY
-    )
+    embeddings = get_embeddings()
     
     all_documents = []
     
@@ -102,11 +99,9 @@ def upload_pdfs(pdf_folder: str):
     print("   (Bu işlem birkaç dakika sürebilir...)")
     
     try:
-        vectorstore = PineconeVectorStore.from_documents(
-            documents=all_documents,
-            embedding=embeddings,
-            index_name=settings.PINECONE_INDEX_NAME
-        )
+        # Paylaşılan index bağlantısı (upsert'ler aynı pool'dan gider)
+        vectorstore = PineconeVectorStore(index=get_pinecone_index(), embedding=embeddings)
+        vectorstore.add_documents(all_documents)
         
         print("\n✅ Yükleme tamamlandı!")
         